@@ -0,0 +1,30 @@
+"""Add indexes for keyset pagination of listings
+
+Revision ID: a8e6c1f4b209
+Revises: f5c0d3b7a816
+Create Date: 2026-10-19 16:37:12.640275
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e6c1f4b209'
+down_revision = 'f5c0d3b7a816'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sport_groups_created_at_id', 'sport_groups', ['created_at', 'id'])
+    op.create_index('ix_events_start_datetime_id', 'events', ['start_datetime', 'id'])
+    op.create_index('ix_vendors_created_at_id', 'vendors', ['created_at', 'id'])
+    op.create_index('ix_games_group_date_id', 'games', ['sport_group_id', 'game_date', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_games_group_date_id', table_name='games')
+    op.drop_index('ix_vendors_created_at_id', table_name='vendors')
+    op.drop_index('ix_events_start_datetime_id', table_name='events')
+    op.drop_index('ix_sport_groups_created_at_id', table_name='sport_groups')
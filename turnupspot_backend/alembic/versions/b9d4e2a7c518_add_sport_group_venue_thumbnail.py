@@ -0,0 +1,24 @@
+"""Add venue thumbnail url to sport groups
+
+Revision ID: b9d4e2a7c518
+Revises: a8e6c1f4b209
+Create Date: 2026-10-19 18:05:51.392760
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d4e2a7c518'
+down_revision = 'a8e6c1f4b209'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('sport_groups', sa.Column('venue_thumbnail_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sport_groups', 'venue_thumbnail_url')
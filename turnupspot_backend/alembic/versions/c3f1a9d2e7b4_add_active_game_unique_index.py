@@ -0,0 +1,49 @@
+"""Add unique index on active games per group and date
+
+Revision ID: c3f1a9d2e7b4
+Revises: edaf6e2a3eac
+Create Date: 2026-10-19 09:12:40.118302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f1a9d2e7b4'
+down_revision = 'edaf6e2a3eac'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The old per-minute scan could race the check-in path into creating two
+    # active games for the same group and day. Keep one (a game already in
+    # progress, else the earliest) and cancel the rest so the index can build.
+    op.execute(
+        """
+        UPDATE games SET status = 'CANCELLED'
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY sport_group_id, game_date
+                    ORDER BY (status = 'IN_PROGRESS') DESC, created_at NULLS LAST, id
+                ) AS position
+                FROM games
+                WHERE status IN ('SCHEDULED', 'IN_PROGRESS')
+            ) ranked
+            WHERE position > 1
+        )
+        """
+    )
+    op.create_index(
+        'uq_games_active_group_date',
+        'games',
+        ['sport_group_id', 'game_date'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('SCHEDULED', 'IN_PROGRESS')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_games_active_group_date', table_name='games')
@@ -0,0 +1,43 @@
+"""Add denormalized member counters to sport groups
+
+Revision ID: d7a2c4e91f05
+Revises: c3f1a9d2e7b4
+Create Date: 2026-10-19 11:02:17.530914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a2c4e91f05'
+down_revision = 'c3f1a9d2e7b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('sport_groups', sa.Column('approved_member_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('sport_groups', sa.Column('pending_member_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the existing memberships
+    op.execute(
+        """
+        UPDATE sport_groups SET
+            approved_member_count = (
+                SELECT COUNT(*) FROM sport_group_members
+                WHERE sport_group_members.sport_group_id = sport_groups.id
+                AND sport_group_members.is_approved = true
+            ),
+            pending_member_count = (
+                SELECT COUNT(*) FROM sport_group_members
+                WHERE sport_group_members.sport_group_id = sport_groups.id
+                AND (sport_group_members.is_approved = false OR sport_group_members.is_approved IS NULL)
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('sport_groups', 'pending_member_count')
+    op.drop_column('sport_groups', 'approved_member_count')
@@ -0,0 +1,78 @@
+"""Add unique constraint on sport group memberships per user
+
+Revision ID: e2b7d5c1a390
+Revises: c6e8f2a0d4b7
+Create Date: 2026-10-19 16:40:03.271845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7d5c1a390'
+down_revision = 'c6e8f2a0d4b7'
+branch_labels = None
+depends_on = None
+
+# Each membership and the one it is merged into: per (group, user), an
+# approved membership wins over a pending one, an admin over a member,
+# then the oldest row
+DUPLICATES = """
+    SELECT id, keeper_id FROM (
+        SELECT id, FIRST_VALUE(id) OVER (
+            PARTITION BY sport_group_id, user_id
+            ORDER BY is_approved DESC NULLS LAST, (role = 'ADMIN') DESC, id
+        ) AS keeper_id
+        FROM sport_group_members
+    ) ranked
+    WHERE id <> keeper_id
+"""
+
+MEMBER_REFERENCES = [
+    ('game_players', 'member_id'),
+    ('game_teams', 'captain_id'),
+    ('games', 'referee_id'),
+    ('games', 'assistant_referee_id'),
+    ('matches', 'referee_id'),
+]
+
+
+def upgrade() -> None:
+    # Stale membership checks on other workers could insert a second row for
+    # the same user; point everything at the surviving row, then drop the rest
+    for table, column in MEMBER_REFERENCES:
+        op.execute(
+            f"""
+            UPDATE {table} SET {column} = duplicates.keeper_id
+            FROM ({DUPLICATES}) duplicates
+            WHERE {table}.{column} = duplicates.id
+            """
+        )
+    op.execute(f"DELETE FROM sport_group_members WHERE id IN (SELECT id FROM ({DUPLICATES}) duplicates)")
+
+    # The duplicates were counted too
+    op.execute(
+        """
+        UPDATE sport_groups SET
+            approved_member_count = (
+                SELECT COUNT(*) FROM sport_group_members
+                WHERE sport_group_members.sport_group_id = sport_groups.id
+                AND sport_group_members.is_approved = true
+            ),
+            pending_member_count = (
+                SELECT COUNT(*) FROM sport_group_members
+                WHERE sport_group_members.sport_group_id = sport_groups.id
+                AND (sport_group_members.is_approved = false OR sport_group_members.is_approved IS NULL)
+            )
+        """
+    )
+    op.create_unique_constraint(
+        'uq_sport_group_members_group_user',
+        'sport_group_members',
+        ['sport_group_id', 'user_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_sport_group_members_group_user', 'sport_group_members', type_='unique')
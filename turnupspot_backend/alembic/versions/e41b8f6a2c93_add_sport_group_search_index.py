@@ -0,0 +1,49 @@
+"""Add full-text and trigram search indexes to sport groups
+
+Revision ID: e41b8f6a2c93
+Revises: d7a2c4e91f05
+Create Date: 2026-10-19 13:48:05.274416
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41b8f6a2c93'
+down_revision = 'd7a2c4e91f05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        """
+        ALTER TABLE sport_groups ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(venue_name, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED
+        """
+    )
+    op.create_index(
+        'ix_sport_groups_search_vector',
+        'sport_groups',
+        ['search_vector'],
+        postgresql_using='gin',
+    )
+    op.create_index(
+        'ix_sport_groups_venue_name_trgm',
+        'sport_groups',
+        ['venue_name'],
+        postgresql_using='gin',
+        postgresql_ops={'venue_name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sport_groups_venue_name_trgm', table_name='sport_groups')
+    op.drop_index('ix_sport_groups_search_vector', table_name='sport_groups')
+    op.drop_column('sport_groups', 'search_vector')
@@ -0,0 +1,28 @@
+"""Add venue location index to sport groups
+
+Revision ID: f5c0d3b7a816
+Revises: e41b8f6a2c93
+Create Date: 2026-10-19 15:20:44.806132
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5c0d3b7a816'
+down_revision = 'e41b8f6a2c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_sport_groups_venue_location',
+        'sport_groups',
+        ['venue_latitude', 'venue_longitude'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sport_groups_venue_location', table_name='sport_groups')
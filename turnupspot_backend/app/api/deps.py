@@ -5,8 +5,10 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.security import verify_token
+from app.models.chat import ChatRoom, ChatRoomType
 from app.models.user import User
-from app.core.exceptions import UnauthorizedException
+from app.core.exceptions import ForbiddenException, UnauthorizedException
+from app.services.group_context import GroupContext, resolve_group_context
 
 security = HTTPBearer(auto_error=False)
 
@@ -75,4 +77,46 @@ def get_optional_current_user(
         
         return user
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+def get_group_context(
+    sport_group_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> GroupContext:
+    """Resolve the current user's membership in the sport group from the path"""
+    return resolve_group_context(db, sport_group_id, current_user.id)
+
+
+def get_fresh_group_context(
+    sport_group_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> GroupContext:
+    """Like get_group_context, but read from the database; for writes and permission checks"""
+    return resolve_group_context(db, sport_group_id, current_user.id, fresh=True)
+
+
+def get_accessible_chat_room(
+    room_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> ChatRoom:
+    """The chat room from the path, if the current user may access it.
+
+    A plain function, so async chat endpoints get it from the threadpool
+    rather than querying the database on the event loop.
+    """
+    room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+    if not room:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat room not found"
+        )
+
+    if room.room_type == ChatRoomType.SPORT_GROUP:
+        ctx = resolve_group_context(db, room.sport_group_id, current_user.id)
+
+        if not ctx.is_member:
+            raise ForbiddenException("You don't have access to this chat room")
+    return room
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, sport_groups, events, vendors, games, chat, superadmin, notifications, sports, game_day
+from app.api.v1.endpoints import auth, users, sport_groups, events, vendors, games, chat, superadmin, notifications, sports, game_day, media
 
 
 api_router = APIRouter()
@@ -13,6 +13,7 @@ api_router.include_router(vendors.router, prefix="/vendors", tags=["vendors"])
 api_router.include_router(games.router, prefix="/games", tags=["games"])
 api_router.include_router(game_day.router, prefix="/games/game-day", tags=["game-day"])
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
+api_router.include_router(media.router, prefix="/media", tags=["media"])
 api_router.include_router(sports.router, prefix="/sports", tags=["sports"])
 api_router.include_router(superadmin.router)
 api_router.include_router(notifications.router)
\ No newline at end of file
@@ -1,101 +1,57 @@
+import json
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.core.pagination import set_next_cursor
+from app.api.deps import get_accessible_chat_room, get_current_user, get_current_admin_user
 from app.models.user import User
-from app.models.sport_group import SportGroupMember
-from app.models.chat import ChatRoom, ChatMessage, ChatRoomType, MessageType
-from app.schemas.chat import ChatMessageCreate, ChatMessageUpdate, ChatMessageResponse, ChatRoomResponse
-from app.core.exceptions import ForbiddenException
+from app.models.chat import ChatRoom
+from app.schemas.chat import ChatInboxRoom, ChatMessageCreate, ChatMessageUpdate, ChatMessageResponse, ChatRoomResponse, ChatSearchHit
 from app.services import chat_service
+from app.services.chat_inbox import build_inbox
+from app.services.chat_connections import is_pong, manager
+from app.services.chat_persistence import authorize_chat_socket, run_db
+from app.services.chat_write_behind import chat_write_buffer
 from bson import ObjectId
 from fastapi import BackgroundTasks
 
 router = APIRouter()
 
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.room_connections: dict = {}
+def _broadcast_payload(message: dict, sender_name: str) -> str:
+    payload = chat_service.serialize_chat_message(message)
+    payload["created_at"] = payload["created_at"].isoformat()
+    payload["sender_name"] = sender_name
+    return json.dumps(payload)
 
-    async def connect(self, websocket: WebSocket, room_id: int, user_id: int):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        
-        if room_id not in self.room_connections:
-            self.room_connections[room_id] = []
-        
-        self.room_connections[room_id].append({
-            "websocket": websocket,
-            "user_id": user_id
-        })
-
-    def disconnect(self, websocket: WebSocket, room_id: int):
-        self.active_connections.remove(websocket)
-        
-        if room_id in self.room_connections:
-            self.room_connections[room_id] = [
-                conn for conn in self.room_connections[room_id] 
-                if conn["websocket"] != websocket
-            ]
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
 
-    async def broadcast_to_room(self, message: str, room_id: int, exclude_user_id: Optional[int] = None):
-        if room_id in self.room_connections:
-            for connection in self.room_connections[room_id]:
-                if exclude_user_id is None or connection["user_id"] != exclude_user_id:
-                    try:
-                        await connection["websocket"].send_text(message)
-                    except:
-                        # Connection is closed, remove it
-                        self.room_connections[room_id].remove(connection)
+@router.get("/stats")
+def get_chat_stats(current_user: User = Depends(get_current_admin_user)):
+    """Live chat sockets and rooms on the worker serving the request (admin only)"""
+    return manager.stats()
 
 
-manager = ConnectionManager()
+@router.get("/rooms", response_model=List[ChatInboxRoom])
+async def get_my_chat_rooms(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Every chat room the user can access with its last message and unread count, most recent first"""
+    return await build_inbox(db, current_user.id)
 
 
 @router.get("/rooms/{room_id}", response_model=ChatRoomResponse)
-def get_chat_room(
+async def get_chat_room(
     room_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    room: ChatRoom = Depends(get_accessible_chat_room)
 ):
     """Get chat room details"""
-    room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
-    if not room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Chat room not found"
-        )
-    
-    # Check if user has access to this room
-    if room.room_type == ChatRoomType.SPORT_GROUP:
-        membership = db.query(SportGroupMember).filter(
-            and_(
-                SportGroupMember.sport_group_id == room.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.is_approved == True
-            )
-        ).first()
-        
-        if not membership:
-            raise ForbiddenException("You don't have access to this chat room")
-    
     # Get recent messages
-    recent_messages = db.query(ChatMessage).filter(
-        and_(
-            ChatMessage.chat_room_id == room_id,
-            ChatMessage.is_deleted == False
-        )
-    ).order_by(ChatMessage.created_at.desc()).limit(50).all()
-    
-    room.recent_messages = list(reversed(recent_messages))
+    recent_messages, _ = await chat_service.get_chat_messages(str(room_id), limit=50)
+    room.recent_messages = [chat_service.serialize_chat_message(m) for m in recent_messages]
     
     return room
 
@@ -103,34 +59,45 @@ def get_chat_room(
 @router.get("/rooms/{room_id}/messages", response_model=List[ChatMessageResponse])
 async def get_chat_messages(
     room_id: int,
+    response: Response,
     skip: int = 0,
-    limit: int = 50,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    room: ChatRoom = Depends(get_accessible_chat_room)
 ):
-    """Get chat messages for a room"""
-    room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
-    if not room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Chat room not found"
-        )
-    
-    # Check if user has access to this room
-    if room.room_type == ChatRoomType.SPORT_GROUP:
-        membership = db.query(SportGroupMember).filter(
-            and_(
-                SportGroupMember.sport_group_id == room.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.is_approved == True
-            )
-        ).first()
-        
-        if not membership:
-            raise ForbiddenException("You don't have access to this chat room")
-    
-    messages = await chat_service.get_chat_messages(str(room_id), skip, limit)
-    return messages
+    """Get chat messages for a room, oldest first.
+
+    Pass the X-Next-Cursor header of a page as ``before`` to load the
+    messages that came before it. Pages loaded with ``after`` go forward
+    instead, and their X-Next-Cursor is passed as ``after`` again.
+    """
+    messages, next_cursor = await chat_service.get_chat_messages(str(room_id), limit, before=before, skip=skip, after=after)
+    set_next_cursor(response, next_cursor)
+    return [chat_service.serialize_chat_message(m) for m in messages]
+
+
+@router.get("/rooms/{room_id}/search", response_model=List[ChatSearchHit])
+async def search_chat_messages(
+    room_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    room: ChatRoom = Depends(get_accessible_chat_room)
+):
+    """Search a room's messages, best match first.
+
+    Each hit's cursor opens the history around it: pass it as ``before``
+    or ``after`` to the messages endpoint.
+    """
+    hits = await chat_service.search_chat_messages(str(room_id), q, limit)
+    return [
+        {
+            "message": chat_service.serialize_chat_message(message),
+            "score": score,
+            "cursor": chat_service.encode_message_cursor(message),
+        }
+        for message, score in hits
+    ]
 
 
 @router.post("/rooms/{room_id}/messages", response_model=ChatMessageResponse)
@@ -138,35 +105,36 @@ async def send_message(
     room_id: int,
     message_data: ChatMessageCreate,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    room: ChatRoom = Depends(get_accessible_chat_room),
+    current_user: User = Depends(get_current_user)
 ):
     """Send a message to a chat room"""
-    room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
-    if not room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Chat room not found"
-        )
-    
-    # Check if user has access to this room
-    if room.room_type == ChatRoomType.SPORT_GROUP:
-        membership = db.query(SportGroupMember).filter(
-            and_(
-                SportGroupMember.sport_group_id == room.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.is_approved == True
-            )
-        ).first()
-        
-        if not membership:
-            raise ForbiddenException("You don't have access to this chat room")
-    
-    message_dict = message_data.dict()
-    message_dict["chat_id"] = str(room_id)
-    message_dict["sender_id"] = str(current_user.id)
-    chat_message = await chat_service.create_chat_message(message_dict)
-    return chat_message
+    chat_message = await chat_service.create_chat_message(chat_service.build_chat_message(
+        room_id,
+        current_user.id,
+        message_data.content,
+        message_type=message_data.message_type.value,
+        file_url=message_data.file_url,
+        file_name=message_data.file_name,
+        file_size=message_data.file_size,
+    ))
+    await manager.broadcast_to_room(
+        _broadcast_payload(chat_message, current_user.full_name),
+        room_id,
+        exclude_user_id=current_user.id
+    )
+    return chat_service.serialize_chat_message(chat_message)
+
+
+@router.post("/rooms/{room_id}/read")
+async def mark_room_read(
+    room_id: int,
+    room: ChatRoom = Depends(get_accessible_chat_room),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark every message in the room as read by the current user"""
+    await chat_service.mark_room_read(str(room_id), current_user.id)
+    return {"ok": True}
 
 
 @router.put("/messages/{message_id}", response_model=ChatMessageResponse)
@@ -181,7 +149,7 @@ async def update_message(
     chat_message = await chat_service.update_chat_message(message_id, update_data)
     if not chat_message:
         raise HTTPException(status_code=404, detail="Message not found")
-    return chat_message
+    return chat_service.serialize_chat_message(chat_message)
 
 
 @router.delete("/messages/{message_id}")
@@ -201,79 +169,47 @@ async def delete_message(
 async def websocket_endpoint(
     websocket: WebSocket,
     room_id: int,
-    token: str,
-    db: Session = Depends(get_db)
+    token: str
 ):
     """WebSocket endpoint for real-time chat"""
     try:
-        # Verify token and get user
-        from app.core.security import verify_token
-        payload = verify_token(token)
-        email = payload.get("sub")
-        
-        user = db.query(User).filter(User.email == email).first()
+        # Verify token and room access in a short-lived session
+        user, reason = await run_db(authorize_chat_socket, token, room_id)
         if not user:
-            await websocket.close(code=1008, reason="Invalid user")
-            return
-        
-        # Check room access
-        room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
-        if not room:
-            await websocket.close(code=1008, reason="Room not found")
+            await websocket.close(code=1008, reason=reason)
             return
         
-        if room.room_type == ChatRoomType.SPORT_GROUP:
-            membership = db.query(SportGroupMember).filter(
-                and_(
-                    SportGroupMember.sport_group_id == room.sport_group_id,
-                    SportGroupMember.user_id == user.id,
-                    SportGroupMember.is_approved == True
-                )
-            ).first()
-            
-            if not membership:
-                await websocket.close(code=1008, reason="Access denied")
-                return
-        
         # Connect to room
-        await manager.connect(websocket, room_id, user.id)
+        await manager.connect(websocket, room_id, user["id"])
         
         try:
             while True:
                 # Receive message from WebSocket
                 data = await websocket.receive_text()
+                manager.touch(websocket)
+                if is_pong(data):
+                    continue
                 
-                # Create message in database
-                db_message = ChatMessage(
-                    chat_room_id=room_id,
-                    sender_id=user.id,
-                    content=data,
-                    message_type=MessageType.TEXT
-                )
-                
-                db.add(db_message)
-                db.commit()
-                db.refresh(db_message)
+                # Acknowledge and broadcast now; the buffer writes it in a batch shortly
+                message = chat_service.build_chat_message(room_id, user["id"], data)
+                await chat_write_buffer.add(message["chat_id"], message)
+                await chat_service.remember_message(message)
                 
                 # Broadcast to room
-                import json
-                message_data = {
-                    "id": db_message.id,
-                    "content": db_message.content,
-                    "sender_id": db_message.sender_id,
-                    "sender_name": user.full_name,
-                    "created_at": db_message.created_at.isoformat(),
-                    "message_type": db_message.message_type
-                }
-                
                 await manager.broadcast_to_room(
-                    json.dumps(message_data), 
+                    _broadcast_payload(message, user["full_name"]),
                     room_id, 
-                    exclude_user_id=user.id
+                    exclude_user_id=user["id"]
                 )
                 
         except WebSocketDisconnect:
-            manager.disconnect(websocket, room_id)
+            pass
+        finally:
+            await manager.disconnect(websocket, room_id)
             
     except Exception as e:
-        await websocket.close(code=1011, reason=str(e))
\ No newline at end of file
+        try:
+            await websocket.close(code=1011, reason=str(e))
+        except RuntimeError:
+            # Already closed, e.g. by the heartbeat
+            pass
@@ -1,9 +1,11 @@
+import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from app.core.database import get_db
+from app.core.pagination import keyset_paginate, set_next_cursor
 from app.api.deps import get_current_user, get_optional_current_user
 from app.models.user import User
 from app.models.event import Event, EventAttendee, EventType, EventStatus, AttendeeStatus
@@ -12,19 +14,48 @@ from app.schemas.event import (
     EventRegistration, EventAttendeeResponse
 )
 from app.core.exceptions import EventNotFoundException, ForbiddenException
+from app.services.geocoding import get_geocoding_service
+from app.tasks.geocoding import backfill_venue_coordinates, run_venue_backfill
 
 router = APIRouter()
 
 
+def _cached_venue_coordinates(address: str, db: Session):
+    """(latitude, longitude, found) from the geocoding cache; never calls the provider in the request"""
+    coordinates = get_geocoding_service().cached_coordinates(address, db)
+    if coordinates is None:
+        return None, None, False
+    return coordinates[0], coordinates[1], True
+
+
+def _queue_coordinate_backfill(background_tasks: BackgroundTasks):
+    """Geocode uncached venues on the worker, or in this process after the response without a broker"""
+    try:
+        backfill_venue_coordinates.delay()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not queue venue geocoding: {str(e)}")
+        background_tasks.add_task(run_venue_backfill)
+
+
 @router.post("/", response_model=EventResponse)
 def create_event(
     event_data: EventCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new event"""
+    event_fields = event_data.dict(exclude={"additional_images"})
+    needs_geocoding = False
+    if event_fields["venue_latitude"] is None or event_fields["venue_longitude"] is None:
+        # Known venues come from the cache; others are geocoded in the background
+        event_fields["venue_latitude"], event_fields["venue_longitude"], found = (
+            _cached_venue_coordinates(event_fields["venue_address"], db)
+        )
+        needs_geocoding = not found
+
     db_event = Event(
-        **event_data.dict(exclude={"additional_images"}),
+        **event_fields,
         creator_id=current_user.id,
         additional_images=",".join(event_data.additional_images) if event_data.additional_images else None
     )
@@ -32,6 +63,8 @@ def create_event(
     db.add(db_event)
     db.commit()
     db.refresh(db_event)
+    if needs_geocoding:
+        _queue_coordinate_backfill(background_tasks)
     
     # Add attendee count
     db_event.attendee_count = 0
@@ -41,8 +74,10 @@ def create_event(
 
 @router.get("/", response_model=List[EventResponse])
 def get_events(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     event_type: Optional[EventType] = None,
     search: Optional[str] = None,
     upcoming_only: bool = Query(True),
@@ -71,7 +106,10 @@ def get_events(
         from datetime import datetime
         query = query.filter(Event.start_datetime > datetime.utcnow())
     
-    events = query.offset(skip).limit(limit).all()
+    events, next_cursor = keyset_paginate(
+        query, [Event.start_datetime, Event.id], limit, cursor=cursor, skip=skip
+    )
+    set_next_cursor(response, next_cursor)
     
     # Add attendee count to each event
     for event in events:
@@ -110,6 +148,7 @@ def get_event(
 def update_event(
     event_id: int,
     event_update: EventUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -126,12 +165,21 @@ def update_event(
     update_data = event_update.dict(exclude_unset=True)
     if "additional_images" in update_data:
         update_data["additional_images"] = ",".join(update_data["additional_images"]) if update_data["additional_images"] else None
+    needs_geocoding = False
+    if update_data.get("venue_address") and "venue_latitude" not in update_data and "venue_longitude" not in update_data:
+        # Cleared on a cache miss so the background backfill picks the event up
+        update_data["venue_latitude"], update_data["venue_longitude"], found = (
+            _cached_venue_coordinates(update_data["venue_address"], db)
+        )
+        needs_geocoding = not found
     
     for field, value in update_data.items():
         setattr(event, field, value)
     
     db.commit()
     db.refresh(event)
+    if needs_geocoding:
+        _queue_coordinate_backfill(background_tasks)
     
     # Add attendee count
     event.attendee_count = len([a for a in event.attendees if a.status in [
@@ -1,8 +1,8 @@
 # turnupspot_backend/app/api/v1/endpoints/game_day.py
 from typing import List, Optional, Dict
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, BackgroundTasks, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, case, func, select, union_all
 from datetime import datetime, timedelta
 try:
     from zoneinfo import ZoneInfo
@@ -15,11 +15,16 @@ import logging
 import uuid
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_fresh_group_context, get_group_context
 from app.models.user import User
 from app.models.sport_group import SportGroupMember, MemberRole, SportGroup, PlayingDay
 from app.models.game import Game, GameTeam, GamePlayer, GameStatus, PlayerStatus, Match, MatchStatus
 from app.core.exceptions import ForbiddenException
+from app.services.group_context import GroupContext
+from app.services.game_day_resolver import get_or_create_todays_game, get_todays_game, is_playing_day
+from app.services.game_day_lobby import lobby_manager
+from app.services.my_groups import invalidate_my_groups_for_group
+from app.services.group_context import resolve_group_context
 from app.models.manual_checkin import GameDayParticipant
 from app.schemas.manual_checkin import GameDayParticipantCreate, GameDayParticipantOut
 
@@ -28,27 +33,118 @@ import uuid
 router = APIRouter()
 
 
+def _get_team_player_counts(db: Session, game_id: str) -> Dict[int, int]:
+    """Count manual participants and registered players per team number in one grouped query"""
+    manual = select(GameDayParticipant.team.label("team_number")).where(
+        and_(
+            GameDayParticipant.game_id == game_id,
+            GameDayParticipant.team.isnot(None)
+        )
+    )
+    registered = select(GameTeam.team_number.label("team_number")).join(
+        GamePlayer, GamePlayer.team_id == GameTeam.id
+    ).where(GamePlayer.game_id == game_id)
+    players = union_all(manual, registered).subquery()
+    rows = db.query(players.c.team_number, func.count()).group_by(players.c.team_number).all()
+    return {team_number: count for team_number, count in rows}
+
+
+def _player_info(member: SportGroupMember, game_player: Optional[GamePlayer]) -> dict:
+    """Lobby entry of a group member, with their check-in state for the current game"""
+    player_info = {
+        "id": member.id,
+        "user_id": member.user.id,
+        "name": member.user.full_name,
+        "status": "expected",
+        "arrival_time": None,
+        "is_captain": False,
+        "team": None
+    }
+    if game_player:
+        player_info["status"] = game_player.status.value
+        player_info["arrival_time"] = game_player.arrival_time.strftime("%H:%M") if game_player.arrival_time else None
+        player_info["team"] = game_player.team.team_number if game_player.team else None
+        player_info["is_captain"] = bool(game_player.team and game_player.team.captain_id == member.id)
+    return player_info
+
+
+def _get_game_day_roster(db: Session, sport_group_id: str, current_game: Optional[Game]) -> List[dict]:
+    """All approved members of a group with their check-in state for the current game"""
+    members = db.query(SportGroupMember).filter(
+        and_(
+            SportGroupMember.sport_group_id == sport_group_id,
+            SportGroupMember.is_approved == True
+        )
+    ).all()
+
+    game_players_by_member = {}
+    if current_game:
+        game_players_by_member = {
+            game_player.member_id: game_player
+            for game_player in db.query(GamePlayer).filter(GamePlayer.game_id == current_game.id).all()
+        }
+
+    return [_player_info(member, game_players_by_member.get(member.id)) for member in members]
+
+
+def _collect_assignment_violations(
+    assignments: Dict[int, List[int]],
+    participants_by_id: Dict[int, GameDayParticipant],
+    first_10_ids: set,
+    team_counts: Dict[int, int],
+    max_players_per_team: int
+) -> List[str]:
+    """Validate a team assignment payload and return every violation found"""
+    violations = []
+    seen = set()
+    for team_number, participant_ids in assignments.items():
+        for pid in participant_ids:
+            participant = participants_by_id.get(pid)
+            if participant is None:
+                violations.append(f"Participant ID {pid} is not checked in for today's game.")
+                continue
+            if pid in seen:
+                violations.append(f"Player {participant.name} is assigned to more than one team.")
+            seen.add(pid)
+            if team_number in [1, 2] and pid not in first_10_ids:
+                violations.append(
+                    f"Only the first 10 arrivals can be assigned to Team 1 or 2. "
+                    f"Player {participant.name} is not among the first 10 arrivals."
+                )
+
+    # Participants being moved free up a slot on the team they are leaving
+    projected_counts = dict(team_counts)
+    for pid in seen:
+        current_team = participants_by_id[pid].team
+        if current_team is not None and current_team in projected_counts:
+            projected_counts[current_team] -= 1
+
+    for team_number, participant_ids in assignments.items():
+        total_current_players = projected_counts.get(team_number, 0)
+        incoming = len([pid for pid in participant_ids if pid in participants_by_id])
+        if total_current_players + incoming > max_players_per_team:
+            violations.append(
+                f"Cannot assign {incoming} participants to Team {team_number}. "
+                f"Team currently has {total_current_players} players. "
+                f"Maximum players per team is {max_players_per_team}."
+            )
+    return violations
+
+
 @router.get("/{sport_group_id}")
 def get_game_day_info(
     sport_group_id: str,
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_group_context),
     db: Session = Depends(get_db)
 ):
     """Get game day information for a sport group"""
     # Check if user is member of the sport group
-    membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.is_approved == True
-        )
-    ).first()
-    
-    if not membership:
+    if not ctx.is_member:
         raise ForbiddenException("Only group members can view game day info")
     
     # Get sport group
-    sport_group = db.query(SportGroup).filter(SportGroup.id == sport_group_id).first()
+    sport_group = ctx.get_sport_group(db)
     if not sport_group:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -63,27 +159,13 @@ def get_game_day_info(
     #     playing_days = [int(day.strip()) for day in sport_group.playing_days.split(",") if day.strip().isdigit()]
     
     # is_playing_day = today_num in playing_days
-    # Check if today is a playing day using the PlayingDay table
+    # Check if today is a playing day using the group's cached playing-day mask
     today = datetime.now(MOUNTAIN_TZ)
-    today_day_name = today.strftime("%A")  # "Wednesday"
-
-    # Query the PlayingDay table for this sport group
-    playing_days = db.query(PlayingDay).filter(
-        PlayingDay.sport_group_id == sport_group_id
-    ).all()
-
-    # Check if today matches any of the playing days
-    is_playing_day = any(pd.day.value == today_day_name for pd in playing_days)
+    today_is_playing_day = is_playing_day(db, sport_group_id, today.date())
 
     
     # Get current game if exists
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])
-        )
-    ).first()
+    current_game = get_todays_game(db, sport_group_id, today.date())
     
     # Check if check-in should be enabled (1 hour before game start)
     game_start_time = sport_group.game_start_time
@@ -96,7 +178,7 @@ def get_game_day_info(
     
     # Get game day info
     game_day_info = {
-        "is_playing_day": is_playing_day,
+        "is_playing_day": today_is_playing_day,
         "day": today.strftime("%A"),
         "date": today.strftime("%B %d, %Y"),
         "game_start_time": game_start_time.strftime("%I:%M %p"),
@@ -113,8 +195,8 @@ def get_game_day_info(
     
     # Add current_user_membership info
     game_day_info["current_user_membership"] = {
-        "role": membership.role.value if hasattr(membership.role, 'value') else membership.role,
-        "is_creator": sport_group.creator_id == current_user.id
+        "role": ctx.role.value if hasattr(ctx.role, 'value') else ctx.role,
+        "is_creator": ctx.is_creator
     }
     return game_day_info
 
@@ -123,97 +205,99 @@ def get_game_day_info(
 def get_game_day_players(
     sport_group_id: str,
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_group_context),
     db: Session = Depends(get_db)
 ):
     """Get all players for game day with their check-in status"""
     # Check if user is member of the sport group
-    membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.is_approved == True
-        )
-    ).first()
-    
-    if not membership:
+    if not ctx.is_member:
         raise ForbiddenException("Only group members can view game day players")
     
-    # Get all approved members
-    members = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.is_approved == True
-        )
-    ).all()
-    
     # Get current game if exists
     today = datetime.now(MOUNTAIN_TZ)
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])
-        )
-    ).first()
+    current_game = get_todays_game(db, sport_group_id, today.date())
     
     print(f"Current game found: {current_game.id if current_game else 'None'}")
     
-    players = []
-    for member in members:
-        player_info = {
-            "id": member.id,
-            "user_id": member.user.id,
-            "name": member.user.full_name,
-            "status": "expected",
-            "arrival_time": None,
-            "is_captain": False,
-            "team": None
-        }
-        
-        # If there's a current game, get player status from game
-        if current_game:
-            game_player = db.query(GamePlayer).filter(
-                and_(
-                    GamePlayer.game_id == current_game.id,
-                    GamePlayer.member_id == member.id
+    return _get_game_day_roster(db, sport_group_id, current_game)
+
+
+@router.websocket("/{sport_group_id}/ws")
+async def game_day_lobby_websocket(
+    websocket: WebSocket,
+    sport_group_id: str,
+    token: str,
+    db: Session = Depends(get_db)
+):
+    """Live game-day lobby: the full roster once on connect, then compact deltas"""
+    try:
+        # Verify token and get user
+        from app.core.security import verify_token
+        payload = verify_token(token)
+        email = payload.get("sub")
+
+        user = db.query(User).filter(User.email == email).first()
+        if not user:
+            await websocket.close(code=1008, reason="Invalid user")
+            return
+
+        ctx = resolve_group_context(db, sport_group_id, user.id)
+        if not ctx.is_member:
+            await websocket.close(code=1008, reason="Access denied")
+            return
+
+        today = datetime.now(MOUNTAIN_TZ)
+        current_game = get_todays_game(db, sport_group_id, today.date())
+        roster_event = {
+            "type": "roster",
+            "game_id": current_game.id if current_game else None,
+            "players": _get_game_day_roster(db, sport_group_id, current_game),
+            "manual_participants": [
+                GameDayParticipantOut.from_orm(participant).dict()
+                for participant in (
+                    db.query(GameDayParticipant).filter(GameDayParticipant.game_id == current_game.id).all()
+                    if current_game else []
                 )
-            ).first()
-            
-            if game_player:
-                player_info["status"] = game_player.status.value
-                player_info["arrival_time"] = game_player.arrival_time.strftime("%H:%M") if game_player.arrival_time else None
-                player_info["team"] = game_player.team.team_number if game_player.team else None
-                player_info["is_captain"] = (game_player.team and game_player.team.captain_id == member.id)
-                
-            else:
-                print(f"No game player record found for {member.user.full_name}")
-        
-        players.append(player_info)
-    
-    return players
+            ]
+        }
+        # Everything after this point is pushed; don't hold a pooled connection for the socket's lifetime
+        db.close()
+
+        await lobby_manager.connect(websocket, sport_group_id, user.id)
+        try:
+            await lobby_manager.send_event(websocket, roster_event)
+            while True:
+                # Clients only listen; incoming frames keep the connection alive
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await lobby_manager.disconnect(websocket, sport_group_id)
+
+    except Exception as e:
+        try:
+            await websocket.close(code=1011, reason=str(e))
+        except RuntimeError:
+            # Already closed, e.g. as a slow client
+            pass
 
 
 @router.post("/{sport_group_id}/check-in")
 def check_in_player_game_day(
     sport_group_id: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_fresh_group_context),
     db: Session = Depends(get_db)
 ):
     """Check in a player for game day"""
     # Check if user is member of the sport group
-    membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.is_approved == True
-        )
-    ).first()
-    
-    if not membership:
+    if not ctx.is_member:
         raise ForbiddenException("Only group members can check in")
+    membership = ctx.get_membership(db)
     
     # Get sport group
-    sport_group = db.query(SportGroup).filter(SportGroup.id == sport_group_id).first()
+    sport_group = ctx.get_sport_group(db)
     if not sport_group:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -235,25 +319,10 @@ def check_in_player_game_day(
         )
     
     # Get or create current game
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])
-        )
-    ).first()
+    current_game, created = get_or_create_todays_game(db, sport_group, today.date())
     
-    if not current_game:
-        # Create new game
-        current_game = Game(
-            sport_group_id=sport_group_id,
-            game_date=today.date(),
-            start_time=datetime.combine(today.date(), game_start_time),
-            end_time=datetime.combine(today.date(), sport_group.game_end_time),
-            status=GameStatus.SCHEDULED
-        )
-        db.add(current_game)
-        db.flush()
+    if created:
+        invalidate_my_groups_for_group(sport_group_id)
         print(f"Created new game with ID: {current_game.id}")
     else:
         print(f"Using existing game with ID: {current_game.id}")
@@ -351,6 +420,11 @@ def check_in_player_game_day(
             
             db.commit()
     
+    background_tasks.add_task(lobby_manager.broadcast, sport_group_id, {
+        "type": "player_arrived",
+        "game_id": current_game.id,
+        "player": _player_info(membership, game_player)
+    })
     return {"message": "Player checked in successfully", "player_id": game_player.id}
 
 
@@ -358,28 +432,15 @@ def check_in_player_game_day(
 def assign_captains(
     sport_group_id: str,
     captain_assignments: dict,  # {player_id: team_number}
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_fresh_group_context),
     db: Session = Depends(get_db)
 ):
     """Assign captains to teams (first 10 players only)"""
-    # Check if user is admin of the sport group
-    admin_membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.role == MemberRole.ADMIN
-        )
-    ).first()
-
     # Get current game
     today = datetime.now(MOUNTAIN_TZ)
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])
-        )
-    ).first()
+    current_game = get_todays_game(db, sport_group_id, today.date())
 
     if not current_game:
         raise HTTPException(
@@ -395,18 +456,10 @@ def assign_captains(
         )
     ).order_by(GamePlayer.arrival_time.asc()).limit(10).all()
 
-    # Get the current user's membership record
-    membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id
-        )
-    ).first()
-
-    # Now compare membership.id to GamePlayer.member_id
-    is_first_ten = any(p.member_id == membership.id for p in arrived_players)
+    # Now compare the user's membership id to GamePlayer.member_id
+    is_first_ten = ctx.has_membership and any(p.member_id == ctx.membership_id for p in arrived_players)
 
-    if not admin_membership and not is_first_ten:
+    if ctx.role != MemberRole.ADMIN and not is_first_ten:
         raise ForbiddenException("Only admins or the first 10 arrived players can assign captains")
 
     if len(arrived_players) < 10:
@@ -416,6 +469,7 @@ def assign_captains(
         )
 
     # Assign captains
+    captains = []
     for player_id, team_number in captain_assignments.items():
         if team_number not in [1, 2]:
             continue
@@ -448,6 +502,7 @@ def assign_captains(
             player.team_id = team.id
             player.is_captain = True
             db.flush()  # Ensure changes are staged for commit
+            captains.append({"member_id": player.member_id, "team": team_number})
             print(f"After assignment: team.captain_id={team.captain_id}, player.team_id={player.team_id}, player.is_captain={player.is_captain}")
         else:
             print(f"No GamePlayer found for player_id={player_id} in game_id={current_game.id}")
@@ -474,6 +529,12 @@ def assign_captains(
 
     
     db.commit()
+    if captains:
+        background_tasks.add_task(lobby_manager.broadcast, sport_group_id, {
+            "type": "captain_set",
+            "game_id": current_game.id,
+            "captains": captains
+        })
     return {"message": "Captains and team assigned successfully"}
 
 
@@ -481,19 +542,15 @@ def assign_captains(
 def select_team_players(
     sport_group_id: str,
     selections: dict,  # {team_number: [player_ids]}
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_fresh_group_context),
     db: Session = Depends(get_db)
 ):
     """Captains select players for their teams"""
     # Get current game
     today = datetime.now(MOUNTAIN_TZ)
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])
-        )
-    ).first()
+    current_game = get_todays_game(db, sport_group_id, today.date())
     
     if not current_game:
         raise HTTPException(
@@ -502,7 +559,7 @@ def select_team_players(
         )
     
     # Get sport group for max players per team
-    sport_group = db.query(SportGroup).filter(SportGroup.id == sport_group_id).first()
+    sport_group = ctx.get_sport_group(db)
     
                     
     # Ensure all teams exist before assigning players
@@ -526,6 +583,7 @@ def select_team_players(
             print(f"Created team during player selection: {team.team_name}")
     
     # Process selections
+    selected = {}
     for team_number, player_ids in selections.items():
         # Find team
         team = db.query(GameTeam).filter(
@@ -546,27 +604,12 @@ def select_team_players(
             print(f"Created new team: {team.team_name} with id {team.id}")
             
         # Check if current user is captain of this team
-        membership = db.query(SportGroupMember).filter(
-            and_(
-                SportGroupMember.sport_group_id == sport_group_id,
-                SportGroupMember.user_id == current_user.id
-            )
-        ).first()
-        
-        if not membership:
+        if not ctx.has_membership:
             raise ForbiddenException("User not found in sport group")
             
-        if team.captain_id != membership.id:
+        if team.captain_id != ctx.membership_id:
             # Check if user is admin
-            admin_membership = db.query(SportGroupMember).filter(
-                and_(
-                    SportGroupMember.sport_group_id == sport_group_id,
-                    SportGroupMember.user_id == current_user.id,
-                    SportGroupMember.role == MemberRole.ADMIN
-                )
-            ).first()
-            
-            if not admin_membership:
+            if ctx.role != MemberRole.ADMIN:
                 raise ForbiddenException("Only team captains or admins can select players")
         
         # Add players to team (respecting max players per team)
@@ -593,33 +636,35 @@ def select_team_players(
             if player:
                 player.team_id = team.id
                 current_team_players += 1
+                selected[player.member_id] = team.team_number
 
 
     
     db.commit()
     
+    if selected:
+        background_tasks.add_task(lobby_manager.broadcast, sport_group_id, {
+            "type": "team_assigned",
+            "game_id": current_game.id,
+            "participant_type": "registered",
+            "assignments": selected
+        })
     return {"message": "Players selected for teams successfully"}
 
 @router.post("/{sport_group_id}/play-ball")
 def play_ball(
     sport_group_id: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_fresh_group_context),
     db: Session = Depends(get_db)
 ):
     """Start the first match when Play Ball is pressed"""
     # Check if user is admin or captain
-    membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.is_approved == True
-        )
-    ).first()
-    
-    if not membership:
+    if not ctx.is_member:
         raise ForbiddenException("Only group members can start the game")
     
-    sport_group = db.query(SportGroup).filter(SportGroup.id == sport_group_id).first()
+    sport_group = ctx.get_sport_group(db)
     if not sport_group:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -628,13 +673,7 @@ def play_ball(
     
     # Get current game - look for both SCHEDULED and IN_PROGRESS games
     today = datetime.now(MOUNTAIN_TZ)
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])  # Include IN_PROGRESS
-        )
-    ).first()
+    current_game = get_todays_game(db, sport_group_id, today.date())
     
     if not current_game:
         raise HTTPException(
@@ -643,9 +682,7 @@ def play_ball(
         )
     
     # Check if user is admin
-    is_admin = membership.role == MemberRole.ADMIN or sport_group.creator_id == current_user.id
-    
-    if not is_admin:
+    if not ctx.is_admin:
         raise ForbiddenException("Only admins can start the game")
     
     # Check if both Team 1 and Team 2 have players (using manual participants)
@@ -743,7 +780,13 @@ def play_ball(
     
     db.commit()
     db.refresh(initial_match)
+    invalidate_my_groups_for_group(sport_group_id)
     
+    background_tasks.add_task(lobby_manager.broadcast, sport_group_id, {
+        "type": "game_started",
+        "game_id": current_game.id,
+        "match_id": initial_match.id
+    })
     return {
         "message": "Game started! Team 1 vs Team 2",
         "game_id": current_game.id,
@@ -901,58 +944,29 @@ def play_ball(
 @router.post("/{sport_group_id}/manual-check-in", response_model=List[GameDayParticipantOut])
 def manual_check_in(
     sport_group_id: str,
+    background_tasks: BackgroundTasks,
     players: List[GameDayParticipantCreate] = Body(...),
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_fresh_group_context),
     db: Session = Depends(get_db)
 ):
     # Check if user is group admin or creator
-    membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.is_approved == True
-        )
-    ).first()
-    sport_group = db.query(SportGroup).filter(SportGroup.id == sport_group_id).first()
-    if not membership or not sport_group:
-        raise ForbiddenException("Only group admins can check in players")
-    is_admin = (membership.role == MemberRole.ADMIN or sport_group.creator_id == current_user.id)
-    if not is_admin:
+    if not ctx.group_exists or not ctx.is_member or not ctx.is_admin:
         raise ForbiddenException("Only group admins can check in players")
+    sport_group = ctx.get_sport_group(db)
     # Get today's game
     today = datetime.now(MOUNTAIN_TZ)
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])
-        )
-    ).first()
+    current_game = get_todays_game(db, sport_group_id, today.date())
     
     # If no game exists but it's a playing day, create one
     if not current_game:
-        # Get sport group playing days
-        playing_days = db.query(PlayingDay).filter(
-            PlayingDay.sport_group_id == sport_group_id
-        ).all()
-        
         # Check if today is a playing day
-        today_day = today.strftime("%A")
-        is_playing_day = any(pd.day.value == today_day for pd in playing_days)
-        
-        if is_playing_day:
+        if is_playing_day(db, sport_group_id, today.date()):
             # Create a game for today
-            current_game = Game(
-                id=str(uuid.uuid4()),
-                sport_group_id=sport_group_id,
-                game_date=today.date(),
-                start_time=datetime.combine(today.date(), sport_group.game_start_time),
-                end_time=datetime.combine(today.date(), sport_group.game_end_time),
-                status=GameStatus.SCHEDULED            
-            )
-            db.add(current_game)
+            current_game, created = get_or_create_todays_game(db, sport_group, today.date())
             db.commit()
-            db.refresh(current_game)
+            if created:
+                invalidate_my_groups_for_group(sport_group_id)
         else:
             raise HTTPException(status_code=404, detail="No game scheduled for today")
     # Create participants
@@ -970,6 +984,11 @@ def manual_check_in(
     db.commit()
     for p in created:
         db.refresh(p)
+    background_tasks.add_task(lobby_manager.broadcast, sport_group_id, {
+        "type": "participants_added",
+        "game_id": current_game.id,
+        "participants": [GameDayParticipantOut.from_orm(p).dict() for p in created]
+    })
     return created
 
 
@@ -977,27 +996,15 @@ def manual_check_in(
 def get_manual_participants(
     sport_group_id: str,
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_group_context),
     db: Session = Depends(get_db)
 ):
     # Check if user is member of the sport group
-    membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.is_approved == True
-        )
-    ).first()
-    if not membership:
+    if not ctx.is_member:
         raise ForbiddenException("Only group members can view manual check-in participants")
     # Get today's game
     today = datetime.now(MOUNTAIN_TZ)
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])
-        )
-    ).first()
+    current_game = get_todays_game(db, sport_group_id, today.date())
     if not current_game:
         return []
     participants = db.query(GameDayParticipant).filter(GameDayParticipant.game_id == current_game.id).all()
@@ -1007,155 +1014,103 @@ def get_manual_participants(
 @router.post("/{sport_group_id}/manual-participants/assign-teams")
 def assign_teams_manual_participants(
     sport_group_id: str,
+    background_tasks: BackgroundTasks,
     assignments: Dict[int, list[int]] = Body(...),  # {team_number: [participant_ids]}
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_fresh_group_context),
     db: Session = Depends(get_db)
 ):
     # Check if user is group admin or creator
-    membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.is_approved == True
-        )
-    ).first()
-    sport_group = db.query(SportGroup).filter(SportGroup.id == sport_group_id).first()
-    if not membership or not sport_group:
-        raise ForbiddenException("Only group admins can assign teams")
-    is_admin = (membership.role == MemberRole.ADMIN or sport_group.creator_id == current_user.id)
-    if not is_admin:
+    if not ctx.group_exists or not ctx.is_member or not ctx.is_admin:
         raise ForbiddenException("Only group admins can assign teams")
+    sport_group = ctx.get_sport_group(db)
     # Get today's game
     today = datetime.now(MOUNTAIN_TZ)
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])
-        )
-    ).first()
+    current_game = get_todays_game(db, sport_group_id, today.date())
     if not current_game:
         raise HTTPException(status_code=404, detail="No game scheduled for today")
-    # Get all manual participants for this game, ordered by arrival
+    # Get all manual participants for this game, ordered by arrival, keyed by id
     all_participants = db.query(GameDayParticipant).filter(
         GameDayParticipant.game_id == current_game.id
     ).order_by(GameDayParticipant.created_at.asc()).all()
+    participants_by_id = {p.id: p for p in all_participants}
     first_10_ids = set(p.id for p in all_participants[:10])
-    # Enforce: Only first 10 arrivals can be assigned to Team 1 or 2
-    for team_number, participant_ids in assignments.items():
-        if team_number in [1, 2]:
-            for pid in participant_ids:
-                if pid not in first_10_ids:
-                    # Get the participant's name for a better error message
-                    participant = db.query(GameDayParticipant).filter(GameDayParticipant.id == pid).first()
-                    participant_name = participant.name if participant else f"Participant ID {pid}"
-                
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Only the first 10 arrivals can be assigned to Team 1 or 2. Player {participant_name} is not among the first 10 arrivals."
-                    )
-                    
-    # Check max_players_per_team constraint for each team
-    for team_number, participant_ids in assignments.items():
-        # Count current participants already assigned to this team
-        current_team_count = db.query(GameDayParticipant).filter(
-            and_(
-                GameDayParticipant.game_id == current_game.id,
-                GameDayParticipant.team == team_number
-            )
-        ).count()
-        
-        # Also count GamePlayers assigned to this team (registered users)
-        game_team = db.query(GameTeam).filter(
+
+    team_counts = _get_team_player_counts(db, current_game.id)
+
+    violations = _collect_assignment_violations(
+        assignments,
+        participants_by_id,
+        first_10_ids,
+        team_counts,
+        sport_group.max_players_per_team
+    )
+    if violations:
+        raise HTTPException(status_code=400, detail=" ".join(violations))
+
+    # Ensure teams 1 and 2 exist before assigning participants
+    existing_team_numbers = {
+        number for (number,) in db.query(GameTeam.team_number).filter(
             and_(
                 GameTeam.game_id == current_game.id,
-                GameTeam.team_number == team_number
+                GameTeam.team_number.in_([1, 2])
             )
-        ).first()
-        
-        registered_players_count = 0
-        if game_team:
-            registered_players_count = db.query(GamePlayer).filter(
-                and_(
-                    GamePlayer.game_id == current_game.id,
-                    GamePlayer.team_id == game_team.id
-                )
-            ).count()
-        
-        total_current_players = current_team_count + registered_players_count
-        
-        # Check if adding these participants would exceed the limit
-        if total_current_players + len(participant_ids) > sport_group.max_players_per_team:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cannot assign {len(participant_ids)} participants to Team {team_number}. "
-                       f"Team currently has {total_current_players} players. "
-                       f"Maximum players per team is {sport_group.max_players_per_team}."
-            )
-    # Ensure teams exist before assigning participants
+        ).all()
+    }
     for team_number in assignments.keys():
-        if team_number in [1, 2]:  # Only create teams 1 and 2 here
-            team = db.query(GameTeam).filter(
-                and_(
-                    GameTeam.game_id == current_game.id,
-                    GameTeam.team_number == team_number
-                )
-            ).first()
-            
-            if not team:
-                team = GameTeam(
-                    id=str(uuid.uuid4()),
-                    game_id=current_game.id,
-                    team_name=f"Team {team_number}",
-                    team_number=team_number
-                )
-                db.add(team)
-                db.flush()
-                print(f"Created team for manual participants: {team.team_name}")
+        if team_number in [1, 2] and team_number not in existing_team_numbers:
+            team = GameTeam(
+                id=str(uuid.uuid4()),
+                game_id=current_game.id,
+                team_name=f"Team {team_number}",
+                team_number=team_number
+            )
+            db.add(team)
+            existing_team_numbers.add(team_number)
+            print(f"Created team for manual participants: {team.team_name}")
 
-    # Assign teams
-    updated = []
-    for team_number, participant_ids in assignments.items():
-        for pid in participant_ids:
-            participant = db.query(GameDayParticipant).filter(GameDayParticipant.id == pid).first()
-            if participant:
-                participant.team = team_number
-                updated.append(participant)
+    # Assign teams with a single UPDATE ... SET team = CASE id ... END
+    team_by_participant = {
+        pid: team_number
+        for team_number, participant_ids in assignments.items()
+        for pid in participant_ids
+    }
+    if team_by_participant:
+        db.query(GameDayParticipant).filter(
+            and_(
+                GameDayParticipant.game_id == current_game.id,
+                GameDayParticipant.id.in_(list(team_by_participant))
+            )
+        ).update(
+            {GameDayParticipant.team: case(team_by_participant, value=GameDayParticipant.id)},
+            synchronize_session=False
+        )
     db.commit()
-    for p in updated:
-        db.refresh(p)
-    return {"success": True, "updated": [p.id for p in updated]}
+    if team_by_participant:
+        background_tasks.add_task(lobby_manager.broadcast, sport_group_id, {
+            "type": "team_assigned",
+            "game_id": current_game.id,
+            "participant_type": "manual",
+            "assignments": team_by_participant
+        })
+    return {"success": True, "updated": list(team_by_participant)}
 
 
 @router.post("/{sport_group_id}/manual-participants/auto-assign-teams", response_model=List[GameDayParticipantOut])
 def auto_assign_manual_participants(
     sport_group_id: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
+    ctx: GroupContext = Depends(get_fresh_group_context),
     db: Session = Depends(get_db)
 ):
     # Check if user is group admin or creator
-    membership = db.query(SportGroupMember).filter(
-        and_(
-            SportGroupMember.sport_group_id == sport_group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.is_approved == True
-        )
-    ).first()
-    sport_group = db.query(SportGroup).filter(SportGroup.id == sport_group_id).first()
-    if not membership or not sport_group:
-        raise ForbiddenException("Only group admins can auto-assign teams")
-    is_admin = (membership.role == MemberRole.ADMIN or sport_group.creator_id == current_user.id)
-    if not is_admin:
+    if not ctx.group_exists or not ctx.is_member or not ctx.is_admin:
         raise ForbiddenException("Only group admins can auto-assign teams")
+    sport_group = ctx.get_sport_group(db)
     # Get today's game
     today = datetime.now(MOUNTAIN_TZ)
-    current_game = db.query(Game).filter(
-        and_(
-            Game.sport_group_id == sport_group_id,
-            Game.game_date == today.date(),
-            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS])
-        )
-    ).first()
+    current_game = get_todays_game(db, sport_group_id, today.date())
     if not current_game:
         raise HTTPException(status_code=404, detail="No game scheduled for today")
     # Get all manual participants for this game who do not have a team
@@ -1192,6 +1147,7 @@ def auto_assign_manual_participants(
             db.flush()
             print(f"Created team for auto-assignment: {team.team_name}")
     
+    auto_assigned = {}
     for participant in unassigned:
         # Find the next team with available slot
         assigned = False
@@ -1199,12 +1155,20 @@ def auto_assign_manual_participants(
             if team_counts[t] < max_players_per_team:
                 participant.team = t
                 team_counts[t] += 1
+                auto_assigned[participant.id] = t
                 assigned = True
                 break
         if not assigned:
             # All teams are full, stop assigning
             break
     db.commit()
+    if auto_assigned:
+        background_tasks.add_task(lobby_manager.broadcast, sport_group_id, {
+            "type": "team_assigned",
+            "game_id": current_game.id,
+            "participant_type": "manual",
+            "assignments": auto_assigned
+        })
     # Return all manual participants
     participants = db.query(GameDayParticipant).filter(GameDayParticipant.game_id == current_game.id).all()
     return participants
\ No newline at end of file
@@ -1,11 +1,13 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 from uuid import UUID
 import uuid
 
 from app.core.database import get_db
+from app.core.pagination import keyset_paginate, set_next_cursor
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.sport_group import SportGroup, SportGroupMember, MemberRole
@@ -30,6 +32,9 @@ from app.schemas.game import (
     CoinTossRequest,
 )
 from app.core.exceptions import ForbiddenException
+from app.services.group_context import resolve_group_context
+from app.services.game_day_resolver import invalidate_todays_game
+from app.services.my_groups import invalidate_my_groups_for_group
 from datetime import datetime, timezone
 import random
 
@@ -55,26 +60,24 @@ def create_game(
 ):
     """Create a new game"""
     # Check if user is admin of the sport group
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game_data.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.role == MemberRole.ADMIN,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game_data.sport_group_id, current_user.id, fresh=True)
 
-    if not membership:
+    if ctx.role != MemberRole.ADMIN:
         raise ForbiddenException("Only group admins can create games")
 
     # Create game
     db_game = Game(**game_data.dict(exclude={"teams", "players"}))
 
-    db.add(db_game)
-    db.flush()  # Get the ID without committing
+    try:
+        # Get the ID without committing; the savepoint keeps the session usable on conflict
+        with db.begin_nested():
+            db.add(db_game)
+            db.flush()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This group already has an active game on that date"
+        )
 
     # Create teams
     for team_data in game_data.teams:
@@ -87,6 +90,8 @@ def create_game(
         db.add(player)
 
     db.commit()
+    invalidate_todays_game(db_game.sport_group_id)
+    invalidate_my_groups_for_group(db_game.sport_group_id)
     db.refresh(db_game)
 
     return db_game
@@ -94,36 +99,31 @@ def create_game(
 
 @router.get("/sport-group/{group_id}", response_model=List[GameResponse])
 def get_group_games(
-    group_id: int,
+    group_id: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Get games for a sport group"""
     # Check if user is member of the sport group
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.is_approved == True,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, group_id, current_user.id)
 
-    if not membership:
+    if not ctx.is_member:
         raise ForbiddenException("Only group members can view games")
 
-    games = (
-        db.query(Game)
-        .filter(Game.sport_group_id == group_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # Newest games first
+    games, next_cursor = keyset_paginate(
+        db.query(Game).filter(Game.sport_group_id == group_id),
+        [Game.game_date, Game.id],
+        limit,
+        cursor=cursor,
+        skip=skip,
+        descending=True,
     )
+    set_next_cursor(response, next_cursor)
     return games
 
 
@@ -141,19 +141,9 @@ def get_game(
         )
 
     # Check if user is member of the sport group
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.is_approved == True,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id)
 
-    if not membership:
+    if not ctx.is_member:
         raise ForbiddenException("Only group members can view games")
 
     return game
@@ -174,19 +164,9 @@ def update_game(
         )
 
     # Check if user is admin of the sport group
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.role == MemberRole.ADMIN,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
 
-    if not membership:
+    if ctx.role != MemberRole.ADMIN:
         raise ForbiddenException("Only group admins can update games")
 
     # Update game
@@ -195,6 +175,8 @@ def update_game(
         setattr(game, field, value)
 
     db.commit()
+    invalidate_todays_game(game.sport_group_id)
+    invalidate_my_groups_for_group(game.sport_group_id)
     db.refresh(game)
 
     return game
@@ -215,19 +197,10 @@ def update_game_timer(
         )
 
     # Check if user is referee or admin
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
 
-    is_referee = game.referee_id == membership.id if membership else False
-    is_admin = membership.role == MemberRole.ADMIN if membership else False
+    is_referee = game.referee_id == ctx.membership_id if ctx.has_membership else False
+    is_admin = ctx.role == MemberRole.ADMIN
 
     if not (is_referee or is_admin):
         raise ForbiddenException("Only referee or admin can control game timer")
@@ -251,6 +224,8 @@ def update_game_timer(
         game.timer_is_running = False
         if game.current_time <= 0:
             game.status = GameStatus.COMPLETED
+            invalidate_todays_game(game.sport_group_id)
+            invalidate_my_groups_for_group(game.sport_group_id)
     elif timer_update.action == "reset":
         game.current_time = timer_update.time or 0
         game.timer_is_running = False
@@ -674,32 +649,17 @@ def get_game_state(
                 ),
             }
 
-    # Get the sport group to check if user is admin
+    # Resolve the user's membership to check if user is admin
     game = db.query(Game).filter(Game.id == game_id).first()
-    sport_group = (
-        db.query(SportGroup).filter(SportGroup.id == game.sport_group_id).first()
-    )
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id)
 
     # Determine if user can control the match
     can_control_match = False
     referee_info = {"name": "No referee assigned", "team": "", "user_id": None}
 
-    if membership:
+    if ctx.has_membership:
         # Check if user is admin
-        is_admin = (
-            membership.role == MemberRole.ADMIN
-            or sport_group.creator_id == current_user.id
-        )
+        is_admin = ctx.is_admin
 
         can_control_match = is_admin
 
@@ -707,7 +667,7 @@ def get_game_state(
             referee_info = {
                 "name": "Admin Referee",
                 "team": "Administrator",
-                "user_id": membership.user_id,
+                "user_id": ctx.user_id,
             }
 
         return {
@@ -1103,23 +1063,9 @@ def create_manual_match(
         raise HTTPException(status_code=404, detail="Game not found")
 
     # Check permissions
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
 
-    sport_group = (
-        db.query(SportGroup).filter(SportGroup.id == game.sport_group_id).first()
-    )
-    is_admin = (
-        membership and membership.role == MemberRole.ADMIN
-    ) or sport_group.creator_id == current_user.id
+    is_admin = ctx.is_admin
 
     if not is_admin:
         raise HTTPException(status_code=403, detail="Only admins can create matches")
@@ -1216,24 +1162,9 @@ def coin_toss(
         raise HTTPException(status_code=404, detail="Game not found")
 
     # Check permissions
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.is_approved == True,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
 
-    sport_group = (
-        db.query(SportGroup).filter(SportGroup.id == game.sport_group_id).first()
-    )
-    is_admin = (
-        membership and membership.role == MemberRole.ADMIN
-    ) or sport_group.creator_id == current_user.id
+    is_admin = (ctx.is_member and ctx.role == MemberRole.ADMIN) or ctx.is_creator
 
     if not is_admin:
         raise ForbiddenException("Only admin can perform coin toss")
@@ -1376,18 +1307,8 @@ def assign_referee(
     game = db.query(Game).filter(Game.id == str(game_id)).first()
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.is_approved == True,
-            )
-        )
-        .first()
-    )
-    if not membership or membership.role != MemberRole.ADMIN:
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
+    if not ctx.is_member or ctx.role != MemberRole.ADMIN:
         raise ForbiddenException("Only admin can assign referee")
     game.referee_id = data["referee_id"]
     db.commit()
@@ -1406,18 +1327,9 @@ def update_team_score(
     game = db.query(Game).filter(Game.id == str(game_id)).first()
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
-    is_referee = game.referee_id == membership.id if membership else False
-    is_admin = membership.role == MemberRole.ADMIN if membership else False
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
+    is_referee = game.referee_id == ctx.membership_id if ctx.has_membership else False
+    is_admin = ctx.role == MemberRole.ADMIN
     if not (is_referee or is_admin):
         raise ForbiddenException("Only referee or admin can update scores")
 
@@ -1592,23 +1504,9 @@ def start_scheduled_match(
         )
 
     # Check permissions
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
 
-    sport_group = (
-        db.query(SportGroup).filter(SportGroup.id == game.sport_group_id).first()
-    )
-    is_admin = (
-        membership and membership.role == MemberRole.ADMIN
-    ) or sport_group.creator_id == current_user.id
+    is_admin = ctx.is_admin
 
     if not is_admin:
         raise HTTPException(status_code=403, detail="Only admins can start matches")
@@ -1659,24 +1557,10 @@ def update_match_score(
         raise HTTPException(status_code=404, detail="No active match found")
 
     # Check permissions
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
 
     # Check if user can control match (admin or referee)
-    sport_group = (
-        db.query(SportGroup).filter(SportGroup.id == game.sport_group_id).first()
-    )
-    is_admin = (
-        membership and membership.role == MemberRole.ADMIN
-    ) or sport_group.creator_id == current_user.id
+    is_admin = ctx.is_admin
 
     if not is_admin:
         raise HTTPException(status_code=403, detail="Only admins can update scores")
@@ -3060,18 +2944,9 @@ def start_match(
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
-    is_referee = game.referee_id == membership.id if membership else False
-    is_admin = membership.role == MemberRole.ADMIN if membership else False
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
+    is_referee = game.referee_id == ctx.membership_id if ctx.has_membership else False
+    is_admin = ctx.role == MemberRole.ADMIN
     if not (is_referee or is_admin):
         raise ForbiddenException("Only referee or admin can start matches")
 
@@ -3348,18 +3223,9 @@ def end_match(
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
-    is_referee = game.referee_id == membership.id if membership else False
-    is_admin = membership.role == MemberRole.ADMIN if membership else False
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
+    is_referee = game.referee_id == ctx.membership_id if ctx.has_membership else False
+    is_admin = ctx.role == MemberRole.ADMIN
     if not (is_referee or is_admin):
         raise ForbiddenException("Only referee or admin can end matches")
 
@@ -3406,19 +3272,10 @@ def check_in_player(
         )
 
     # Check if current user is the player or admin
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
 
-    is_player = player.member_id == membership.id if membership else False
-    is_admin = membership.role == MemberRole.ADMIN if membership else False
+    is_player = player.member_id == ctx.membership_id if ctx.has_membership else False
+    is_admin = ctx.role == MemberRole.ADMIN
 
     if not (is_player or is_admin):
         raise ForbiddenException("Only the player or admin can check in")
@@ -3451,19 +3308,9 @@ def get_game_players(
         )
 
     # Check if user is member of the sport group
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.is_approved == True,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id)
 
-    if not membership:
+    if not ctx.is_member:
         raise ForbiddenException("Only group members can view game players")
 
     players = db.query(GamePlayer).filter(GamePlayer.game_id == str(game_id)).all()
@@ -3486,19 +3333,10 @@ def update_player_stats(
         )
 
     # Check if user is referee or admin
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id, fresh=True)
 
-    is_referee = game.referee_id == membership.id if membership else False
-    is_admin = membership.role == MemberRole.ADMIN if membership else False
+    is_referee = game.referee_id == ctx.membership_id if ctx.has_membership else False
+    is_admin = ctx.role == MemberRole.ADMIN
 
     if not (is_referee or is_admin):
         raise ForbiddenException("Only referee or admin can update player stats")
@@ -3541,18 +3379,8 @@ def get_available_teams(
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == game.sport_group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.is_approved == True,
-            )
-        )
-        .first()
-    )
-    if not membership:
+    ctx = resolve_group_context(db, game.sport_group_id, current_user.id)
+    if not ctx.is_member:
         raise ForbiddenException("Only group members can view available teams")
 
     # Get all teams for this game
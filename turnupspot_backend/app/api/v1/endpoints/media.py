@@ -0,0 +1,128 @@
+import os
+import tempfile
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.schemas.media import MediaKind, MediaUploadRequest, MediaUploadResponse
+from app.services.media import UPLOAD_KEY_PREFIX, sniff_image_type
+from app.services.storage import LocalStorage, get_storage
+
+router = APIRouter()
+
+_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "application/pdf": ".pdf",
+}
+
+
+def _allowed_types(kind: MediaKind):
+    if kind == MediaKind.CHAT:
+        return settings.ALLOWED_ATTACHMENT_TYPES
+    return settings.ALLOWED_IMAGE_TYPES
+
+
+@router.post("/uploads", response_model=MediaUploadResponse)
+def create_upload(
+    upload_in: MediaUploadRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Presign a direct upload of a venue image, profile image or chat attachment.
+
+    The client sends the file straight to storage and then saves the returned
+    ``public_url`` on the group, profile or message. Every upload gets a fresh
+    key, so the URL never changes content and can be cached forever.
+    """
+    allowed_types = _allowed_types(upload_in.kind)
+    if upload_in.content_type not in allowed_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type. Allowed types: {', '.join(allowed_types)}"
+        )
+    if upload_in.size > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File is larger than {settings.MAX_FILE_SIZE // (1024 * 1024)}MB"
+        )
+
+    extension = _EXTENSIONS.get(upload_in.content_type, "")
+    key = f"{UPLOAD_KEY_PREFIX}/{upload_in.kind.value}_{uuid.uuid4().hex}{extension}"
+    upload = get_storage().presigned_upload(
+        key,
+        upload_in.content_type,
+        upload_in.size,
+        settings.PRESIGNED_UPLOAD_EXPIRE_SECONDS,
+    )
+    return MediaUploadResponse(
+        key=upload.key,
+        upload_url=upload.url,
+        method=upload.method,
+        fields=upload.fields,
+        headers=upload.headers,
+        public_url=upload.public_url,
+        expires_in=upload.expires_in,
+    )
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@router.put("/local-uploads/{token}", status_code=status.HTTP_204_NO_CONTENT)
+async def receive_local_upload(token: str, request: Request):
+    """Upload target of presigned URLs when files are stored on local disk"""
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    try:
+        grant = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Upload URL is invalid or expired")
+    if grant.get("purpose") != "upload" or not grant.get("key"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Upload URL is invalid or expired")
+
+    content_type = grant["content_type"]
+    if request.headers.get("content-type") != content_type:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Content-Type must be {content_type}"
+        )
+    if await run_in_threadpool(storage.exists, grant["key"]):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="File has already been uploaded")
+
+    fd, temp_path = await run_in_threadpool(tempfile.mkstemp, suffix=".part")
+    buffer = await run_in_threadpool(os.fdopen, fd, "wb")
+    size = 0
+    try:
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            if size == 0 and content_type.startswith("image/") and sniff_image_type(chunk) != content_type:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="File content does not match its type"
+                )
+            size += len(chunk)
+            if size > grant["max_size"]:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="File is larger than the size it was presigned for"
+                )
+            await run_in_threadpool(buffer.write, chunk)
+        await run_in_threadpool(buffer.close)
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty")
+        await run_in_threadpool(storage.save_file, grant["key"], temp_path, content_type)
+    finally:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(_remove_quietly, temp_path)
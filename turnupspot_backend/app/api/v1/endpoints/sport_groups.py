@@ -8,12 +8,14 @@ from fastapi import (
     File,
     UploadFile,
     Form,
+    Response,
+    Request,
+    BackgroundTasks,
 )
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 import uuid
-from io import BytesIO
-from fastapi.responses import StreamingResponse
 import os
 from datetime import datetime
 from sqlalchemy.orm import Session, selectinload
@@ -21,6 +23,7 @@ from uuid import uuid4
 import logging
 
 from app.core.database import get_db
+from app.core.pagination import keyset_paginate, set_next_cursor
 from app.api.deps import get_current_user, get_optional_current_user
 from app.models.user import User
 from app.models.sport_group import (
@@ -42,14 +45,32 @@ from app.schemas.sport_group import (
     SportGroupResponse,
     SportGroupJoinRequest,
     SportGroupMemberResponse,
+    SportGroupNearbyResponse,
+    MySportGroupResponse,
 )
 from app.core.exceptions import (
     GroupNotFoundException,
     ForbiddenException,
     UnauthorizedException,
 )
-from app.services.geocoding import geocoding_service
-from app.services.qr_code import generate_qr_code
+from app.services.geocoding import get_geocoding_service
+from app.services.group_context import (
+    resolve_group_context,
+    invalidate_group,
+    invalidate_membership,
+)
+from app.services.game_day_resolver import invalidate_playing_days, invalidate_todays_game
+from app.services.member_counts import member_added, member_removed, member_approved
+from app.services.group_search import search_sport_groups
+from app.services.geo_search import find_nearby_groups
+from app.services.my_groups import get_my_groups, invalidate_my_groups, invalidate_my_groups_for_group
+from app.tasks.cleanup import delete_sport_group as delete_sport_group_task, run_sport_group_deletion
+from app.services.group_deletion import deletion_task_id, deletion_task_owner
+from app.tasks.media import generate_venue_image_variants, build_venue_image_variants
+from app.celery_app import celery_app
+from app.services.media import StoredFile, store_image_upload, variant_url
+from app.services.storage import get_storage
+from app.services.qr_code import QR_FORMATS, QR_SIZES, get_invite_qr, invite_qr_digest, prerender_invite_qr
 from app.services.team_formation import (
     form_teams_first_come,
     form_teams_random,
@@ -65,42 +86,39 @@ from app.services.stats import submit_stat, approve_stat, reject_stat, get_pendi
 router = APIRouter()
 
 
-@router.get("/my", response_model=List[SportGroupResponse])
+@router.get("/my", response_model=List[MySportGroupResponse])
 def get_my_sport_groups(
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    # Groups created by user
-    created = db.query(SportGroup).filter(SportGroup.created_by == current_user.email)
-    # Groups where user is a member
-    member = (
-        db.query(SportGroup)
-        .join(SportGroupMember)
-        .filter(SportGroupMember.user_id == current_user.id)
-    )
-    groups = (
-        db.query(SportGroup)
-        .join(SportGroupMember, SportGroupMember.sport_group_id == SportGroup.id)
-        .options(
-            selectinload(SportGroup.playing_days)  # Explicitly load the relationship
-        )
-        .filter(SportGroupMember.user_id == current_user.id)
-        .all()
-    )
+    """Groups the user belongs to, with their role, member counts and game info"""
+    return get_my_groups(db, current_user.id)
+
+
+def _queue_venue_image_variants(background_tasks: BackgroundTasks, filename: str):
+    """Hand thumbnail and WebP generation to the worker, or to this process without a broker"""
+    try:
+        generate_venue_image_variants.delay(filename)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not queue image variants for {filename}: {str(e)}")
+        background_tasks.add_task(build_venue_image_variants, filename)
 
-    return groups
 
-    # # Union and remove duplicates
-    # groups = {g.id: g for g in created.all()}
-    # for g in member.all():
-    #     groups[g.id] = g
-    # # Add member count to each group
-    # for group in groups.values():
-    #     group.member_count = len([m for m in group.members if m.is_approved])
-    # return list(groups.values())
+def _discard_unused_venue_image(db: Session, stored_image: StoredFile):
+    """Delete a venue image stored for a group that was not created
+
+    Only an object this request stored is removed, and only while no group
+    points at it: identical uploads share one object.
+    """
+    if not stored_image.is_new:
+        return
+    if db.query(SportGroup.id).filter(SportGroup.venue_image_url == stored_image.url).first():
+        return
+    get_storage().delete(stored_image.key)
 
 
 @router.post("/", response_model=SportGroupResponse)
 async def create_sport_group(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     description: str = Form(...),
     venue_name: str = Form(...),
@@ -130,29 +148,6 @@ async def create_sport_group(
             detail="Latitude and longitude are required",
         )
 
-    # Handle venue image upload
-    venue_image_url = None
-    if venue_image:
-        # Create uploads directory if it doesn't exist
-        upload_dir = "static/uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-
-        # Generate unique filename
-        file_extension = (
-            os.path.splitext(venue_image.filename)[1]
-            if venue_image.filename
-            else ".jpg"
-        )
-        filename = f"venue_{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(upload_dir, filename)
-
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await venue_image.read()
-            buffer.write(content)
-
-        venue_image_url = f"/static/uploads/{filename}"
-
     # Parse game times
     try:
         game_start_datetime = datetime.strptime(game_start_time, "%H:%M")
@@ -163,21 +158,37 @@ async def create_sport_group(
             detail="Invalid time format. Use HH:MM format",
         )
 
+    # Parse the JSON string to get list of day objects
+    import json
+
+    try:
+        days = [Day(day_data["day"]) for day_data in json.loads(playing_days)]  # Convert strings to Day enum
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid playing_days format: {str(e)}"
+        )
     try:
-        # Parse the JSON string to get list of day objects
-        import json
+        sport = SportsType(sports_type)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid sports_type: {sports_type}")
 
-        playing_days_data = json.loads(playing_days)
+    # Handle venue image upload, once the form is known to be valid
+    venue_image_url = None
+    stored_image = None
+    if venue_image:
+        stored_image = await store_image_upload(venue_image, prefix="venue")
+        venue_image_url = stored_image.url
 
+    try:
         # Convert to PlayingDay model instances
-        playing_days_objects = []
-        for day_data in playing_days_data:
-            playing_day = PlayingDay(
+        playing_days_objects = [
+            PlayingDay(
                 id=str(uuid4()),
-                day=Day(day_data["day"]),  # Convert string to Day enum
+                day=day,
                 sport_group_id=None,  # Will be set when SportGroup is created
             )
-            playing_days_objects.append(playing_day)
+            for day in days
+        ]
 
         # Create new sport group
         db_sport_group = SportGroup(
@@ -197,9 +208,11 @@ async def create_sport_group(
             game_config=game_config,
             min_players_per_team=min_players_per_team,
             referee_required=referee_required,
-            sports_type=SportsType(sports_type),
+            sports_type=sport,
             created_by=current_user.email,
             creator_id=current_user.id,
+            # Counts the creator's membership added below
+            approved_member_count=1,
         )
 
         db.add(db_sport_group)
@@ -220,16 +233,18 @@ async def create_sport_group(
         db.add(creator_membership)
 
         db.commit()
+        invalidate_my_groups(current_user.id)
+        if stored_image:
+            _queue_venue_image_variants(background_tasks, stored_image.filename)
+        background_tasks.add_task(prerender_invite_qr, db_sport_group.id)
         db.refresh(db_sport_group)
 
         return db_sport_group
 
-    except json.JSONDecodeError as e:
-        raise HTTPException(
-            status_code=400, detail=f"Invalid playing_days format: {str(e)}"
-        )
     except Exception as e:
         db.rollback()
+        if stored_image:
+            _discard_unused_venue_image(db, stored_image)
         raise HTTPException(
             status_code=500, detail=f"Error creating sport group: {str(e)}"
         )
@@ -237,37 +252,61 @@ async def create_sport_group(
 
 @router.get("/", response_model=List[SportGroupResponse])
 def get_sport_groups(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     sport_type: Optional[SportsType] = None,
     search: Optional[str] = None,
     db: Session = Depends(get_db),
     # current_user: Optional[User] = Depends(get_current_user)  # Removed for public access
 ):
-    """Get all sport groups with optional filtering"""
-    query = db.query(SportGroup).filter(SportGroup.is_active == True)
+    """Get all sport groups with optional filtering
 
-    if sport_type:
-        query = query.filter(SportGroup.sport_type == sport_type)
-
-    if search:
-        query = query.filter(
-            or_(
-                SportGroup.name.ilike(f"%{search}%"),
-                SportGroup.description.ilike(f"%{search}%"),
-                SportGroup.venue_name.ilike(f"%{search}%"),
-            )
+    Pass the X-Next-Cursor response header back as ``cursor`` for the next page.
+    """
+    if search and search.strip():
+        groups, next_cursor = search_sport_groups(
+            db, search, limit, cursor=cursor, skip=skip, sports_type=sport_type
         )
+        set_next_cursor(response, next_cursor)
+        return groups
+
+    query = (
+        db.query(SportGroup)
+        .options(selectinload(SportGroup.playing_days))
+        .filter(SportGroup.is_active == True)
+    )
 
-    groups = query.offset(skip).limit(limit).all()
+    if sport_type:
+        query = query.filter(SportGroup.sports_type == sport_type)
 
-    # Add member count to each group
-    for group in groups:
-        group.member_count = len([m for m in group.members if m.is_approved])
+    groups, next_cursor = keyset_paginate(
+        query, [SportGroup.created_at, SportGroup.id], limit, cursor=cursor, skip=skip
+    )
+    set_next_cursor(response, next_cursor)
 
     return groups
 
 
+@router.get("/nearby", response_model=List[SportGroupNearbyResponse])
+def get_nearby_sport_groups(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=500),
+    limit: int = Query(20, ge=1, le=100),
+    sport_type: Optional[SportsType] = None,
+    db: Session = Depends(get_db),
+):
+    """Get the active sport groups closest to a point, nearest first"""
+    nearby = find_nearby_groups(db, lat, lng, radius_km, limit, sports_type=sport_type)
+
+    for group, distance in nearby:
+        group.distance_km = round(distance, 3)
+
+    return [group for group, _ in nearby]
+
+
 @router.get("/{sport_group_id}", response_model=SportGroupResponse)
 def get_sport_group(
     sport_group_id: str,
@@ -281,28 +320,16 @@ def get_sport_group(
             status_code=status.HTTP_404_NOT_FOUND, detail="Sport group not found"
         )
 
-    # Add member count
-    sport_group.member_count = len([m for m in sport_group.members if m.is_approved])
-
     # Add current user's membership status if authenticated
     if current_user:
-        user_membership = (
-            db.query(SportGroupMember)
-            .filter(
-                and_(
-                    SportGroupMember.sport_group_id == sport_group_id,
-                    SportGroupMember.user_id == current_user.id,
-                )
-            )
-            .first()
-        )
+        ctx = resolve_group_context(db, sport_group_id, current_user.id)
 
-        if user_membership:
+        if ctx.has_membership:
             sport_group.current_user_membership = {
-                "is_member": user_membership.is_approved,
-                "is_pending": not user_membership.is_approved,
-                "role": user_membership.role,
-                "is_creator": sport_group.creator_id == current_user.id,
+                "is_member": ctx.is_approved,
+                "is_pending": not ctx.is_approved,
+                "role": ctx.role,
+                "is_creator": ctx.is_creator,
             }
         else:
             sport_group.current_user_membership = {
@@ -321,6 +348,7 @@ def get_sport_group(
 def update_sport_group(
     sport_group_id: str,
     sport_group_update: SportGroupUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -342,8 +370,8 @@ def update_sport_group(
     # If venue address is being updated, get new coordinates
     update_data = sport_group_update.dict(exclude_unset=True)
     if "venue_address" in update_data:
-        latitude, longitude = geocoding_service.get_coordinates(
-            update_data["venue_address"]
+        latitude, longitude = get_geocoding_service().get_coordinates(
+            update_data["venue_address"], db
         )
         if not latitude or not longitude:
             raise HTTPException(
@@ -353,6 +381,13 @@ def update_sport_group(
         update_data["venue_latitude"] = latitude
         update_data["venue_longitude"] = longitude
 
+    # A new image gets its thumbnail regenerated
+    new_image_filename = None
+    if "venue_image_url" in update_data and update_data["venue_image_url"] != db_sport_group.venue_image_url:
+        update_data["venue_thumbnail_url"] = None
+        if variant_url(update_data["venue_image_url"], "thumb"):
+            new_image_filename = update_data["venue_image_url"].rsplit("/", 1)[1]
+
     # Handle playing_days separately
     playing_days_update = update_data.pop("playing_days", None)
 
@@ -380,18 +415,25 @@ def update_sport_group(
                 db.add(playing_day)
 
     db.commit()
+    invalidate_group(sport_group_id)
+    invalidate_playing_days(sport_group_id)
+    invalidate_todays_game(sport_group_id)
+    invalidate_my_groups_for_group(sport_group_id)
+    if new_image_filename:
+        _queue_venue_image_variants(background_tasks, new_image_filename)
     db.refresh(db_sport_group)
 
     return db_sport_group
 
 
-@router.delete("/{sport_group_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{sport_group_id}", status_code=status.HTTP_202_ACCEPTED)
 def delete_sport_group(
     sport_group_id: str,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Delete a sport group and all related records"""
+    """Deactivate a sport group now and delete it with all related records in the background"""
     logger = logging.getLogger(__name__)
 
     db_sport_group = (
@@ -408,207 +450,39 @@ def delete_sport_group(
             detail="Not authorized to delete this sport group",
         )
 
-    try:
-        logger.info(f"Starting deletion of sport group {sport_group_id}")
-
-        # Check what related records exist before deletion
-        members_count = (
-            db.query(SportGroupMember)
-            .filter(SportGroupMember.sport_group_id == sport_group_id)
-            .count()
-        )
-        games_count = (
-            db.query(Game).filter(Game.sport_group_id == sport_group_id).count()
-        )
-        teams_count = (
-            db.query(Team).filter(Team.sport_group_id == sport_group_id).count()
-        )
-        chat_rooms_count = (
-            db.query(ChatRoom).filter(ChatRoom.sport_group_id == sport_group_id).count()
-        )
-        chat_messages_count = (
-            db.query(ChatMessage)
-            .filter(
-                ChatMessage.chat_room_id.in_(
-                    db.query(ChatRoom.id).filter(
-                        ChatRoom.sport_group_id == sport_group_id
-                    )
-                )
-            )
-            .count()
-        )
-        game_teams_count = (
-            db.query(GameTeam)
-            .filter(
-                GameTeam.game_id.in_(
-                    db.query(Game.id).filter(Game.sport_group_id == sport_group_id)
-                )
-            )
-            .count()
-        )
-        game_players_count = (
-            db.query(GamePlayer)
-            .filter(
-                GamePlayer.game_id.in_(
-                    db.query(Game.id).filter(Game.sport_group_id == sport_group_id)
-                )
-            )
-            .count()
-        )
-        matches_count = (
-            db.query(Match)
-            .filter(
-                Match.game_id.in_(
-                    db.query(Game.id).filter(Game.sport_group_id == sport_group_id)
-                )
-            )
-            .count()
-        )
-        team_members_count = (
-            db.query(TeamMember)
-            .filter(
-                TeamMember.team_id.in_(
-                    db.query(Team.id).filter(Team.sport_group_id == sport_group_id)
-                )
-            )
-            .count()
-        )
-        game_day_participants_count = (
-            db.query(GameDayParticipant)
-            .filter(
-                GameDayParticipant.game_id.in_(
-                    db.query(Game.id).filter(Game.sport_group_id == sport_group_id)
-                )
-            )
-            .count()
-        )
-        logger.info(
-            f"Before deletion: {members_count} members, {games_count} games, {teams_count} teams, {chat_rooms_count} chat rooms, {chat_messages_count} chat messages, {game_teams_count} game teams, {game_players_count} game players, {matches_count} matches, {team_members_count} team members, {game_day_participants_count} game day participants"
-        )
-
-        # Delete in correct order to avoid foreign key violations
-
-        # 1. Delete chat messages first
-        chat_messages_deleted = (
-            db.query(ChatMessage)
-            .filter(
-                ChatMessage.chat_room_id.in_(
-                    db.query(ChatRoom.id).filter(
-                        ChatRoom.sport_group_id == sport_group_id
-                    )
-                )
-            )
-            .delete(synchronize_session=False)
-        )
-        logger.info(f"Deleted {chat_messages_deleted} chat messages")
-
-        # 2. Delete chat rooms
-        chat_rooms_deleted = (
-            db.query(ChatRoom)
-            .filter(ChatRoom.sport_group_id == sport_group_id)
-            .delete()
-        )
-        logger.info(f"Deleted {chat_rooms_deleted} chat rooms")
-
-        # 3. Delete matches first (they reference game_teams)
-        matches_deleted = (
-            db.query(Match)
-            .filter(
-                Match.game_id.in_(
-                    db.query(Game.id).filter(Game.sport_group_id == sport_group_id)
-                )
-            )
-            .delete(synchronize_session=False)
-        )
-        logger.info(f"Deleted {matches_deleted} matches")
-
-        # 4. Delete game players
-        game_players_deleted = (
-            db.query(GamePlayer)
-            .filter(
-                GamePlayer.game_id.in_(
-                    db.query(Game.id).filter(Game.sport_group_id == sport_group_id)
-                )
-            )
-            .delete(synchronize_session=False)
-        )
-        logger.info(f"Deleted {game_players_deleted} game players")
-
-        # 5. Delete game teams
-        game_teams_deleted = (
-            db.query(GameTeam)
-            .filter(
-                GameTeam.game_id.in_(
-                    db.query(Game.id).filter(Game.sport_group_id == sport_group_id)
-                )
-            )
-            .delete(synchronize_session=False)
-        )
-        logger.info(f"Deleted {game_teams_deleted} game teams")
-
-        # 6. Delete game day participants
-        game_day_participants_deleted = (
-            db.query(GameDayParticipant)
-            .filter(
-                GameDayParticipant.game_id.in_(
-                    db.query(Game.id).filter(Game.sport_group_id == sport_group_id)
-                )
-            )
-            .delete(synchronize_session=False)
-        )
-        logger.info(f"Deleted {game_day_participants_deleted} game day participants")
-
-        # 7. Delete games
-        games_deleted = (
-            db.query(Game).filter(Game.sport_group_id == sport_group_id).delete()
-        )
-        logger.info(f"Deleted {games_deleted} games")
-
-        # 7. Delete team members
-        team_members_deleted = (
-            db.query(TeamMember)
-            .filter(
-                TeamMember.team_id.in_(
-                    db.query(Team.id).filter(Team.sport_group_id == sport_group_id)
-                )
-            )
-            .delete(synchronize_session=False)
-        )
-        logger.info(f"Deleted {team_members_deleted} team members")
-
-        # 8. Delete teams
-        teams_deleted = (
-            db.query(Team).filter(Team.sport_group_id == sport_group_id).delete()
-        )
-        logger.info(f"Deleted {teams_deleted} teams")
-
-        # 9. Delete sport group members
-        members_deleted = (
-            db.query(SportGroupMember)
-            .filter(SportGroupMember.sport_group_id == sport_group_id)
-            .delete()
-        )
-        logger.info(f"Deleted {members_deleted} sport group members")
-
-        # Finally delete the sport group (playing days will be deleted via cascade)
-        db.delete(db_sport_group)
-        logger.info(f"Deleted sport group {sport_group_id}")
-
-        db.commit()
+    # Hidden from listings and closed to joins straight away
+    db_sport_group.is_active = False
+    db.commit()
+    invalidate_group(sport_group_id)
+    invalidate_playing_days(sport_group_id)
+    invalidate_todays_game(sport_group_id)
+    invalidate_my_groups_for_group(sport_group_id)
 
+    try:
+        task = delete_sport_group_task.apply_async(args=[sport_group_id], task_id=deletion_task_id(current_user.id))
+        task_id = task.id
     except Exception as e:
-        logger.error(f"Error deleting sport group {sport_group_id}: {str(e)}")
-        logger.error(f"Exception type: {type(e).__name__}")
-        import traceback
+        # No broker reachable: run it in this process after the response
+        logger.warning(f"Could not queue deletion of sport group {sport_group_id}: {str(e)}")
+        background_tasks.add_task(run_sport_group_deletion, sport_group_id)
+        task_id = None
+
+    return {"message": "Sport group deletion started", "task_id": task_id}
 
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete sport group: {str(e)}",
-        )
 
-    return None
+@router.get("/deletions/{task_id}")
+def get_sport_group_deletion_status(
+    task_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """Progress of a background sport group deletion (requester only)"""
+    if deletion_task_owner(task_id) != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion not found")
+    result = celery_app.AsyncResult(task_id)
+    info = result.info if isinstance(result.info, dict) else {}
+    if result.failed():
+        info = {"error": str(result.info)}
+    return {"task_id": task_id, "state": result.state, **info}
 
 
 @router.post("/{group_id}/join")
@@ -629,19 +503,10 @@ def join_sport_group(
         raise GroupNotFoundException()
 
     # Check if user is already a member
-    existing_membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, group_id, current_user.id, fresh=True)
 
-    if existing_membership:
-        if existing_membership.is_approved:
+    if ctx.has_membership:
+        if ctx.is_approved:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="You are already a member of this group",
@@ -660,8 +525,21 @@ def join_sport_group(
         is_approved=False,  # Requires approval
     )
 
-    db.add(membership)
+    try:
+        # A concurrent request for the same user loses on the unique constraint
+        with db.begin_nested():
+            db.add(membership)
+            db.flush()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Your join request is pending approval",
+        )
+    member_added(db, membership)
     db.commit()
+    invalidate_membership(group_id, current_user.id)
+    invalidate_my_groups(current_user.id)
+    invalidate_my_groups_for_group(group_id)
 
     return {"message": "Join request submitted successfully"}
 
@@ -673,33 +551,35 @@ def leave_sport_group(
     db: Session = Depends(get_db),
 ):
     """Leave a sport group"""
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, group_id, current_user.id, fresh=True)
 
-    if not membership:
+    if not ctx.has_membership:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You are not a member of this group",
         )
 
     # Check if user is the creator
-    group = db.query(SportGroup).filter(SportGroup.id == group_id).first()
-    if group and group.creator_id == current_user.id:
+    if ctx.is_creator:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Group creator cannot leave the group. Transfer ownership or delete the group.",
         )
 
+    membership = ctx.get_membership(db)
+    if not membership:
+        # Removed since the context was read
+        invalidate_membership(group_id, current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You are not a member of this group",
+        )
     db.delete(membership)
+    member_removed(db, membership)
     db.commit()
+    invalidate_membership(group_id, current_user.id)
+    invalidate_my_groups(current_user.id)
+    invalidate_my_groups_for_group(group_id)
 
     return {"message": "Left group successfully"}
 
@@ -712,23 +592,12 @@ def get_group_members(
     db: Session = Depends(get_db),
 ):
     """Get group members"""
-    group = db.query(SportGroup).filter(SportGroup.id == group_id).first()
-    if not group:
+    ctx = resolve_group_context(db, group_id, current_user.id)
+    if not ctx.group_exists:
         raise GroupNotFoundException()
 
     # Check if user is a member of the group
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == group_id,
-                SportGroupMember.user_id == current_user.id,
-            )
-        )
-        .first()
-    )
-
-    if not membership:
+    if not ctx.has_membership:
         raise ForbiddenException("Only group members can view member list")
 
     query = db.query(SportGroupMember).filter(
@@ -753,19 +622,9 @@ def approve_member(
 ):
     """Approve a member join request (admin only)"""
     # Check if current user is admin of the group
-    admin_membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.role == MemberRole.ADMIN,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, group_id, current_user.id, fresh=True)
 
-    if not admin_membership:
+    if ctx.role != MemberRole.ADMIN:
         raise ForbiddenException("Only group admins can approve members")
 
     # Get the membership to approve
@@ -785,8 +644,13 @@ def approve_member(
             status_code=status.HTTP_404_NOT_FOUND, detail="Member not found"
         )
 
-    membership.is_approved = True
+    if not membership.is_approved:
+        membership.is_approved = True
+        member_approved(db, membership)
     db.commit()
+    invalidate_membership(group_id, membership.user_id)
+    invalidate_my_groups(membership.user_id)
+    invalidate_my_groups_for_group(group_id)
 
     return {"message": "Member approved successfully"}
 
@@ -800,19 +664,9 @@ def remove_member(
 ):
     """Remove a member from the group (admin only)"""
     # Check if current user is admin of the group
-    admin_membership = (
-        db.query(SportGroupMember)
-        .filter(
-            and_(
-                SportGroupMember.sport_group_id == group_id,
-                SportGroupMember.user_id == current_user.id,
-                SportGroupMember.role == MemberRole.ADMIN,
-            )
-        )
-        .first()
-    )
+    ctx = resolve_group_context(db, group_id, current_user.id, fresh=True)
 
-    if not admin_membership:
+    if ctx.role != MemberRole.ADMIN:
         raise ForbiddenException("Only group admins can remove members")
 
     # Get the membership to remove
@@ -833,15 +687,18 @@ def remove_member(
         )
 
     # Check if trying to remove the group creator
-    group = db.query(SportGroup).filter(SportGroup.id == group_id).first()
-    if group and group.creator_id == membership.user_id:
+    if ctx.group_exists and ctx.creator_id == membership.user_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot remove group creator",
         )
 
     db.delete(membership)
+    member_removed(db, membership)
     db.commit()
+    invalidate_membership(group_id, membership.user_id)
+    invalidate_my_groups(membership.user_id)
+    invalidate_my_groups_for_group(group_id)
 
     return {"message": "Member removed successfully"}
 
@@ -854,16 +711,8 @@ def make_member_admin(
     current_user: User = Depends(get_current_user),
 ):
     # Check if current_user is admin of the group
-    membership = (
-        db.query(SportGroupMember)
-        .filter(
-            SportGroupMember.sport_group_id == group_id,
-            SportGroupMember.user_id == current_user.id,
-            SportGroupMember.role == MemberRole.ADMIN,
-        )
-        .first()
-    )
-    if not membership:
+    ctx = resolve_group_context(db, group_id, current_user.id, fresh=True)
+    if ctx.role != MemberRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
 
     # Find the member to promote
@@ -880,16 +729,43 @@ def make_member_admin(
 
     member.role = MemberRole.ADMIN
     db.commit()
+    invalidate_membership(group_id, member.user_id)
+    invalidate_my_groups(member.user_id)
     db.refresh(member)
     return {"message": "Member promoted to admin"}
 
 
 # QR Code Invite Endpoint
 @router.get("/{group_id}/invite/qr")
-def get_group_invite_qr(group_id: str):
-    invite_url = f"https://yourapp.com/join/{group_id}"
-    qr_bytes = generate_qr_code(invite_url)
-    return StreamingResponse(BytesIO(qr_bytes), media_type="image/png")
+def get_group_invite_qr(
+    group_id: str,
+    request: Request,
+    size: str = Query("medium", description=f"One of: {', '.join(QR_SIZES)}"),
+    format: str = Query("png", description=f"One of: {', '.join(QR_FORMATS)}"),
+    db: Session = Depends(get_db),
+):
+    """Invite QR code of a group, rendered once and revalidated by ETag"""
+    if size not in QR_SIZES or format not in QR_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported QR variant. Sizes: {', '.join(QR_SIZES)}; formats: {', '.join(QR_FORMATS)}",
+        )
+
+    # Checked before revalidating, so a deleted group's cached image isn't kept alive
+    if not db.query(SportGroup.id).filter(SportGroup.id == group_id).first():
+        raise GroupNotFoundException()
+
+    # The image depends only on the group id, so revalidation needs no rendering.
+    # The URL is not content-addressed (a new render version changes what it
+    # serves), so clients revalidate every time rather than caching for good.
+    etag = f'"{invite_qr_digest(group_id, size, format)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    content, _ = get_invite_qr(group_id, size, format)
+    return Response(content=content, media_type=QR_FORMATS[format], headers=headers)
 
 
 # Team Formation Endpoint
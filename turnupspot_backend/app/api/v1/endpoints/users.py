@@ -1,8 +1,9 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.pagination import keyset_paginate, set_next_cursor
 from app.api.deps import get_current_user, get_current_admin_user
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
@@ -50,13 +51,16 @@ def get_user_by_id(
 
 @router.get("/", response_model=List[UserResponse])
 def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get all users (admin only)"""
-    users = db.query(User).offset(skip).limit(limit).all()
+    users, next_cursor = keyset_paginate(db.query(User), [User.id], limit, cursor=cursor, skip=skip)
+    set_next_cursor(response, next_cursor)
     return users
 
 
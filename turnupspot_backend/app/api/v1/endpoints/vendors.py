@@ -1,9 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from app.core.database import get_db
+from app.core.pagination import keyset_paginate, set_next_cursor
 from app.api.deps import get_current_user, get_optional_current_user
 from app.models.user import User, UserRole
 from app.models.vendor import Vendor, VendorService
@@ -52,8 +53,10 @@ def create_vendor_profile(
 
 @router.get("/", response_model=List[VendorResponse])
 def get_vendors(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     business_type: Optional[str] = None,
     search: Optional[str] = None,
     verified_only: bool = Query(False),
@@ -77,7 +80,10 @@ def get_vendors(
     if verified_only:
         query = query.filter(Vendor.is_verified == True)
     
-    vendors = query.offset(skip).limit(limit).all()
+    vendors, next_cursor = keyset_paginate(
+        query, [Vendor.created_at, Vendor.id], limit, cursor=cursor, skip=skip
+    )
+    set_next_cursor(response, next_cursor)
     return vendors
 
 
@@ -1,6 +1,6 @@
 from celery import Celery
 from celery.schedules import crontab
-from app.tasks import scheduled 
+from app.tasks import scheduled, cleanup, media, geocoding
 
 celery_app = Celery(
     "turnupspot_backend",
@@ -8,12 +8,12 @@ celery_app = Celery(
     backend="redis://localhost:6379/0"
 )
 
-celery_app.conf.timezone = "UTC"
+# Game days are local to the groups (see game_day.MOUNTAIN_TZ), so the
+# materializer runs just after local midnight.
+celery_app.conf.timezone = "America/Denver"
 celery_app.conf.beat_schedule = {
-    "create-games-every-day": {
-        "task": "app.tasks.scheduled.create_games_for_today",
-        #  "schedule": crontab(hour=0, minute=1),  # Runs every day at 00:01 UTC
-        "schedule": crontab(),  # every minute
-        # "schedule":  crontab(minute=0)	#Every hour at :00
+    "materialize-upcoming-games": {
+        "task": "app.tasks.scheduled.materialize_upcoming_games",
+        "schedule": crontab(hour=0, minute=5),  # Runs every day at 00:05 local time
     },
-}
\ No newline at end of file
+}
@@ -37,6 +37,16 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_BUCKET_NAME: Optional[str] = None
     AWS_REGION: str = "ca-central-1"
+    # S3-compatible endpoint such as MinIO; None for AWS itself
+    AWS_ENDPOINT_URL: Optional[str] = None
+
+    # Media storage: "local" serves files from LOCAL_STORAGE_DIR under /static,
+    # "s3" stores them in AWS_BUCKET_NAME
+    STORAGE_BACKEND: str = "local"
+    LOCAL_STORAGE_DIR: str = "static"
+    # Public base URL (CDN) in front of the bucket
+    MEDIA_CDN_URL: Optional[str] = None
+    PRESIGNED_UPLOAD_EXPIRE_SECONDS: int = 15 * 60
     
     # Stripe
     STRIPE_SECRET_KEY: Optional[str] = None
@@ -49,13 +59,28 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_IMAGE_TYPES: List[str] = ["image/jpeg", "image/png", "image/gif", "image/webp"]
+    ALLOWED_ATTACHMENT_TYPES: List[str] = [
+        "image/jpeg", "image/png", "image/gif", "image/webp", "application/pdf"
+    ]
     
+    # Target of invite links and QR codes, followed by the group id
+    INVITE_BASE_URL: str = "https://yourapp.com/join"
+
     # Google Maps
     GOOGLE_MAPS_API_KEY: str
+
+    # Geocoding: "google", or "stub" to run offline
+    GEOCODING_PROVIDER: str = "google"
+    GEOCODING_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60
+    # Addresses the provider could not resolve are retried sooner
+    GEOCODING_NEGATIVE_TTL_SECONDS: int = 24 * 60 * 60
+    GEOCODING_MEMORY_CACHE_SIZE: int = 2048
     
     # MongoDB
     MONGODB_URI: str
     MONGODB_DB_NAME: str
+    # Create missing indexes at startup; either way, startup fails if any is still missing
+    MONGODB_AUTO_CREATE_INDEXES: bool = True
 
     # Supabase (optional, for compatibility with envs that include these)
     supabase_anon_key: Optional[str] = None
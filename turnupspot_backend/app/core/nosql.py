@@ -1,5 +1,16 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
 from app.core.config import settings
 
 mongo_client = AsyncIOMotorClient(settings.MONGODB_URI)
-mongo_db = mongo_client[settings.MONGODB_DB_NAME] 
\ No newline at end of file
+mongo_db = mongo_client[settings.MONGODB_DB_NAME]
+
+_sync_mongo_client = None
+
+
+def get_sync_mongo_db():
+    """Blocking handle on the same database for Celery tasks and threadpool jobs, which run outside the event loop"""
+    global _sync_mongo_client
+    if _sync_mongo_client is None:
+        _sync_mongo_client = MongoClient(settings.MONGODB_URI)
+    return _sync_mongo_client[settings.MONGODB_DB_NAME]
@@ -0,0 +1,86 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque, URL-safe cursor for a tuple of sort key values"""
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, expected_length: Optional[int] = None) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        values = None
+    if not isinstance(values, list) or (expected_length is not None and len(values) != expected_length):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def _coerce(column, value):
+    """Turn a decoded cursor value back into the column's Python type"""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        return python_type(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_paginate(
+    query: Query,
+    sort_columns: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """Page through ``query`` ordered by ``sort_columns`` (the last one must be unique).
+
+    With a cursor the page starts right after the row it was made from, so
+    deep pages cost the same as the first and rows added meanwhile don't
+    shift the results. ``skip`` is the OFFSET fallback used when no cursor
+    is given. Returns the page and the cursor of the next page, if any.
+    """
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in sort_columns])
+
+    if cursor:
+        values = decode_cursor(cursor, len(sort_columns))
+        position = tuple_(*[_coerce(column, value) for column, value in zip(sort_columns, values)])
+        keys = tuple_(*sort_columns)
+        query = query.filter(keys < position if descending else keys > position)
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in sort_columns])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Expose the next page cursor without changing the list response body"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
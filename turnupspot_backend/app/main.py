@@ -1,12 +1,18 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.staticfiles import StaticFiles
 import uvicorn
 from contextlib import asynccontextmanager
 from .celery_app import celery_app
 
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.services.storage import ImmutableStaticFiles
+from app.services.chat_connections import manager as chat_manager
+from app.services.game_day_lobby import lobby_manager
+from app.services.chat_write_behind import chat_write_buffer
+from app.core.nosql import mongo_db
+from app.nosql_models.indexes import prepare_indexes
 from app.core.database import engine, Base
 from app.api.v1.api import api_router
 from app.core.exceptions import setup_exception_handlers
@@ -23,10 +29,14 @@ async def lifespan(app: FastAPI):
     import asyncio
     loop = asyncio.get_event_loop()
     await loop.run_in_executor(None, seed_sports)
+    await prepare_indexes(mongo_db, settings.MONGODB_AUTO_CREATE_INDEXES)
     
     yield
     # Shutdown
     print("Shutting down TurnUp Spot API...")
+    await chat_manager.close()
+    await lobby_manager.close()
+    await chat_write_buffer.close()
 
 
 app = FastAPI(
@@ -55,6 +65,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Exception handlers
@@ -64,7 +75,7 @@ setup_exception_handlers(app)
 app.include_router(api_router, prefix="/api/v1")
 
 # Static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", ImmutableStaticFiles(directory=settings.LOCAL_STORAGE_DIR), name="static")
 
 
 @app.get("/")
@@ -5,6 +5,7 @@ from app.models.vendor import Vendor, VendorService
 from app.models.game import Game, GameTeam, GamePlayer
 from app.models.chat import ChatRoom, ChatMessage
 from app.models.sport import Sport
+from app.models.geocoding import GeocodeCacheEntry
 
 __all__ = [
     "User",
@@ -18,5 +19,6 @@ __all__ = [
     "GameTeam",
     "GamePlayer",
     "ChatRoom",
-    "ChatMessage"
+    "ChatMessage",
+    "GeocodeCacheEntry"
 ]
\ No newline at end of file
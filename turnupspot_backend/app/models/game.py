@@ -1,6 +1,6 @@
 
 from datetime import timezone, datetime as dt
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum, Text, JSON, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import relationship
@@ -74,6 +74,20 @@ class Match(Base):
 
 class Game(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        # At most one active game per group and day; lets the daily materializer
+        # insert with ON CONFLICT DO NOTHING
+        Index(
+            "uq_games_active_group_date",
+            "sport_group_id",
+            "game_date",
+            unique=True,
+            postgresql_where=text("status IN ('SCHEDULED', 'IN_PROGRESS')"),
+            sqlite_where=text("status IN ('SCHEDULED', 'IN_PROGRESS')"),
+        ),
+        # Keyset paging of a group's games, all statuses
+        Index("ix_games_group_date_id", "sport_group_id", "game_date", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     sport_group_id = Column(String, ForeignKey("sport_groups.id"), nullable=False)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class GeocodeCacheEntry(Base):
+    """Geocoding result for a normalized address; no coordinates means the provider found nothing"""
+    __tablename__ = "geocode_cache"
+
+    address_key = Column(String, primary_key=True)
+    address = Column(String, nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    provider = Column(String, nullable=False)
+    # Naive UTC
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -9,6 +9,10 @@ from sqlalchemy import (
     Enum as SQLEnum,
     Float,
     Time,
+    Index,
+    UniqueConstraint,
+    DDL,
+    event,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -78,6 +82,12 @@ class PlayingDay(Base):
 
 class SportGroup(Base):
     __tablename__ = "sport_groups"
+    __table_args__ = (
+        # Bounding-box prefilter for "groups near me"
+        Index("ix_sport_groups_venue_location", "venue_latitude", "venue_longitude"),
+        # Keyset pagination of the public listing
+        Index("ix_sport_groups_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -85,6 +95,8 @@ class SportGroup(Base):
     venue_name = Column(String, nullable=False)
     venue_address = Column(String, nullable=False)
     venue_image_url = Column(String)
+    # WebP thumbnail generated in the background after upload
+    venue_thumbnail_url = Column(String)
     venue_latitude = Column(Float)
     venue_longitude = Column(Float)
     # playing_days = Column(String, default="0,2,4")  # e.g., "0,2,4" for Mon, Wed, Fri
@@ -99,6 +111,10 @@ class SportGroup(Base):
     created_by = Column(String, ForeignKey("users.email"), nullable=False)
     sports_type = Column(SQLEnum(SportsType), nullable=False)
 
+    # Denormalized membership counters, maintained by app.services.member_counts
+    approved_member_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_member_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Meta
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     is_active = Column(Boolean, default=True)
@@ -120,6 +136,10 @@ class SportGroup(Base):
     def __repr__(self):
         return f"<SportGroup(id={self.id}, name='{self.name}', sport='{self.sports_type}')>"
 
+    @property
+    def member_count(self) -> int:
+        return self.approved_member_count or 0
+
     def is_playing_day(self, today: date) -> bool:
         if not self.playing_days:
             return False  # or True if you want every day to be a playing day by default
@@ -130,8 +150,51 @@ class SportGroup(Base):
         # return today.weekday() in playing_days
 
 
+# PostgreSQL keeps a generated, GIN-indexed search_vector column plus a trigram
+# index on venue_name (see the add_sport_group_search_index migration). SQLite
+# databases built with create_all get an FTS5 table kept in sync by triggers.
+_SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS sport_groups_fts USING fts5(
+        name, description, venue_name, content='sport_groups', content_rowid='rowid'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sport_groups_fts_ai AFTER INSERT ON sport_groups BEGIN
+        INSERT INTO sport_groups_fts(rowid, name, description, venue_name)
+        VALUES (new.rowid, new.name, new.description, new.venue_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sport_groups_fts_ad AFTER DELETE ON sport_groups BEGIN
+        INSERT INTO sport_groups_fts(sport_groups_fts, rowid, name, description, venue_name)
+        VALUES ('delete', old.rowid, old.name, old.description, old.venue_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sport_groups_fts_au AFTER UPDATE ON sport_groups BEGIN
+        INSERT INTO sport_groups_fts(sport_groups_fts, rowid, name, description, venue_name)
+        VALUES ('delete', old.rowid, old.name, old.description, old.venue_name);
+        INSERT INTO sport_groups_fts(rowid, name, description, venue_name)
+        VALUES (new.rowid, new.name, new.description, new.venue_name);
+    END
+    """,
+]
+
+for _statement in _SQLITE_SEARCH_DDL:
+    event.listen(SportGroup.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    SportGroup.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS sport_groups_fts").execute_if(dialect="sqlite"),
+)
+
+
 class SportGroupMember(Base):
     __tablename__ = "sport_group_members"
+    __table_args__ = (
+        UniqueConstraint("sport_group_id", "user_id", name="uq_sport_group_members_group_user"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sport_group_id = Column(String, ForeignKey("sport_groups.id"), nullable=False)
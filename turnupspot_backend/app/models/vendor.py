@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Float, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Float, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -7,6 +7,10 @@ from app.core.database import Base
 
 class Vendor(Base):
     __tablename__ = "vendors"
+    __table_args__ = (
+        # Keyset pagination of the vendor listing
+        Index("ix_vendors_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,180 @@
+"""One-off backfills that bring older chat data in line with what chat_service reads.
+
+Run with ``python -m app.nosql_models.chat_backfill``. Every step is
+idempotent, so the command can be re-run after a failure or to pick up
+rows written by instances still running the old code.
+"""
+import struct
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from sqlalchemy.orm import Session
+
+from app.models.chat import ChatMessage
+from app.nosql_models.indexes import CHAT_HISTORY_INDEX, CHAT_MESSAGES, CHAT_ROOM_SUMMARIES
+
+BATCH_SIZE = 1000
+DUPLICATE_KEY_ERROR = 11000
+
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC with Mongo's millisecond precision, the way chat_service stores timestamps"""
+    if value is None:
+        return None
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def sql_message_id(row: ChatMessage) -> ObjectId:
+    """A stable id for a SQL chat message: its send time, then its row id.
+
+    Stable so a re-run finds the copies it already made, and time-ordered
+    like generated ids so cursors sort the copies among newer messages.
+    """
+    sent_at = _utc_naive(row.created_at) or datetime(1970, 1, 1)
+    seconds = int(sent_at.replace(tzinfo=timezone.utc).timestamp())
+    return ObjectId(struct.pack(">IQ", seconds, row.id))
+
+
+def sql_message_document(row: ChatMessage) -> dict:
+    message_type = row.message_type.value if row.message_type else "text"
+    return {
+        "_id": sql_message_id(row),
+        "chat_id": str(row.chat_room_id),
+        "sender_id": str(row.sender_id),
+        "content": row.content,
+        "message_type": message_type,
+        "file_url": row.file_url,
+        "file_name": row.file_name,
+        "file_size": row.file_size,
+        "timestamp": _utc_naive(row.created_at) or sql_message_id(row).generation_time.replace(tzinfo=None),
+        "is_edited": bool(row.is_edited),
+        "edited_at": _utc_naive(row.edited_at),
+        "is_deleted": bool(row.is_deleted),
+    }
+
+
+def _insert_new(collection, documents: List[dict]) -> int:
+    """Insert the documents not stored yet; returns how many were"""
+    try:
+        return len(collection.insert_many(documents, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+            raise
+        return e.details.get("nInserted", 0)
+
+
+def copy_sql_messages(db: Session, mongo_db, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """Copy the chat messages the old WebSocket path wrote to SQL into the chat_messages collection.
+
+    Returns the number of messages copied per room; rows copied by an
+    earlier run are skipped.
+    """
+    copied: Dict[str, int] = {}
+    last_id = 0
+    while True:
+        rows = (
+            db.query(ChatMessage)
+            .filter(ChatMessage.id > last_id)
+            .order_by(ChatMessage.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return copied
+        last_id = rows[-1].id
+        by_room: Dict[str, List[dict]] = {}
+        for row in rows:
+            document = sql_message_document(row)
+            by_room.setdefault(document["chat_id"], []).append(document)
+        for chat_id, documents in by_room.items():
+            inserted = _insert_new(mongo_db[CHAT_MESSAGES], documents)
+            if inserted:
+                copied[chat_id] = copied.get(chat_id, 0) + inserted
+
+
+def backfill_timestamps(mongo_db, batch_size: int = BATCH_SIZE) -> Set[str]:
+    """Give a timestamp to messages stored without one, from created_at or else their id.
+
+    Returns the ids of the rooms that had such messages.
+    """
+    collection = mongo_db[CHAT_MESSAGES]
+    rooms: Set[str] = set()
+    while True:
+        documents = list(
+            collection.find({"timestamp": {"$exists": False}}, {"chat_id": 1, "created_at": 1}).limit(batch_size)
+        )
+        if not documents:
+            return rooms
+        for document in documents:
+            timestamp = _utc_naive(document.get("created_at")) or document["_id"].generation_time.replace(tzinfo=None)
+            collection.update_one({"_id": document["_id"]}, {"$set": {"timestamp": timestamp}})
+            rooms.add(str(document.get("chat_id")))
+
+
+def rebuild_room_summaries(mongo_db, chat_ids: Optional[Iterable[str]] = None) -> int:
+    """Compute each room's message count and last message from chat_messages.
+
+    Covers every room with messages unless ``chat_ids`` is given. Counts
+    only ever go up ($max) and the last message is only replaced by a newer
+    one, the way live writes move them, so running alongside traffic can't
+    undo a write that landed meanwhile. Returns the number of rooms.
+    """
+    messages = mongo_db[CHAT_MESSAGES]
+    summaries = mongo_db[CHAT_ROOM_SUMMARIES]
+    if chat_ids is None:
+        chat_ids = messages.distinct("chat_id")
+    rebuilt = 0
+    for chat_id in chat_ids:
+        count = messages.count_documents({"chat_id": chat_id})
+        if not count:
+            continue
+        summaries.update_one({"_id": chat_id}, {"$max": {"message_count": count}}, upsert=True)
+        latest = messages.find_one({"chat_id": chat_id, "is_deleted": {"$ne": True}}, sort=CHAT_HISTORY_INDEX[1:])
+        if latest:
+            summaries.update_one(
+                {"_id": chat_id, "last_message.timestamp": {"$not": {"$gt": latest["timestamp"]}}},
+                {"$set": {"last_message": latest}},
+            )
+        rebuilt += 1
+    return rebuilt
+
+
+def _forget_recent_messages(redis_client, chat_ids: Iterable[str]):
+    from app.services.chat_service import recent_cache_keys
+
+    keys = [key for chat_id in chat_ids for key in recent_cache_keys(chat_id)]
+    if keys:
+        redis_client.delete(*keys)
+
+
+def main() -> int:
+    from app.core.cache import sync_redis
+    from app.core.database import SessionLocal
+    from app.core.nosql import get_sync_mongo_db
+
+    mongo_db = get_sync_mongo_db()
+    db = SessionLocal()
+    try:
+        copied = copy_sql_messages(db, mongo_db)
+    finally:
+        db.close()
+    print(f"copied {sum(copied.values())} SQL chat messages in {len(copied)} rooms")
+
+    timestamped = backfill_timestamps(mongo_db)
+    print(f"backfilled timestamps in {len(timestamped)} rooms")
+
+    # Cached first pages of these rooms were built without the backfilled messages
+    _forget_recent_messages(sync_redis, set(copied) | timestamped)
+
+    print(f"rebuilt the summaries of {rebuild_room_summaries(mongo_db)} rooms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
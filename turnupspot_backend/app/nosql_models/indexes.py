@@ -0,0 +1,123 @@
+"""Indexes the MongoDB collections need, declared in one place.
+
+Apply them with ``python -m app.nosql_models.indexes`` (idempotent), or
+check that they exist with ``python -m app.nosql_models.indexes --check``,
+which exits non-zero when one is missing.
+"""
+import argparse
+import asyncio
+import sys
+from typing import List, Sequence, Tuple
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+CHAT_MESSAGES = "chat_messages"
+# One document per room (_id is the room id): message count and last message
+CHAT_ROOM_SUMMARIES = "chat_room_summaries"
+# Per user and room: how many of the room's messages the user has read
+CHAT_READ_STATE = "chat_read_state"
+NOTIFICATIONS = "notifications"
+
+# History is read newest first within a room; _id breaks timestamp ties
+CHAT_HISTORY_INDEX = [("chat_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]
+# Search within one room; queries must match chat_id exactly
+CHAT_SEARCH_INDEX = [("chat_id", ASCENDING), ("content", TEXT)]
+
+
+class MissingIndexError(RuntimeError):
+    pass
+
+
+class MongoIndex:
+    def __init__(self, collection: str, keys: Sequence[Tuple[str, int]], name: str, **options):
+        self.collection = collection
+        self.keys = list(keys)
+        self.name = name
+        self.options = options
+
+    @property
+    def label(self) -> str:
+        return f"{self.collection}.{self.name}"
+
+    def model(self) -> IndexModel:
+        return IndexModel(self.keys, name=self.name, **self.options)
+
+    def server_keys(self) -> List[Tuple[str, object]]:
+        """The key as the server reports it: text fields collapse into _fts/_ftsx"""
+        keys = []
+        for field, direction in self.keys:
+            if direction != TEXT:
+                keys.append((field, direction))
+            elif ("_fts", TEXT) not in keys:
+                keys.extend([("_fts", TEXT), ("_ftsx", 1)])
+        return keys
+
+    def matches(self, info: dict) -> bool:
+        key = [(field, direction) for field, direction in info.get("key", [])]
+        return key in (self.keys, self.server_keys())
+
+
+MONGO_INDEXES: List[MongoIndex] = [
+    MongoIndex(CHAT_MESSAGES, CHAT_HISTORY_INDEX, "chat_history"),
+    MongoIndex(CHAT_MESSAGES, CHAT_SEARCH_INDEX, "chat_search"),
+    MongoIndex(CHAT_READ_STATE, [("user_id", ASCENDING), ("chat_id", ASCENDING)], "user_room", unique=True),
+    MongoIndex(NOTIFICATIONS, [("user_id", ASCENDING), ("created_at", DESCENDING)], "user_notifications"),
+]
+
+
+def _by_collection(indexes: List[MongoIndex]):
+    grouped = {}
+    for index in indexes:
+        grouped.setdefault(index.collection, []).append(index)
+    return grouped
+
+
+async def ensure_indexes(db, indexes: List[MongoIndex] = MONGO_INDEXES):
+    """Create any missing index; existing ones with the same definition are left alone"""
+    for collection, specs in _by_collection(indexes).items():
+        await db[collection].create_indexes([spec.model() for spec in specs])
+
+
+async def missing_indexes(db, indexes: List[MongoIndex] = MONGO_INDEXES) -> List[str]:
+    """Labels of the registered indexes that are absent or defined differently"""
+    missing = []
+    for collection, specs in _by_collection(indexes).items():
+        existing = await db[collection].index_information()
+        missing.extend(spec.label for spec in specs if not spec.matches(existing.get(spec.name, {})))
+    return missing
+
+
+async def check_indexes(db, indexes: List[MongoIndex] = MONGO_INDEXES):
+    missing = await missing_indexes(db, indexes)
+    if missing:
+        raise MissingIndexError(f"Missing MongoDB indexes: {', '.join(missing)}")
+
+
+async def prepare_indexes(db, auto_create: bool, indexes: List[MongoIndex] = MONGO_INDEXES):
+    """Startup check: create what is missing when ``auto_create`` is on, then fail if anything still is"""
+    if auto_create:
+        try:
+            await ensure_indexes(db, indexes)
+        except Exception as e:
+            # Reported again below as missing, which is what stops startup
+            print(f"Could not create MongoDB indexes: {e}")
+    await check_indexes(db, indexes)
+
+
+async def _main(check: bool) -> int:
+    from app.core.nosql import mongo_db
+
+    if not check:
+        await ensure_indexes(mongo_db)
+    missing = await missing_indexes(mongo_db)
+    for label in missing:
+        print(f"missing: {label}")
+    if not missing:
+        print(f"{len(MONGO_INDEXES)} MongoDB indexes in place")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or check the MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="only report missing indexes")
+    sys.exit(asyncio.run(_main(parser.parse_args().check)))
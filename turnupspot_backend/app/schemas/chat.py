@@ -23,16 +23,12 @@ class ChatMessageUpdate(BaseModel):
 
 
 class ChatMessageResponse(ChatMessageBase):
-    id: int
+    id: str
     chat_room_id: int
     sender_id: int
-    is_edited: bool
+    is_edited: bool = False
     edited_at: Optional[datetime] = None
-    is_deleted: bool
-    deleted_at: Optional[datetime] = None
     created_at: datetime
-    updated_at: Optional[datetime] = None
-    sender: "UserResponse"
 
     class Config:
         from_attributes = True
@@ -42,7 +38,7 @@ class ChatRoomResponse(BaseModel):
     id: int
     name: Optional[str] = None
     room_type: str
-    sport_group_id: Optional[int] = None
+    sport_group_id: Optional[str] = None
     event_id: Optional[int] = None
     is_active: bool
     created_at: datetime
@@ -53,6 +49,20 @@ class ChatRoomResponse(BaseModel):
         from_attributes = True
 
 
-# Import here to avoid circular imports
-from app.schemas.user import UserResponse
-ChatMessageResponse.model_rebuild()
\ No newline at end of file
+class ChatSearchHit(BaseModel):
+    message: ChatMessageResponse
+    score: float
+    # Pass as ``before`` or ``after`` to the messages endpoint for the surrounding conversation
+    cursor: str
+
+
+class ChatInboxRoom(BaseModel):
+    id: int
+    name: Optional[str] = None
+    room_type: str
+    sport_group_id: Optional[str] = None
+    event_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    last_message: Optional[ChatMessageResponse] = None
+    last_sender_name: Optional[str] = None
+    unread_count: int = 0
@@ -0,0 +1,25 @@
+import enum
+from typing import Dict
+from pydantic import BaseModel, Field
+
+
+class MediaKind(str, enum.Enum):
+    VENUE = "venue"
+    PROFILE = "profile"
+    CHAT = "chat"
+
+
+class MediaUploadRequest(BaseModel):
+    kind: MediaKind
+    content_type: str
+    size: int = Field(..., gt=0)
+
+
+class MediaUploadResponse(BaseModel):
+    key: str
+    upload_url: str
+    method: str
+    fields: Dict[str, str] = {}
+    headers: Dict[str, str] = {}
+    public_url: str
+    expires_in: int
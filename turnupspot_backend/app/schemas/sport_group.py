@@ -4,6 +4,7 @@ from datetime import datetime, time
 from enum import Enum
 
 from app.models.sport_group import SportsType, MemberRole
+from app.models.game import GameStatus
 
 
 class Day(str, Enum):
@@ -131,6 +132,7 @@ class UserMembershipInfo(BaseModel):
 
 class SportGroupResponse(SportGroupBase):
     id: str
+    venue_thumbnail_url: Optional[str] = None
     venue_latitude: Optional[float] = None
     venue_longitude: Optional[float] = None
     created_by: str
@@ -139,12 +141,24 @@ class SportGroupResponse(SportGroupBase):
     updated_at: Optional[datetime] = None
     playing_days: List[PlayingDay]
     member_count: Optional[int] = None
+    pending_member_count: Optional[int] = None
     current_user_membership: Optional[UserMembershipInfo] = None
 
     class Config:
         from_attributes = True
 
 
+class SportGroupNearbyResponse(SportGroupResponse):
+    distance_km: float
+
+
+class MySportGroupResponse(SportGroupResponse):
+    role: Optional[MemberRole] = None
+    is_creator: bool = False
+    next_game_date: Optional[datetime] = None
+    todays_game_status: Optional[GameStatus] = None
+
+
 class SportGroupJoinRequest(BaseModel):
     message: Optional[str] = None
 
@@ -0,0 +1,348 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Dict, List, Optional
+from fastapi import WebSocket
+
+from app.core.cache import redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "chat:room:"
+
+# Messages waiting for one client before the overflow policy applies
+OUTBOUND_QUEUE_SIZE = 100
+SEND_TIMEOUT_SECONDS = 10
+# Overflow policies: disconnect the slow client, or drop messages it can't keep up with
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_DROP = "drop"
+
+HEARTBEAT_INTERVAL_SECONDS = 25
+# About three missed heartbeats
+IDLE_TIMEOUT_SECONDS = 80
+# Per user on one worker
+MAX_CONNECTIONS_PER_USER = 5
+PING_MESSAGE = json.dumps({"type": "ping"})
+
+
+def room_channel(room_id, prefix: str = CHANNEL_PREFIX) -> str:
+    return f"{prefix}{room_id}"
+
+
+def is_pong(frame: str) -> bool:
+    """Whether an inbound frame answers a heartbeat ping rather than being a chat message"""
+    if not frame.startswith("{"):
+        return False
+    try:
+        return json.loads(frame).get("type") == "pong"
+    except (ValueError, AttributeError):
+        return False
+
+
+class RedisBackplane:
+    """Relays room broadcasts between workers over Redis pub/sub.
+
+    A worker subscribes to a room's channel while it holds sockets in that
+    room. Published messages carry the worker's id so it can skip its own;
+    they have already been delivered locally.
+    """
+
+    def __init__(self, redis_client, deliver, channel_prefix: str = CHANNEL_PREFIX):
+        self.redis = redis_client
+        self.deliver = deliver
+        self.channel_prefix = channel_prefix
+        self.instance_id = uuid.uuid4().hex
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def subscribe(self, room_id):
+        try:
+            if self._pubsub is None:
+                self._pubsub = self.redis.pubsub()
+            await self._pubsub.subscribe(room_channel(room_id, self.channel_prefix))
+        except Exception as e:
+            logger.warning(f"Chat backplane subscribe failed for room {room_id}, delivering locally only: {e}")
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def unsubscribe(self, room_id):
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.unsubscribe(room_channel(room_id, self.channel_prefix))
+        except Exception as e:
+            logger.warning(f"Chat backplane unsubscribe failed for room {room_id}: {e}")
+
+    async def publish(self, room_id, message: str, exclude_user_id: Optional[int] = None):
+        envelope = {
+            "origin": self.instance_id,
+            "room_id": room_id,
+            "message": message,
+            "exclude_user_id": exclude_user_id,
+        }
+        try:
+            await self.redis.publish(room_channel(room_id, self.channel_prefix), json.dumps(envelope))
+        except Exception as e:
+            logger.warning(f"Chat backplane publish failed for room {room_id}: {e}")
+
+    async def _listen(self):
+        pubsub = self._pubsub
+        while pubsub.subscribed:
+            try:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Chat backplane receive failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            try:
+                envelope = json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+            if envelope.get("origin") == self.instance_id:
+                continue
+            try:
+                await self.deliver(envelope["room_id"], envelope["message"], envelope.get("exclude_user_id"))
+            except Exception as e:
+                logger.warning(f"Chat backplane delivery failed for room {envelope.get('room_id')}: {e}")
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+
+class ClientConnection:
+    """One chat socket with its own bounded outbound queue and sender task.
+
+    A slow client only backs up its own queue; everyone else in the room
+    keeps receiving at their own pace.
+    """
+
+    def __init__(self, websocket: WebSocket, room_id: int, user_id: int, on_closed, max_queue: int, overflow: str):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.user_id = user_id
+        self.overflow = overflow
+        self.dropped = 0
+        self.closed = False
+        self.connected_at = self.last_seen = asyncio.get_running_loop().time()
+        self._on_closed = on_closed
+        self._closer: Optional[asyncio.Task] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._sender = asyncio.create_task(self._send_loop())
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def enqueue(self, message: str) -> bool:
+        """Queue a message without waiting; False if it was dropped"""
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.overflow == OVERFLOW_DISCONNECT:
+                logger.info(f"Disconnecting slow chat client of user {self.user_id} in room {self.room_id}")
+                # 1013: try again later; the client reconnects and reloads history
+                self.close_soon(1013, "Client too slow")
+            return False
+
+    def close_soon(self, code: int, reason: str):
+        """Close the socket and drop the connection in the background"""
+        if self._closer is None:
+            self.closed = True
+            self._closer = asyncio.create_task(self._close(code, reason))
+
+    async def _send_loop(self):
+        try:
+            while True:
+                message = await self._queue.get()
+                await asyncio.wait_for(self.websocket.send_text(message), timeout=SEND_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Gone or stalled past the timeout
+            await self._on_closed(self)
+
+    async def _close(self, code: int, reason: str):
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+        await self._on_closed(self)
+
+    async def stop(self):
+        self.closed = True
+        if self._sender is not asyncio.current_task():
+            self._sender.cancel()
+            try:
+                await self._sender
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+class ConnectionManager:
+    """Keeps the chat sockets of each room and fans messages out to every worker's sockets.
+
+    Sockets are indexed by socket, by room and by user, so every lookup and
+    removal is O(1) and empty rooms and users are dropped. A heartbeat pings
+    every socket and closes those that have sent nothing, not even a pong,
+    for ``idle_timeout`` seconds; ``heartbeat_interval=None`` turns it off
+    for listen-only sockets.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        max_queue: int = OUTBOUND_QUEUE_SIZE,
+        overflow: str = OVERFLOW_DISCONNECT,
+        heartbeat_interval: Optional[float] = HEARTBEAT_INTERVAL_SECONDS,
+        idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+        max_connections_per_user: int = MAX_CONNECTIONS_PER_USER,
+        channel_prefix: str = CHANNEL_PREFIX,
+    ):
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.max_connections_per_user = max_connections_per_user
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        self.room_connections: Dict[int, Dict[WebSocket, ClientConnection]] = {}
+        # Insertion ordered, oldest first
+        self.user_connections: Dict[int, Dict[WebSocket, ClientConnection]] = {}
+        self.backplane = (
+            RedisBackplane(redis_client, self.deliver_local, channel_prefix) if redis_client is not None else None
+        )
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.connections)
+
+    async def connect(self, websocket: WebSocket, room_id: int, user_id: int):
+        await websocket.accept()
+
+        connection = ClientConnection(websocket, room_id, user_id, self._connection_closed, self.max_queue, self.overflow)
+        self.connections[websocket] = connection
+        first_in_room = room_id not in self.room_connections
+        self.room_connections.setdefault(room_id, {})[websocket] = connection
+        user_sockets = self.user_connections.setdefault(user_id, {})
+        user_sockets[websocket] = connection
+
+        # Over the cap the oldest socket goes; it is the likeliest to be half-open
+        open_sockets = [c for c in user_sockets.values() if not c.closed]
+        for oldest in open_sockets[:max(0, len(open_sockets) - self.max_connections_per_user)]:
+            oldest.close_soon(1008, "Too many connections")
+
+        if first_in_room and self.backplane:
+            await self.backplane.subscribe(room_id)
+        if self.heartbeat_interval and (self._heartbeat is None or self._heartbeat.done()):
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    def touch(self, websocket: WebSocket):
+        """Record activity from the client, including heartbeat pongs"""
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.last_seen = asyncio.get_running_loop().time()
+
+    async def _heartbeat_loop(self):
+        while self.connections:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = asyncio.get_running_loop().time()
+            for connection in list(self.connections.values()):
+                if now - connection.last_seen > self.idle_timeout:
+                    connection.close_soon(1001, "Idle timeout")
+                else:
+                    connection.enqueue(PING_MESSAGE)
+
+    async def _connection_closed(self, connection: ClientConnection):
+        await self.disconnect(connection.websocket, connection.room_id)
+
+    async def disconnect(self, websocket: WebSocket, room_id: int):
+        connection = self.connections.pop(websocket, None)
+        if connection is None:
+            return
+
+        room_sockets = self.room_connections.get(room_id)
+        if room_sockets is not None:
+            room_sockets.pop(websocket, None)
+            if not room_sockets:
+                del self.room_connections[room_id]
+                if self.backplane:
+                    await self.backplane.unsubscribe(room_id)
+
+        user_sockets = self.user_connections.get(connection.user_id)
+        if user_sockets is not None:
+            user_sockets.pop(websocket, None)
+            if not user_sockets:
+                del self.user_connections[connection.user_id]
+
+        await connection.stop()
+
+    async def send_personal_message(self, message: str, websocket: WebSocket):
+        await websocket.send_text(message)
+
+    async def broadcast_to_room(self, message: str, room_id: int, exclude_user_id: Optional[int] = None):
+        """Send to the room's sockets on this worker, then relay to the other workers"""
+        await self.deliver_local(room_id, message, exclude_user_id)
+        if self.backplane:
+            await self.backplane.publish(room_id, message, exclude_user_id)
+
+    async def deliver_local(self, room_id: int, message: str, exclude_user_id: Optional[int] = None):
+        """Queue the message on each local socket; never waits on a client"""
+        for connection in list(self.room_connections.get(room_id, {}).values()):
+            if exclude_user_id is None or connection.user_id != exclude_user_id:
+                connection.enqueue(message)
+
+    def stats(self) -> dict:
+        """Live sockets and rooms on this worker"""
+        return {
+            "worker_id": self.backplane.instance_id if self.backplane else None,
+            "pid": os.getpid(),
+            "connections": len(self.connections),
+            "rooms": len(self.room_connections),
+            "users": len(self.user_connections),
+            "queued_messages": sum(c.queued for c in self.connections.values()),
+            "dropped_messages": sum(c.dropped for c in self.connections.values()),
+            "largest_rooms": sorted(
+                ({"room_id": room_id, "connections": len(sockets)} for room_id, sockets in self.room_connections.items()),
+                key=lambda room: room["connections"],
+                reverse=True,
+            )[:10],
+        }
+
+    async def close(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._heartbeat = None
+        for websocket, connection in list(self.connections.items()):
+            await self.disconnect(websocket, connection.room_id)
+        if self.backplane:
+            await self.backplane.close()
+
+
+manager = ConnectionManager(redis)
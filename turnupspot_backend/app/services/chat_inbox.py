@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Set
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.chat import ChatRoom, ChatRoomType
+from app.models.event import AttendeeStatus, Event, EventAttendee
+from app.models.sport_group import SportGroupMember
+from app.models.user import User
+from app.services import chat_service
+from app.services.chat_persistence import run_db
+
+
+def accessible_rooms(db: Session, user_id: int) -> List[ChatRoom]:
+    """Active rooms of the user's approved groups and of the events they run or attend, in one query"""
+    group_ids = select(SportGroupMember.sport_group_id).where(
+        SportGroupMember.user_id == user_id,
+        SportGroupMember.is_approved.is_(True),
+    )
+    event_ids = select(EventAttendee.event_id).where(
+        EventAttendee.user_id == user_id,
+        EventAttendee.status != AttendeeStatus.CANCELLED,
+    ).union(select(Event.id).where(Event.creator_id == user_id))
+
+    return db.query(ChatRoom).filter(
+        ChatRoom.is_active.is_(True),
+        or_(
+            and_(ChatRoom.room_type == ChatRoomType.SPORT_GROUP, ChatRoom.sport_group_id.in_(group_ids)),
+            and_(ChatRoom.room_type == ChatRoomType.EVENT, ChatRoom.event_id.in_(event_ids)),
+        ),
+    ).all()
+
+
+def _sender_names(db: Session, sender_ids: Set[int]) -> Dict[int, str]:
+    if not sender_ids:
+        return {}
+    return {
+        row.id: f"{row.first_name} {row.last_name}"
+        for row in db.query(User.id, User.first_name, User.last_name).filter(User.id.in_(sender_ids))
+    }
+
+
+def _last_activity(entry: dict) -> datetime:
+    message = entry["last_message"]
+    if message:
+        return message["created_at"].replace(tzinfo=timezone.utc)
+    created_at = entry["created_at"] or datetime.min
+    return created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)
+
+
+async def build_inbox(db: Session, user_id: int) -> List[dict]:
+    """The user's rooms with last message, its sender's name and unread count, most recent first.
+
+    Four queries whatever the number of rooms: the rooms, their summaries,
+    the user's read pointers and the senders' names. The SQL ones run on
+    the chat executor, off the event loop.
+    """
+    rooms = await run_db(accessible_rooms, db, user_id)
+    summaries = await chat_service.get_room_summaries([room.id for room in rooms], user_id)
+
+    sender_ids = {
+        int(summary["last_message"]["sender_id"])
+        for summary in summaries.values()
+        if summary["last_message"]
+    }
+    names = await run_db(_sender_names, db, sender_ids)
+
+    inbox = []
+    for room in rooms:
+        summary = summaries.get(str(room.id), {})
+        last_message = summary.get("last_message")
+        inbox.append({
+            "id": room.id,
+            "name": room.name,
+            "room_type": room.room_type,
+            "sport_group_id": room.sport_group_id,
+            "event_id": room.event_id,
+            "created_at": room.created_at,
+            "last_message": chat_service.serialize_chat_message(last_message) if last_message else None,
+            "last_sender_name": names.get(int(last_message["sender_id"])) if last_message else None,
+            "unread_count": summary.get("unread_count", 0),
+        })
+    inbox.sort(key=_last_activity, reverse=True)
+    return inbox
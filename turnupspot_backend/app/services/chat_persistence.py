@@ -0,0 +1,45 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from app.core.database import SessionLocal
+from app.core.security import verify_token
+from app.models.chat import ChatRoom, ChatRoomType
+from app.models.user import User
+from app.services.group_context import resolve_group_context
+
+# Threads doing chat database work; bounds the connections chat can take
+CHAT_DB_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=CHAT_DB_WORKERS, thread_name_prefix="chat-db")
+
+
+async def run_db(fn, *args):
+    """Run blocking database work on the chat executor, off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+def authorize_chat_socket(token: str, room_id: int) -> Tuple[Optional[dict], Optional[str]]:
+    """(user, None) when the token's user may join the room, else (None, reason).
+
+    Uses its own session, closed before the socket starts streaming.
+    """
+    email = verify_token(token).get("sub")
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if not user:
+            return None, "Invalid user"
+
+        room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+        if not room:
+            return None, "Room not found"
+
+        if room.room_type == ChatRoomType.SPORT_GROUP:
+            ctx = resolve_group_context(db, room.sport_group_id, user.id)
+            if not ctx.is_member:
+                return None, "Access denied"
+
+        return {"id": user.id, "full_name": user.full_name}, None
+    finally:
+        db.close()
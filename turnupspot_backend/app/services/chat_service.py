@@ -1,30 +1,455 @@
+import json
+import logging
+from app.core.cache import redis
 from app.core.nosql import mongo_db
-from app.nosql_models.chat import ChatMessage
-from typing import List, Optional
+from app.core.pagination import decode_cursor, encode_cursor
+from app.nosql_models.indexes import CHAT_HISTORY_INDEX, CHAT_MESSAGES, CHAT_READ_STATE, CHAT_ROOM_SUMMARIES
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError
+from redis.exceptions import WatchError
 
-CHAT_COLLECTION = "chat_messages"
+logger = logging.getLogger(__name__)
 
-async def create_chat_message(message_data: dict) -> ChatMessage:
-    result = await mongo_db[CHAT_COLLECTION].insert_one(message_data)
-    message_data["_id"] = result.inserted_id
-    return ChatMessage(**message_data)
+CHAT_COLLECTION = CHAT_MESSAGES
+DUPLICATE_KEY_ERROR = 11000
 
-async def get_chat_messages(chat_id: str, skip: int = 0, limit: int = 50) -> List[ChatMessage]:
-    cursor = mongo_db[CHAT_COLLECTION].find({"chat_id": chat_id}).sort("timestamp", -1).skip(skip).limit(limit)
-    messages = [ChatMessage(**msg) async for msg in cursor]
-    return list(reversed(messages))
+# Newest messages of recently opened rooms, kept in Redis
+RECENT_MESSAGES_LIMIT = 50
+RECENT_MESSAGES_TTL_SECONDS = 60 * 60
+EPOCH = datetime(1970, 1, 1)
+recent_cache = redis
 
-async def update_chat_message(message_id: str, update_data: dict) -> Optional[ChatMessage]:
-    result = await mongo_db[CHAT_COLLECTION].find_one_and_update(
-        {"_id": ObjectId(message_id)},
+
+def build_chat_message(
+    chat_id: str,
+    sender_id: str,
+    content: str,
+    message_type: str = "text",
+    file_url: Optional[str] = None,
+    file_name: Optional[str] = None,
+    file_size: Optional[int] = None,
+) -> dict:
+    """A chat message document with its id and timestamp assigned up front, before it is stored"""
+    now = datetime.utcnow()
+    return {
+        "_id": ObjectId(),
+        "chat_id": str(chat_id),
+        "sender_id": str(sender_id),
+        "content": content,
+        "message_type": message_type,
+        "file_url": file_url,
+        "file_name": file_name,
+        "file_size": file_size,
+        # Mongo keeps milliseconds; cursors made before and after storing must agree
+        "timestamp": now.replace(microsecond=now.microsecond // 1000 * 1000),
+        "is_edited": False,
+        "edited_at": None,
+        "is_deleted": False,
+    }
+
+
+def message_timestamp(message: dict) -> datetime:
+    """When the message was sent; documents from before timestamps were always set fall back to created_at or their id"""
+    timestamp = message.get("timestamp") or message.get("created_at")
+    if timestamp is None:
+        return message["_id"].generation_time.replace(tzinfo=None)
+    return timestamp
+
+
+def serialize_chat_message(message: dict) -> dict:
+    """A stored message in the shape of ChatMessageResponse"""
+    return {
+        "id": str(message["_id"]),
+        "chat_room_id": int(message["chat_id"]),
+        "sender_id": int(message["sender_id"]),
+        "content": message["content"],
+        "message_type": message.get("message_type", "text"),
+        "file_url": message.get("file_url"),
+        "file_name": message.get("file_name"),
+        "file_size": message.get("file_size"),
+        "is_edited": message.get("is_edited", False),
+        "edited_at": message.get("edited_at"),
+        "created_at": message_timestamp(message),
+    }
+
+
+def recent_messages_key(chat_id: str) -> str:
+    # Not the chat:recent:{id} of the earlier list, which is left to expire
+    return f"chat:recent:{chat_id}:messages"
+
+
+def _recent_filled_key(chat_id: str) -> str:
+    return f"chat:recent:{chat_id}:filled"
+
+
+def _recent_generation_key(chat_id: str) -> str:
+    return f"chat:recent:{chat_id}:generation"
+
+
+def recent_cache_keys(chat_id: str) -> List[str]:
+    """Every Redis key holding a room's recent messages"""
+    return [recent_messages_key(chat_id), _recent_filled_key(chat_id), _recent_generation_key(chat_id)]
+
+
+def _recent_score(message: dict) -> int:
+    return (message_timestamp(message) - EPOCH) // timedelta(milliseconds=1)
+
+
+def _dump_recent(message: dict) -> str:
+    # Canonical, so a message remembered when sent and read back from the
+    # store is the same set member; "_id" sorts first, so members with the
+    # same timestamp score order by id
+    return json.dumps(
+        {
+            "_id": str(message["_id"]),
+            "chat_id": message["chat_id"],
+            "sender_id": message["sender_id"],
+            "content": message["content"],
+            "message_type": message.get("message_type", "text"),
+            "file_url": message.get("file_url"),
+            "file_name": message.get("file_name"),
+            "file_size": message.get("file_size"),
+            "timestamp": message_timestamp(message),
+            "is_edited": message.get("is_edited", False),
+            "edited_at": message.get("edited_at"),
+            "is_deleted": message.get("is_deleted", False),
+        },
+        default=lambda value: value.isoformat(),
+        sort_keys=True,
+    )
+
+
+def _load_recent(raw: str) -> dict:
+    message = json.loads(raw)
+    message["_id"] = ObjectId(message["_id"])
+    message["timestamp"] = datetime.fromisoformat(message["timestamp"])
+    if message.get("edited_at"):
+        message["edited_at"] = datetime.fromisoformat(message["edited_at"])
+    return message
+
+
+async def remember_message(message: dict):
+    """Add a just-sent message to its room's recent set.
+
+    The set is ordered by (timestamp, _id) and added to whether or not the
+    room is cached yet: a fill running meanwhile merges into it rather
+    than replacing it, so a message acknowledged before its write reached
+    the store, or sent while the room was being filled, is never lost.
+    Until a fill marks the set complete, reads still go to the store.
+    """
+    chat_id = message["chat_id"]
+    key = recent_messages_key(chat_id)
+    try:
+        async with recent_cache.pipeline(transaction=True) as pipe:
+            pipe.zadd(key, {_dump_recent(message): _recent_score(message)})
+            pipe.zremrangebyrank(key, 0, -RECENT_MESSAGES_LIMIT - 1)
+            pipe.expire(key, RECENT_MESSAGES_TTL_SECONDS)
+            pipe.expire(_recent_filled_key(chat_id), RECENT_MESSAGES_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not cache chat message for room {chat_id}: {e}")
+
+
+async def forget_recent_messages(chat_id: str):
+    """Drop a room's recent set, e.g. after a message in it was edited or deleted.
+
+    Bumps the room's generation so a fill that read the store before the
+    change doesn't put the old message back.
+    """
+    try:
+        async with recent_cache.pipeline(transaction=True) as pipe:
+            pipe.delete(recent_messages_key(chat_id), _recent_filled_key(chat_id))
+            pipe.incr(_recent_generation_key(chat_id))
+            pipe.expire(_recent_generation_key(chat_id), RECENT_MESSAGES_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not drop cached chat messages of room {chat_id}: {e}")
+
+
+async def _cached_recent_messages(chat_id: str) -> Tuple[Optional[List[dict]], Optional[str]]:
+    """The room's newest messages, newest first, or None when the room isn't cached; and its generation"""
+    try:
+        async with recent_cache.pipeline(transaction=False) as pipe:
+            pipe.exists(_recent_filled_key(chat_id))
+            pipe.zrevrange(recent_messages_key(chat_id), 0, RECENT_MESSAGES_LIMIT - 1)
+            pipe.get(_recent_generation_key(chat_id))
+            filled, raw, generation = await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not read cached chat messages of room {chat_id}: {e}")
+        return None, None
+    return ([_load_recent(item) for item in raw] if filled else None), generation
+
+
+async def _cache_recent_messages(chat_id: str, messages: List[dict], generation: Optional[str]):
+    """Merge the room's newest messages from the store into its recent set and mark it complete.
+
+    Skipped when the room's messages were edited or deleted since
+    ``generation`` was read, as ``messages`` may predate that.
+    """
+    key = recent_messages_key(chat_id)
+    generation_key = _recent_generation_key(chat_id)
+    try:
+        async with recent_cache.pipeline(transaction=True) as pipe:
+            await pipe.watch(generation_key)
+            if await pipe.get(generation_key) != generation:
+                return
+            pipe.multi()
+            if messages:
+                pipe.zadd(key, {_dump_recent(m): _recent_score(m) for m in messages[:RECENT_MESSAGES_LIMIT]})
+                pipe.zremrangebyrank(key, 0, -RECENT_MESSAGES_LIMIT - 1)
+                pipe.expire(key, RECENT_MESSAGES_TTL_SECONDS)
+            pipe.set(_recent_filled_key(chat_id), 1, ex=RECENT_MESSAGES_TTL_SECONDS)
+            await pipe.execute()
+    except WatchError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not cache chat messages of room {chat_id}: {e}")
+
+
+async def record_room_activity(messages: List[dict]):
+    """Advance each room's message count and last message after messages were stored.
+
+    Senders have read everything up to their own latest message, so their
+    read pointers move to its position. Best effort: a failure is logged
+    rather than raised so a retried write can't count a message twice.
+    """
+    by_room: Dict[str, List[dict]] = {}
+    for message in messages:
+        by_room.setdefault(message["chat_id"], []).append(message)
+
+    summaries = mongo_db[CHAT_ROOM_SUMMARIES]
+    for chat_id, room_messages in by_room.items():
+        room_messages = sorted(room_messages, key=lambda m: (message_timestamp(m), m["_id"]))
+        latest = room_messages[-1]
+        try:
+            summary = await summaries.find_one_and_update(
+                {"_id": chat_id},
+                {"$inc": {"message_count": len(room_messages)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            await summaries.update_one(
+                {"_id": chat_id, "last_message.timestamp": {"$not": {"$gt": message_timestamp(latest)}}},
+                {"$set": {"last_message": latest}},
+            )
+            counted_before = summary["message_count"] - len(room_messages)
+            read_up_to = {m["sender_id"]: position for position, m in enumerate(room_messages, 1)}
+            for sender_id, position in read_up_to.items():
+                await _advance_read_pointer(chat_id, sender_id, counted_before + position)
+        except Exception as e:
+            logger.warning(f"Could not update the summary of chat room {chat_id}: {e}")
+
+
+async def _advance_read_pointer(chat_id: str, user_id: str, read_count: int):
+    await mongo_db[CHAT_READ_STATE].update_one(
+        {"user_id": str(user_id), "chat_id": str(chat_id)},
+        {"$max": {"read_count": read_count}},
+        upsert=True,
+    )
+
+
+async def mark_room_read(chat_id: str, user_id: str) -> int:
+    """Move the user's read pointer to the room's latest message; returns the room's message count"""
+    summary = await mongo_db[CHAT_ROOM_SUMMARIES].find_one({"_id": str(chat_id)})
+    read_count = summary["message_count"] if summary else 0
+    await _advance_read_pointer(chat_id, user_id, read_count)
+    return read_count
+
+
+async def get_room_summaries(chat_ids: List[str], user_id: str) -> Dict[str, dict]:
+    """Last message and unread count of each room for the user, in two queries.
+
+    Unread is the room's message count less the user's read pointer;
+    messages deleted since the user last read are still counted.
+    """
+    chat_ids = [str(chat_id) for chat_id in chat_ids]
+    summaries = {
+        doc["_id"]: doc
+        async for doc in mongo_db[CHAT_ROOM_SUMMARIES].find({"_id": {"$in": chat_ids}})
+    }
+    read_counts = {
+        doc["chat_id"]: doc.get("read_count", 0)
+        async for doc in mongo_db[CHAT_READ_STATE].find({"user_id": str(user_id), "chat_id": {"$in": chat_ids}})
+    }
+    return {
+        chat_id: {
+            "last_message": summary.get("last_message"),
+            "unread_count": max(0, summary.get("message_count", 0) - read_counts.get(chat_id, 0)),
+        }
+        for chat_id, summary in summaries.items()
+    }
+
+
+async def _refresh_last_message(message: dict, removed: bool = False):
+    """Keep a room's last message in step after that message was edited or removed"""
+    summaries = mongo_db[CHAT_ROOM_SUMMARIES]
+    selector = {"_id": message["chat_id"], "last_message._id": message["_id"]}
+    if removed or message.get("is_deleted"):
+        latest = await mongo_db[CHAT_COLLECTION].find_one(
+            {"chat_id": message["chat_id"], "is_deleted": {"$ne": True}},
+            sort=CHAT_HISTORY_INDEX[1:],
+        )
+        await summaries.update_one(selector, {"$set": {"last_message": latest}})
+    else:
+        await summaries.update_one(selector, {"$set": {"last_message": message}})
+
+
+async def create_chat_message(message: dict) -> dict:
+    await mongo_db[CHAT_COLLECTION].insert_one(message)
+    await record_room_activity([message])
+    await remember_message(message)
+    return message
+
+
+async def insert_chat_messages(messages: List[dict]):
+    """Store a batch of pre-built messages; safe to retry after a partial failure"""
+    try:
+        await mongo_db[CHAT_COLLECTION].insert_many(messages, ordered=False)
+    except BulkWriteError as e:
+        # Messages already written by an earlier attempt keep their ids
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors) or e.details.get("writeConcernErrors"):
+            raise
+    await record_room_activity(messages)
+
+
+def encode_message_cursor(message: dict) -> str:
+    return encode_cursor([message_timestamp(message), str(message["_id"])])
+
+
+def _decode_message_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    timestamp, message_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(timestamp), ObjectId(message_id)
+    except (TypeError, ValueError, InvalidId):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def get_chat_messages(
+    chat_id: str,
+    limit: int = 50,
+    before: Optional[str] = None,
+    skip: int = 0,
+    after: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """A page of a room's history, oldest first, and the cursor of the next page.
+
+    With ``before`` the page ends right before the message the cursor was
+    made from, which the (chat_id, timestamp, _id) index serves directly,
+    so every page costs the same however deep it is; the returned cursor
+    leads further back. With ``after`` the page starts right after it and
+    the cursor leads forward. ``skip`` is the offset fallback used without
+    a cursor. The newest page comes from the room's Redis set when it is
+    cached, and fills it when it is not.
+    """
+    if before and after:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either before or after, not both")
+    if after:
+        return await _get_chat_messages_after(str(chat_id), limit, after)
+
+    chat_id = str(chat_id)
+    first_page = not before and not skip and limit <= RECENT_MESSAGES_LIMIT
+    if first_page:
+        recent, generation = await _cached_recent_messages(chat_id)
+        if recent is not None:
+            page = recent[:limit]
+            # A full list may have older messages behind it
+            has_older = len(recent) > limit or len(recent) == RECENT_MESSAGES_LIMIT
+            if not page:
+                return [], None
+            return list(reversed(page)), encode_message_cursor(page[-1]) if has_older else None
+
+    query = {"chat_id": chat_id, "is_deleted": {"$ne": True}}
+    if before:
+        timestamp, message_id = _decode_message_cursor(before)
+        query["$or"] = [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$lt": message_id}},
+        ]
+
+    cursor = mongo_db[CHAT_COLLECTION].find(query).sort(CHAT_HISTORY_INDEX[1:])
+    if skip and not before:
+        cursor = cursor.skip(skip)
+    messages = [msg async for msg in cursor.limit(max(limit, RECENT_MESSAGES_LIMIT if first_page else 0) + 1)]
+    if first_page:
+        await _cache_recent_messages(chat_id, messages, generation)
+
+    older = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        older = encode_message_cursor(messages[-1])
+    return list(reversed(messages)), older
+
+
+async def _get_chat_messages_after(chat_id: str, limit: int, after: str) -> Tuple[List[dict], Optional[str]]:
+    timestamp, message_id = _decode_message_cursor(after)
+    query = {
+        "chat_id": chat_id,
+        "is_deleted": {"$ne": True},
+        "$or": [
+            {"timestamp": {"$gt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$gt": message_id}},
+        ],
+    }
+    cursor = mongo_db[CHAT_COLLECTION].find(query).sort([("timestamp", ASCENDING), ("_id", ASCENDING)])
+    messages = [msg async for msg in cursor.limit(limit + 1)]
+
+    newer = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        newer = encode_message_cursor(messages[-1])
+    return messages, newer
+
+
+async def search_chat_messages(chat_id: str, text: str, limit: int = 20) -> List[Tuple[dict, float]]:
+    """A room's messages matching ``text``, best match first, with their text scores.
+
+    Served by the (chat_id, content) text index in one query.
+    """
+    query = {"chat_id": str(chat_id), "$text": {"$search": text}, "is_deleted": {"$ne": True}}
+    score = {"score": {"$meta": "textScore"}}
+    cursor = mongo_db[CHAT_COLLECTION].find(query, score).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    return [(msg, msg.pop("score")) async for msg in cursor]
+
+
+async def get_chat_message(message_id: str) -> Optional[dict]:
+    try:
+        return await mongo_db[CHAT_COLLECTION].find_one({"_id": ObjectId(message_id)})
+    except InvalidId:
+        return None
+
+
+async def update_chat_message(message_id: str, update_data: dict) -> Optional[dict]:
+    try:
+        object_id = ObjectId(message_id)
+    except InvalidId:
+        return None
+    if update_data.get("is_edited"):
+        update_data["edited_at"] = datetime.utcnow()
+    message = await mongo_db[CHAT_COLLECTION].find_one_and_update(
+        {"_id": object_id},
         {"$set": update_data},
-        return_document=True
+        return_document=ReturnDocument.AFTER
     )
-    if result:
-        return ChatMessage(**result)
-    return None
+    if message:
+        await forget_recent_messages(message["chat_id"])
+        await _refresh_last_message(message)
+    return message
+
 
 async def delete_chat_message(message_id: str) -> bool:
-    result = await mongo_db[CHAT_COLLECTION].delete_one({"_id": ObjectId(message_id)})
-    return result.deleted_count == 1 
\ No newline at end of file
+    try:
+        object_id = ObjectId(message_id)
+    except InvalidId:
+        return False
+    message = await mongo_db[CHAT_COLLECTION].find_one_and_delete({"_id": object_id})
+    if not message:
+        return False
+    await forget_recent_messages(message["chat_id"])
+    await _refresh_last_message(message, removed=True)
+    return True
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services import chat_service
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 0.05
+MAX_BATCH_SIZE = 200
+# Past this, senders wait for a flush instead of buffering more
+MAX_BUFFERED_MESSAGES = 10000
+# A failing room is retried after 0.5s, 1s, 2s ... at most 10s apart, and
+# its batch is dropped once it has kept failing for a minute
+RETRY_BASE_DELAY_SECONDS = 0.5
+MAX_RETRY_DELAY_SECONDS = 10.0
+RETRY_WINDOW_SECONDS = 60.0
+
+
+class WriteBehindBuffer:
+    """Chat persistence that acknowledges first and writes later.
+
+    Messages are grouped per room and written with one ``flush_batch``
+    call per room every ``flush_interval`` seconds, or as soon as a room
+    has ``max_batch_size`` waiting. Each room is written by its own task,
+    so a slow or failing room never holds up the others. A failed batch
+    stays at the head of its room, which is retried with exponential
+    backoff; it is dropped, with an error logged, once the room has kept
+    failing for ``retry_window`` seconds. ``close`` writes out whatever is
+    still buffered.
+    """
+
+    def __init__(
+        self,
+        flush_batch: Callable[[str, List[dict]], Awaitable[None]],
+        max_batch_size: int = MAX_BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        max_buffered: int = MAX_BUFFERED_MESSAGES,
+        retry_base_delay: float = RETRY_BASE_DELAY_SECONDS,
+        max_retry_delay: float = MAX_RETRY_DELAY_SECONDS,
+        retry_window: float = RETRY_WINDOW_SECONDS,
+    ):
+        self.flush_batch = flush_batch
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.retry_base_delay = retry_base_delay
+        self.max_retry_delay = max_retry_delay
+        self.retry_window = retry_window
+        self._pending: Dict[str, List[dict]] = {}
+        # Per failing room: (first failure, failed attempts, next attempt), in loop time
+        self._failures: Dict[str, Tuple[float, int, float]] = {}
+        self._room_writers: Dict[str, asyncio.Task] = {}
+        self._buffered = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def buffered(self) -> int:
+        return self._buffered
+
+    def _ensure_flusher(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._flusher is None or self._flusher.done():
+            self._closing = False
+            self._flusher = asyncio.create_task(self._run())
+
+    async def add(self, room_id: str, message: dict):
+        self._ensure_flusher()
+        while self._buffered >= self.max_buffered:
+            await self.flush()
+            if self._buffered >= self.max_buffered:
+                # Rooms still backing off; wait for their next attempt
+                await asyncio.sleep(self.flush_interval)
+        room_messages = self._pending.setdefault(str(room_id), [])
+        room_messages.append(message)
+        self._buffered += 1
+        if len(room_messages) >= self.max_batch_size:
+            self._wakeup.set()
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self._start_writers()
+
+    def _start_writers(self) -> List[asyncio.Task]:
+        """Start a writer for every room with messages that is not already being written or backing off"""
+        now = asyncio.get_running_loop().time()
+        for room_id in list(self._pending):
+            writer = self._room_writers.get(room_id)
+            failure = self._failures.get(room_id)
+            if (writer is None or writer.done()) and (failure is None or failure[2] <= now):
+                self._room_writers[room_id] = asyncio.create_task(self._write_room(room_id))
+        for room_id in [room_id for room_id, writer in self._room_writers.items() if writer.done()]:
+            del self._room_writers[room_id]
+        return list(self._room_writers.values())
+
+    async def _write_room(self, room_id: str):
+        messages = self._pending.get(room_id)
+        while messages:
+            batch = messages[:self.max_batch_size]
+            try:
+                await self.flush_batch(room_id, batch)
+                self._failures.pop(room_id, None)
+            except Exception as e:
+                if not self._give_up(room_id, batch, e):
+                    return
+            # Messages added meanwhile were appended behind the batch
+            del messages[:len(batch)]
+            self._buffered -= len(batch)
+        if not self._pending.get(room_id):
+            self._pending.pop(room_id, None)
+
+    def _give_up(self, room_id: str, batch: List[dict], error: Exception) -> bool:
+        """Schedule the room's next attempt, or drop the batch once the retry window has passed"""
+        now = asyncio.get_running_loop().time()
+        first_failure, attempts, _ = self._failures.get(room_id, (now, 0, now))
+        attempts += 1
+        if now - first_failure >= self.retry_window:
+            logger.error(
+                f"Dropping {len(batch)} chat messages for room {room_id} after {attempts} failed writes "
+                f"over {now - first_failure:.0f}s: {error}"
+            )
+            del self._failures[room_id]
+            return True
+        delay = min(self.retry_base_delay * 2 ** (attempts - 1), self.max_retry_delay)
+        self._failures[room_id] = (first_failure, attempts, now + delay)
+        logger.warning(
+            f"Chat write of {len(batch)} messages to room {room_id} failed, retrying in {delay:.1f}s: {error}"
+        )
+        return False
+
+    async def flush(self):
+        """Write out every room that is not backing off, and wait for writes already in progress"""
+        writers = self._start_writers()
+        if writers:
+            await asyncio.gather(*writers)
+
+    async def close(self):
+        """Stop the periodic flush and drain the buffer, giving failing rooms the rest of their retry window"""
+        if self._flusher is not None:
+            self._closing = True
+            self._wakeup.set()
+            await self._flusher
+            self._flusher = None
+        while True:
+            # Let in-progress writes finish rather than cancelling them mid-write
+            await self.flush()
+            if not self._buffered:
+                break
+            now = asyncio.get_running_loop().time()
+            next_attempt = min((failure[2] for failure in self._failures.values()), default=now)
+            await asyncio.sleep(max(next_attempt - now, 0))
+
+
+async def _insert_room_batch(room_id: str, messages: List[dict]):
+    await chat_service.insert_chat_messages(messages)
+
+
+chat_write_buffer = WriteBehindBuffer(_insert_room_batch)
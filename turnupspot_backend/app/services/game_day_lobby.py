@@ -0,0 +1,43 @@
+import json
+from fastapi import WebSocket
+
+from app.core.cache import redis
+from app.services.chat_connections import ConnectionManager
+
+LOBBY_CHANNEL_PREFIX = "game_day:lobby:"
+
+
+class GameDayLobbyManager(ConnectionManager):
+    """Keeps the game-day lobby sockets of each sport group and pushes events to them.
+
+    Built on the chat connection manager: events reach the group's sockets
+    on every worker over the Redis backplane, and each socket has its own
+    outbound queue so a slow client never holds up the rest of the lobby.
+    Lobby clients only listen, so there is no heartbeat.
+    """
+
+    def __init__(self, redis_client=None, **options):
+        options.setdefault("heartbeat_interval", None)
+        super().__init__(redis_client, channel_prefix=LOBBY_CHANNEL_PREFIX, **options)
+
+    async def connect(self, websocket: WebSocket, sport_group_id: str, user_id: int):
+        await super().connect(websocket, str(sport_group_id), user_id)
+
+    async def disconnect(self, websocket: WebSocket, sport_group_id: str):
+        await super().disconnect(websocket, str(sport_group_id))
+
+    def connection_count(self, sport_group_id: str) -> int:
+        return len(self.room_connections.get(str(sport_group_id), ()))
+
+    async def send_event(self, websocket: WebSocket, event: dict):
+        """Queue an event for one socket, ahead of any later broadcast"""
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.enqueue(json.dumps(event, default=str))
+
+    async def broadcast(self, sport_group_id: str, event: dict):
+        """Send an event to every lobby socket of a group, on every worker"""
+        await self.broadcast_to_room(json.dumps(event, default=str), str(sport_group_id))
+
+
+lobby_manager = GameDayLobbyManager(redis)
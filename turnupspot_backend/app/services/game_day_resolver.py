@@ -0,0 +1,115 @@
+from datetime import date, datetime, time
+from typing import Optional, Tuple
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models.game import Game, GameStatus
+from app.models.sport_group import PlayingDay, Day, SportGroup
+
+ACTIVE_GAME_STATUSES = (GameStatus.SCHEDULED, GameStatus.IN_PROGRESS)
+
+# Games may also be created by the Celery materializer in another process,
+# so "no game today" answers only live for a minute.
+ACTIVE_GAME_TTL_SECONDS = 60
+PLAYING_DAYS_TTL_SECONDS = 600
+
+# (sport_group_id, local date) -> active game id, or None when there is no game
+_active_game_cache = TTLCache(ACTIVE_GAME_TTL_SECONDS)
+# sport_group_id -> bitmask of playing weekdays (bit 0 = Monday ... bit 6 = Sunday)
+_playing_days_cache = TTLCache(PLAYING_DAYS_TTL_SECONDS)
+
+_WEEKDAY_BITS = {day: 1 << index for index, day in enumerate(Day)}
+
+
+def playing_days_to_mask(days) -> int:
+    """Fold a collection of Day values into a weekday bitmask"""
+    mask = 0
+    for day in days:
+        mask |= _WEEKDAY_BITS[Day(day)]
+    return mask
+
+
+def get_playing_days_mask(db: Session, sport_group_id: str) -> int:
+    sport_group_id = str(sport_group_id)
+    mask = _playing_days_cache.get(sport_group_id)
+    if mask is None:
+        days = db.query(PlayingDay.day).filter(PlayingDay.sport_group_id == sport_group_id).all()
+        mask = playing_days_to_mask(day for (day,) in days if day is not None)
+        _playing_days_cache.set(sport_group_id, mask)
+    return mask
+
+
+def is_playing_day(db: Session, sport_group_id: str, day: date) -> bool:
+    return bool(get_playing_days_mask(db, sport_group_id) & (1 << day.weekday()))
+
+
+def get_todays_game(db: Session, sport_group_id: str, day: date) -> Optional[Game]:
+    """Return the scheduled or in-progress game of a group on a local date"""
+    sport_group_id = str(sport_group_id)
+    key = (sport_group_id, day)
+    if key in _active_game_cache:
+        game_id = _active_game_cache.get(key)
+        if game_id is None:
+            return None
+        game = db.get(Game, game_id)
+        # Status may have moved on in another process; fall through and re-resolve
+        if game is not None and game.status in ACTIVE_GAME_STATUSES:
+            return game
+        _active_game_cache.invalidate(key)
+
+    game = db.query(Game).filter(
+        and_(
+            Game.sport_group_id == sport_group_id,
+            # game_date is a DateTime holding midnight of the local date
+            Game.game_date == datetime.combine(day, time()),
+            Game.status.in_(ACTIVE_GAME_STATUSES)
+        )
+    ).first()
+    _active_game_cache.set(key, game.id if game else None)
+    return game
+
+
+def invalidate_todays_game(sport_group_id: str):
+    """Forget the cached active game of a group for every date"""
+    sport_group_id = str(sport_group_id)
+    _active_game_cache.invalidate_where(lambda key: key[0] == sport_group_id)
+
+
+def get_or_create_todays_game(db: Session, sport_group: SportGroup, day: date) -> Tuple[Game, bool]:
+    """The group's active game on a local date, creating a scheduled one when there is none.
+
+    Returns the game and whether it was created here. Another worker or the
+    materializer may have created it since this process cached "no game";
+    the active-game unique index then rejects the insert and the existing
+    game is read back instead.
+    """
+    game = get_todays_game(db, sport_group.id, day)
+    if game:
+        return game, False
+
+    game = Game(
+        sport_group_id=sport_group.id,
+        game_date=datetime.combine(day, time()),
+        start_time=datetime.combine(day, sport_group.game_start_time),
+        end_time=datetime.combine(day, sport_group.game_end_time),
+        status=GameStatus.SCHEDULED
+    )
+    try:
+        # The savepoint keeps the session usable on conflict
+        with db.begin_nested():
+            db.add(game)
+            db.flush()
+    except IntegrityError:
+        invalidate_todays_game(sport_group.id)
+        existing = get_todays_game(db, sport_group.id, day)
+        if existing is None:
+            raise
+        return existing, False
+    invalidate_todays_game(sport_group.id)
+    return game, True
+
+
+def invalidate_playing_days(sport_group_id: str):
+    _playing_days_cache.invalidate(str(sport_group_id))
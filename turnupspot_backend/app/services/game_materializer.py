@@ -0,0 +1,139 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import Date, String, and_, cast, exists, func, literal, select, true, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+try:
+    from zoneinfo import ZoneInfo
+    MOUNTAIN_TZ = ZoneInfo("America/Denver")
+except ImportError:
+    import pytz
+    MOUNTAIN_TZ = pytz.timezone("America/Denver")
+
+from app.models.game import Game, GameStatus
+from app.models.sport_group import SportGroup, PlayingDay, Day
+
+DEFAULT_DAYS_AHEAD = 7
+
+_DAYS_BY_WEEKDAY = list(Day)
+
+
+def _new_id(dialect_name: str):
+    if dialect_name == "postgresql":
+        return cast(func.gen_random_uuid(), String)
+    # SQLite stand-in: 32 random hex characters
+    return func.lower(func.hex(func.randomblob(16)))
+
+
+def _typed_literal(dialect_name: str, value, type_):
+    """Bound literal that PostgreSQL will accept for enum and json columns"""
+    if dialect_name == "postgresql":
+        # No implicit cast from text to enum/json inside INSERT ... SELECT
+        return cast(literal(value, type_), type_)
+    return literal(value, type_)
+
+
+def _as_timestamp(dialect_name: str, day_column):
+    if dialect_name == "postgresql":
+        return day_column
+    return func.datetime(day_column)
+
+
+def _same_day(dialect_name: str, timestamp_column, day_column):
+    if dialect_name == "postgresql":
+        # Keeps games.game_date bare so the (sport_group_id, game_date) index applies
+        return timestamp_column == day_column
+    return func.date(timestamp_column) == day_column
+
+
+def _combine(dialect_name: str, day_column, time_column):
+    """SQL equivalent of datetime.combine(day, time)"""
+    if dialect_name == "postgresql":
+        return cast(day_column, Date).op("+")(time_column)
+    return func.datetime(day_column.op("||")(" ").op("||")(time_column))
+
+
+# Columns the SELECT computes itself; the others take the model's defaults
+_COMPUTED_COLUMNS = ["id", "sport_group_id", "game_date", "start_time", "end_time", "status"]
+
+
+def _column_defaults(dialect_name: str, table):
+    """Names and literals of the Python-side column defaults, so materialized games match ORM-created ones"""
+    names, values = [], []
+    for column in table.c:
+        default = column.default
+        if column.name in _COMPUTED_COLUMNS or default is None:
+            continue
+        if default.is_scalar:
+            value = default.arg
+        elif default.is_callable:
+            # SQLAlchemy wraps argument-less callables to take the execution context
+            value = default.arg(None)
+        else:
+            continue
+        names.append(column.name)
+        values.append(_typed_literal(dialect_name, value, column.type))
+    return names, values
+
+
+def materialize_games(db: Session, days_ahead: int = DEFAULT_DAYS_AHEAD, start: Optional[date] = None) -> int:
+    """Create the scheduled games of every active group for the next ``days_ahead`` local days.
+
+    Runs as a single INSERT ... SELECT over the list of dates, semi-joined
+    against playing_days and skipping dates that already have a game. Returns
+    the number of games created.
+    """
+    if days_ahead < 1:
+        return 0
+    dialect_name = db.get_bind().dialect.name
+    games = Game.__table__
+    start = start or datetime.now(MOUNTAIN_TZ).date()
+
+    # One row per (local date, weekday) in the horizon; a UNION ALL of literals
+    # works on both PostgreSQL and SQLite, unlike a column-aliased VALUES list.
+    day_type = PlayingDay.__table__.c.day.type
+    horizon = union_all(*[
+        select(
+            literal(day, Date).label("game_date"),
+            _typed_literal(dialect_name, _DAYS_BY_WEEKDAY[day.weekday()], day_type).label("day")
+        )
+        for day in (start + timedelta(days=offset) for offset in range(days_ahead))
+    ]).subquery("horizon")
+
+    default_names, default_values = _column_defaults(dialect_name, games)
+    rows = select(
+        _new_id(dialect_name),
+        SportGroup.id,
+        _as_timestamp(dialect_name, horizon.c.game_date),
+        _combine(dialect_name, horizon.c.game_date, SportGroup.game_start_time),
+        _combine(dialect_name, horizon.c.game_date, SportGroup.game_end_time),
+        _typed_literal(dialect_name, GameStatus.SCHEDULED, games.c.status.type),
+        *default_values,
+    ).select_from(SportGroup).join(horizon, true()).where(
+        and_(
+            SportGroup.is_active == True,
+            exists().where(
+                and_(
+                    PlayingDay.sport_group_id == SportGroup.id,
+                    PlayingDay.day == horizon.c.day
+                )
+            ),
+            ~exists().where(
+                and_(
+                    Game.sport_group_id == SportGroup.id,
+                    _same_day(dialect_name, Game.game_date, horizon.c.game_date)
+                )
+            )
+        )
+    )
+
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(games).from_select(
+        _COMPUTED_COLUMNS + default_names,
+        rows
+    ).on_conflict_do_nothing()
+
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount or 0
@@ -0,0 +1,89 @@
+import heapq
+import math
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.sport_group import SportGroup, SportsType
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LATITUDE = 111.32
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """Latitude bounds and longitude ranges that contain every point within radius_km.
+
+    Longitude ranges are split in two when the box crosses the antimeridian,
+    and widen to the whole circle near the poles.
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LATITUDE
+    min_lat, max_lat = max(-90.0, lat - d_lat), min(90.0, lat + d_lat)
+
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 1e-9:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+    d_lng = radius_km / (KM_PER_DEGREE_LATITUDE * cos_lat)
+    if d_lng >= 180.0:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+
+    min_lng, max_lng = lng - d_lng, lng + d_lng
+    if min_lng < -180.0:
+        return min_lat, max_lat, [(min_lng + 360.0, 180.0), (-180.0, max_lng)]
+    if max_lng > 180.0:
+        return min_lat, max_lat, [(min_lng, 180.0), (-180.0, max_lng - 360.0)]
+    return min_lat, max_lat, [(min_lng, max_lng)]
+
+
+def find_nearby_groups(
+    db: Session,
+    lat: float,
+    lng: float,
+    radius_km: float,
+    limit: int = 20,
+    sports_type: Optional[SportsType] = None,
+) -> List[Tuple[SportGroup, float]]:
+    """Nearest active groups within radius_km, closest first, with their distance.
+
+    The bounding box is served by the (venue_latitude, venue_longitude) index
+    and only selects coordinates; exact distances are computed for those
+    candidates and full rows are loaded for the nearest ``limit`` alone.
+    """
+    min_lat, max_lat, lng_ranges = bounding_box(lat, lng, radius_km)
+    query = db.query(SportGroup.id, SportGroup.venue_latitude, SportGroup.venue_longitude).filter(
+        and_(
+            SportGroup.is_active == True,
+            SportGroup.venue_latitude.between(min_lat, max_lat),
+            or_(*[SportGroup.venue_longitude.between(low, high) for low, high in lng_ranges]),
+        )
+    )
+    if sports_type:
+        query = query.filter(SportGroup.sports_type == sports_type)
+
+    # The box corners lie outside the circle, so drop candidates beyond the radius
+    candidates = (
+        (haversine_km(lat, lng, group_lat, group_lng), group_id)
+        for group_id, group_lat, group_lng in query.all()
+    )
+    nearest = heapq.nsmallest(
+        limit, ((distance, group_id) for distance, group_id in candidates if distance <= radius_km)
+    )
+    if not nearest:
+        return []
+
+    groups = {
+        group.id: group
+        for group in db.query(SportGroup)
+        .options(selectinload(SportGroup.playing_days))
+        .filter(SportGroup.id.in_([group_id for _, group_id in nearest]))
+        .all()
+    }
+    return [(groups[group_id], distance) for distance, group_id in nearest if group_id in groups]
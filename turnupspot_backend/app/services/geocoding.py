@@ -1,29 +1,213 @@
-import googlemaps
+import asyncio
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import LRUCache
 from app.core.config import settings
-from typing import Tuple, Optional
+from app.models.geocoding import GeocodeCacheEntry
+
+Coordinates = Tuple[Optional[float], Optional[float]]
+NOT_FOUND: Coordinates = (None, None)
+
+
+def normalize_address(address: str) -> str:
+    """Cache key for an address: case, spacing and stray punctuation don't matter"""
+    key = address.casefold()
+    key = re.sub(r"[.#]", " ", key)
+    key = re.sub(r"\s*,\s*", ", ", key)
+    key = re.sub(r"\s+", " ", key)
+    return key.strip(" ,")
+
+
+class GoogleMapsProvider:
+    name = "google"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._client = None
+
+    @property
+    def client(self):
+        # Built on first use so importing the app never needs a valid key
+        if self._client is None:
+            import googlemaps
+            self._client = googlemaps.Client(key=self.api_key)
+        return self._client
+
+    def geocode(self, address: str) -> Coordinates:
+        """Coordinates of the first match, or (None, None); raises when the lookup itself fails"""
+        result = self.client.geocode(address)
+        if not result:
+            return NOT_FOUND
+        location = result[0]['geometry']['location']
+        return location['lat'], location['lng']
+
+
+class StubGeocodingProvider:
+    """Offline provider answering from a fixed table, for tests and local development"""
+    name = "stub"
+
+    def __init__(self, coordinates: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.coordinates = {normalize_address(a): c for a, c in (coordinates or {}).items()}
+        self.calls: List[str] = []
+
+    def geocode(self, address: str) -> Coordinates:
+        self.calls.append(address)
+        return self.coordinates.get(normalize_address(address), NOT_FOUND)
+
 
 class GeocodingService:
-    def __init__(self):
-        self.client = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
+    """Geocoder with a per-process LRU in front of the geocode_cache table.
 
-    def get_coordinates(self, address: str) -> Tuple[Optional[float], Optional[float]]:
-        """
-        Get latitude and longitude for a given address using Google Maps Geocoding API.
-        Returns a tuple of (latitude, longitude) or (None, None) if geocoding fails.
-        """
+    Lookups are keyed by the normalized address, so known venues never hit
+    the network. Misses are cached too, for a shorter time. Provider errors
+    are not cached.
+    """
+
+    def __init__(
+        self,
+        provider,
+        memory_cache_size: int = settings.GEOCODING_MEMORY_CACHE_SIZE,
+        ttl_seconds: int = settings.GEOCODING_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: int = settings.GEOCODING_NEGATIVE_TTL_SECONDS,
+        concurrency: int = 5,
+    ):
+        self.provider = provider
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.concurrency = concurrency
+        self.memory = LRUCache(memory_cache_size, ttl_seconds)
+
+    def _ttl(self, coordinates: Coordinates) -> int:
+        return self.ttl_seconds if coordinates[0] is not None else self.negative_ttl_seconds
+
+    def _lookup_cached(self, db: Optional[Session], keys: Iterable[str]) -> Dict[str, Coordinates]:
+        found = {}
+        missing = []
+        for key in keys:
+            coordinates = self.memory.get(key)
+            if coordinates is None:
+                missing.append(key)
+            else:
+                found[key] = coordinates
+        if db is not None and missing:
+            now = datetime.utcnow()
+            rows = (
+                db.query(GeocodeCacheEntry)
+                .filter(
+                    GeocodeCacheEntry.address_key.in_(missing),
+                    GeocodeCacheEntry.expires_at > now,
+                )
+                .all()
+            )
+            for row in rows:
+                coordinates = (row.latitude, row.longitude)
+                found[row.address_key] = coordinates
+                self.memory.set(row.address_key, coordinates, ttl=(row.expires_at - now).total_seconds())
+        return found
+
+    def _store(self, db: Optional[Session], results: Dict[str, Tuple[str, Coordinates]]):
+        """Cache provider results; commits ``db``, so call it before staging other changes"""
+        for key, (_, coordinates) in results.items():
+            self.memory.set(key, coordinates, ttl=self._ttl(coordinates))
+        if db is None or not results:
+            return
+        now = datetime.utcnow()
+        for key, (address, coordinates) in results.items():
+            db.merge(GeocodeCacheEntry(
+                address_key=key,
+                address=address,
+                latitude=coordinates[0],
+                longitude=coordinates[1],
+                provider=self.provider.name,
+                expires_at=now + timedelta(seconds=self._ttl(coordinates)),
+            ))
         try:
-            # Geocode the address
-            result = self.client.geocode(address)
-            
-            if not result:
-                return None, None
-            
-            # Extract location from the first result
-            location = result[0]['geometry']['location']
-            return location['lat'], location['lng']
-            
+            db.commit()
+        except IntegrityError:
+            # Another worker cached the same address first
+            db.rollback()
+
+    def _fetch(self, address: str) -> Optional[Coordinates]:
+        try:
+            return self.provider.geocode(address)
         except Exception as e:
             print(f"Geocoding error: {str(e)}")
-            return None, None
+            return None
+
+    def cached_coordinates(self, address: str, db: Optional[Session] = None) -> Optional[Coordinates]:
+        """Coordinates from the cache alone, or None when the address would have to go to the provider.
+
+        Never calls the provider and never commits ``db``; safe inside a request.
+        """
+        key = normalize_address(address)
+        return self._lookup_cached(db, [key]).get(key)
+
+    def get_coordinates(self, address: str, db: Optional[Session] = None) -> Coordinates:
+        """Latitude and longitude of an address, or (None, None) if it can't be geocoded.
+
+        Blocks on the provider only when the address isn't cached; for sync callers.
+        """
+        key = normalize_address(address)
+        cached = self._lookup_cached(db, [key])
+        if key in cached:
+            return cached[key]
+        coordinates = self._fetch(address)
+        if coordinates is None:
+            return NOT_FOUND
+        self._store(db, {key: (address, coordinates)})
+        return coordinates
+
+    async def geocode(self, address: str, db: Optional[Session] = None) -> Coordinates:
+        return (await self.geocode_many([address], db))[address]
+
+    async def geocode_many(self, addresses: Iterable[str], db: Optional[Session] = None) -> Dict[str, Coordinates]:
+        """Geocode many addresses, e.g. for a backfill.
+
+        Cached addresses are answered with one query. Each distinct
+        normalized address goes to the provider at most once, and at most
+        ``concurrency`` requests are in flight at a time.
+        """
+        addresses = list(addresses)
+        by_key: Dict[str, str] = {}
+        for address in addresses:
+            by_key.setdefault(normalize_address(address), address)
+
+        resolved = self._lookup_cached(db, by_key.keys())
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(key: str):
+            async with semaphore:
+                return key, await run_in_threadpool(self._fetch, by_key[key])
+
+        fetched = await asyncio.gather(*[fetch(key) for key in by_key if key not in resolved])
+        results = {key: (by_key[key], coordinates) for key, coordinates in fetched if coordinates is not None}
+        self._store(db, results)
+        for key, (_, coordinates) in results.items():
+            resolved[key] = coordinates
+
+        return {address: resolved.get(normalize_address(address), NOT_FOUND) for address in addresses}
+
+
+_geocoding_service = None
+
+
+def get_geocoding_service() -> GeocodingService:
+    global _geocoding_service
+    if _geocoding_service is None:
+        if settings.GEOCODING_PROVIDER == "stub":
+            provider = StubGeocodingProvider()
+        else:
+            provider = GoogleMapsProvider(settings.GOOGLE_MAPS_API_KEY)
+        _geocoding_service = GeocodingService(provider)
+    return _geocoding_service
+
 
-geocoding_service = GeocodingService() 
\ No newline at end of file
+def set_geocoding_service(service: Optional[GeocodingService]):
+    """Swap the geocoder, e.g. for one with a stub provider in tests"""
+    global _geocoding_service
+    _geocoding_service = service
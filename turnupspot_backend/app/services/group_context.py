@@ -0,0 +1,105 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models.sport_group import SportGroup, SportGroupMember, MemberRole
+
+# Short TTL so other workers converge quickly after a membership change;
+# changes made in this process invalidate immediately.
+GROUP_CONTEXT_TTL_SECONDS = 30
+
+# sport_group_id -> {"creator_id": int, "is_active": bool} (None if the group does not exist)
+_group_cache = TTLCache(GROUP_CONTEXT_TTL_SECONDS)
+# (sport_group_id, user_id) -> {"id": int, "role": MemberRole, "is_approved": bool} (None if not a member)
+_membership_cache = TTLCache(GROUP_CONTEXT_TTL_SECONDS)
+
+
+class GroupContext:
+    """A user's standing in a sport group, resolved once per request"""
+
+    def __init__(self, sport_group_id: str, user_id: int, group: Optional[dict], membership: Optional[dict]):
+        self.sport_group_id = sport_group_id
+        self.user_id = user_id
+        self.group_exists = group is not None
+        self.creator_id = group["creator_id"] if group else None
+        self.is_group_active = group["is_active"] if group else False
+        self.membership_id = membership["id"] if membership else None
+        self.role = membership["role"] if membership else None
+        self.is_approved = membership["is_approved"] if membership else False
+
+    @property
+    def has_membership(self) -> bool:
+        """True for approved members and pending join requests"""
+        return self.membership_id is not None
+
+    @property
+    def is_member(self) -> bool:
+        """True for approved members only"""
+        return self.has_membership and self.is_approved
+
+    @property
+    def is_creator(self) -> bool:
+        return self.group_exists and self.creator_id == self.user_id
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == MemberRole.ADMIN or self.is_creator
+
+    def get_sport_group(self, db: Session) -> Optional[SportGroup]:
+        """Load the full group row (served from the session identity map when already loaded)"""
+        return db.get(SportGroup, self.sport_group_id) if self.group_exists else None
+
+    def get_membership(self, db: Session) -> Optional[SportGroupMember]:
+        return db.get(SportGroupMember, self.membership_id) if self.membership_id else None
+
+    def __repr__(self):
+        return f"<GroupContext(group_id={self.sport_group_id}, user_id={self.user_id}, role='{self.role}', approved={self.is_approved})>"
+
+
+def resolve_group_context(db: Session, sport_group_id: str, user_id: int, fresh: bool = False) -> GroupContext:
+    """Resolve group, membership and role for a user, using the per-process cache.
+
+    The cache is only invalidated in the process that made a change, so
+    writes and permission checks pass ``fresh=True`` to read the database
+    (refreshing the cache); read-only views may be up to
+    GROUP_CONTEXT_TTL_SECONDS behind.
+    """
+    sport_group_id = str(sport_group_id)
+
+    group = _group_cache.get(sport_group_id)
+    if fresh or sport_group_id not in _group_cache:
+        row = db.query(SportGroup.creator_id, SportGroup.is_active).filter(
+            SportGroup.id == sport_group_id
+        ).first()
+        group = {"creator_id": row.creator_id, "is_active": row.is_active} if row else None
+        _group_cache.set(sport_group_id, group)
+
+    key = (sport_group_id, user_id)
+    membership = _membership_cache.get(key)
+    if fresh or key not in _membership_cache:
+        row = db.query(
+            SportGroupMember.id, SportGroupMember.role, SportGroupMember.is_approved
+        ).filter(
+            SportGroupMember.sport_group_id == sport_group_id,
+            SportGroupMember.user_id == user_id
+        ).first()
+        membership = {"id": row.id, "role": row.role, "is_approved": row.is_approved} if row else None
+        _membership_cache.set(key, membership)
+
+    return GroupContext(sport_group_id, user_id, group, membership)
+
+
+def invalidate_membership(sport_group_id: str, user_id: Optional[int] = None):
+    """Forget cached memberships for one user, or for every user of the group"""
+    sport_group_id = str(sport_group_id)
+    if user_id is not None:
+        _membership_cache.invalidate((sport_group_id, user_id))
+    else:
+        _membership_cache.invalidate_where(lambda key: key[0] == sport_group_id)
+
+
+def invalidate_group(sport_group_id: str):
+    """Forget the cached group row and all of its memberships"""
+    sport_group_id = str(sport_group_id)
+    _group_cache.invalidate(sport_group_id)
+    invalidate_membership(sport_group_id)
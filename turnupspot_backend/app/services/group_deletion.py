@@ -0,0 +1,123 @@
+import logging
+import uuid
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import sync_redis
+from app.core.nosql import get_sync_mongo_db
+from app.models.chat import ChatRoom, ChatMessage
+from app.models.game import Game, GameTeam, GamePlayer, Match
+from app.models.manual_checkin import GameDayParticipant
+from app.models.sport_group import SportGroup, SportGroupMember, PlayingDay, Team, TeamMember
+from app.nosql_models.indexes import CHAT_MESSAGES, CHAT_READ_STATE, CHAT_ROOM_SUMMARIES
+from app.services.chat_service import recent_cache_keys
+from app.services.qr_code import delete_invite_qrs
+
+logger = logging.getLogger(__name__)
+
+DELETE_CHUNK_SIZE = 1000
+DELETION_TASK_PREFIX = "group-deletion"
+
+
+def deletion_task_id(user_id: int) -> str:
+    """A task id that records who asked for the deletion"""
+    return f"{DELETION_TASK_PREFIX}-{user_id}-{uuid.uuid4().hex}"
+
+
+def deletion_task_owner(task_id: str) -> Optional[int]:
+    """The user a deletion task id was issued to, or None if it isn't one"""
+    head, _, token = task_id.rpartition("-")
+    prefix, _, user_id = head.rpartition("-")
+    if prefix != DELETION_TASK_PREFIX or not user_id.isdigit() or not token:
+        return None
+    return int(user_id)
+
+
+def _deletion_steps(sport_group_id: str):
+    """(label, model, filter) in foreign-key order: dependents before what they reference"""
+    room_ids = select(ChatRoom.id).where(ChatRoom.sport_group_id == sport_group_id)
+    game_ids = select(Game.id).where(Game.sport_group_id == sport_group_id)
+    team_ids = select(Team.id).where(Team.sport_group_id == sport_group_id)
+    return [
+        ("chat_messages", ChatMessage, ChatMessage.chat_room_id.in_(room_ids)),
+        ("chat_rooms", ChatRoom, ChatRoom.sport_group_id == sport_group_id),
+        # Matches reference game teams
+        ("matches", Match, Match.game_id.in_(game_ids)),
+        ("game_players", GamePlayer, GamePlayer.game_id.in_(game_ids)),
+        ("game_teams", GameTeam, GameTeam.game_id.in_(game_ids)),
+        ("game_day_participants", GameDayParticipant, GameDayParticipant.game_id.in_(game_ids)),
+        ("games", Game, Game.sport_group_id == sport_group_id),
+        ("team_members", TeamMember, TeamMember.team_id.in_(team_ids)),
+        ("teams", Team, Team.sport_group_id == sport_group_id),
+        ("members", SportGroupMember, SportGroupMember.sport_group_id == sport_group_id),
+        ("playing_days", PlayingDay, PlayingDay.sport_group_id == sport_group_id),
+    ]
+
+
+def purge_chat_store(room_ids: List[int]) -> Dict[str, int]:
+    """Delete the rooms' Mongo messages, summaries and read pointers, and their cached recent messages"""
+    chat_ids = [str(room_id) for room_id in room_ids]
+    if not chat_ids:
+        return {"mongo_chat_messages": 0, "chat_room_summaries": 0, "chat_read_state": 0}
+    mongo_db = get_sync_mongo_db()
+    deleted = {
+        "mongo_chat_messages": mongo_db[CHAT_MESSAGES].delete_many({"chat_id": {"$in": chat_ids}}).deleted_count,
+        "chat_room_summaries": mongo_db[CHAT_ROOM_SUMMARIES].delete_many({"_id": {"$in": chat_ids}}).deleted_count,
+        "chat_read_state": mongo_db[CHAT_READ_STATE].delete_many({"chat_id": {"$in": chat_ids}}).deleted_count,
+    }
+    sync_redis.delete(*[key for chat_id in chat_ids for key in recent_cache_keys(chat_id)])
+    return deleted
+
+
+def _delete_chunk(db: Session, model, condition, chunk_size: int) -> int:
+    ids = [row_id for (row_id,) in db.query(model.id).filter(condition).limit(chunk_size).all()]
+    if not ids:
+        return 0
+    db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    return len(ids)
+
+
+def delete_sport_group_data(
+    db: Session,
+    sport_group_id: str,
+    chunk_size: int = DELETE_CHUNK_SIZE,
+    on_progress: Optional[Callable[[str, Dict[str, int]], None]] = None,
+) -> Dict[str, int]:
+    """Delete a sport group and everything that hangs off it, one chunk per transaction.
+
+    Each chunk commits on its own, so locks are held briefly and an
+    interrupted run resumes where it left off when started again. The group
+    row itself goes last. ``on_progress`` is called after every chunk with
+    the current step and the running totals; the totals are also returned.
+    """
+    # Chat history lives in Mongo; it goes while the room rows still say which rooms were the group's
+    room_ids = [room_id for (room_id,) in db.query(ChatRoom.id).filter(ChatRoom.sport_group_id == sport_group_id)]
+    deleted: Dict[str, int] = purge_chat_store(room_ids)
+    if on_progress:
+        on_progress("chat_store", deleted)
+    deleted["invite_qr_codes"] = delete_invite_qrs(sport_group_id)
+    if on_progress:
+        on_progress("invite_qr_codes", deleted)
+
+    for label, model, condition in _deletion_steps(sport_group_id):
+        deleted[label] = 0
+        while True:
+            count = _delete_chunk(db, model, condition, chunk_size)
+            if not count:
+                break
+            deleted[label] += count
+            if on_progress:
+                on_progress(label, deleted)
+        if deleted[label]:
+            logger.info(f"Deleted {deleted[label]} {label} of sport group {sport_group_id}")
+
+    deleted["sport_groups"] = (
+        db.query(SportGroup).filter(SportGroup.id == sport_group_id).delete(synchronize_session=False)
+    )
+    db.commit()
+    if on_progress:
+        on_progress("sport_groups", deleted)
+    logger.info(f"Deleted sport group {sport_group_id}")
+    return deleted
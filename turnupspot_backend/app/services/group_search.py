@@ -0,0 +1,128 @@
+import re
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import Float, and_, cast, column, func, literal_column, or_, table, text
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.sport_group import SportGroup, SportsType
+
+SEARCH_CONFIG = "english"
+
+# bm25() column weights for the FTS5 table: name, description, venue_name
+_SQLITE_BM25_RANK = literal_column("bm25(sport_groups_fts, 10.0, 1.0, 5.0)", Float)
+_sqlite_fts = table("sport_groups_fts", column("rowid"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _sqlite_match_query(search: str) -> Optional[str]:
+    """Turn free text into an FTS5 query that prefix-matches every word"""
+    tokens = _TOKEN_RE.findall(search.lower())
+    if not tokens:
+        return None
+    # Quoting keeps FTS5 operators in user input inert
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _ranked_query(db: Session, search: str):
+    """Query of matching group ids and their rank, or None if nothing can match.
+
+    Returns the query, the rank expression and whether a higher rank is a
+    better match; results are ordered by rank, then id.
+    """
+    dialect_name = db.get_bind().dialect.name
+
+    if dialect_name == "postgresql":
+        search_vector = literal_column("sport_groups.search_vector")
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, search)
+        # Double precision, so the rank round-trips through a cursor exactly
+        rank = cast(func.ts_rank_cd(search_vector, ts_query) + func.similarity(SportGroup.venue_name, search), Float)
+        return db.query(SportGroup.id, rank.label("rank")).filter(
+            or_(
+                search_vector.op("@@")(ts_query),
+                # Trigram match so misspelt venue names still find the group
+                SportGroup.venue_name.op("%")(search),
+            )
+        ), rank, True
+
+    if dialect_name == "sqlite":
+        match = _sqlite_match_query(search)
+        if match is None:
+            return None
+        return db.query(SportGroup.id, _SQLITE_BM25_RANK.label("rank")).join(
+            _sqlite_fts, _sqlite_fts.c.rowid == literal_column("sport_groups.rowid")
+        ).filter(
+            text("sport_groups_fts MATCH :match").bindparams(match=match)
+        ), _SQLITE_BM25_RANK, False
+
+    pattern = f"%{search}%"
+    return db.query(SportGroup.id, SportGroup.name.label("rank")).filter(
+        or_(
+            SportGroup.name.ilike(pattern),
+            SportGroup.description.ilike(pattern),
+            SportGroup.venue_name.ilike(pattern),
+        )
+    ), SportGroup.name, False
+
+
+def _after_cursor(query, rank, higher_first: bool, cursor: str):
+    """Rows ranked after the (rank, id) position the cursor was made from"""
+    last_rank, last_id = decode_cursor(cursor, 2)
+    try:
+        last_rank = rank.type.python_type(last_rank)
+    except (TypeError, ValueError):
+        last_rank = None
+    if last_rank is None or not isinstance(last_id, str):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    ranked_after = rank < last_rank if higher_first else rank > last_rank
+    return query.filter(or_(ranked_after, and_(rank == last_rank, SportGroup.id > last_id)))
+
+
+def search_sport_groups(
+    db: Session,
+    search: str,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    sports_type: Optional[SportsType] = None,
+) -> Tuple[List[SportGroup], Optional[str]]:
+    """Active sport groups matching a free-text search, best match first.
+
+    Ranking and pagination run over the search index and return ids only;
+    full rows are loaded for the requested page alone. Pages are keyed on
+    (rank, id) like ``keyset_paginate``: the cursor holds the last row's
+    rank and id, and ``skip`` is the OFFSET fallback without one. Returns
+    the page and the cursor of the next page, if any.
+    """
+    ranked = _ranked_query(db, search.strip())
+    if ranked is None:
+        return [], None
+    query, rank, higher_first = ranked
+
+    query = query.filter(SportGroup.is_active == True)
+    if sports_type:
+        query = query.filter(SportGroup.sports_type == sports_type)
+    query = query.order_by(rank.desc() if higher_first else rank.asc(), SportGroup.id)
+
+    if cursor:
+        query = _after_cursor(query, rank, higher_first, cursor)
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].rank, rows[-1].id])
+    if not rows:
+        return [], None
+
+    groups = (
+        db.query(SportGroup)
+        .options(selectinload(SportGroup.playing_days))
+        .filter(SportGroup.id.in_([row.id for row in rows]))
+        .all()
+    )
+    position = {row.id: index for index, row in enumerate(rows)}
+    return sorted(groups, key=lambda group: position[group.id]), next_cursor
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import tempfile
+from typing import Dict, Optional
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.storage import get_storage
+
+# Storage key prefix of uploaded media
+UPLOAD_KEY_PREFIX = "uploads"
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Longest edge in pixels of each WebP derivative
+IMAGE_VARIANTS = {
+    "thumb": 400,
+    "large": 1600,
+}
+WEBP_QUALITY = 80
+
+_IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Content type from the file's magic bytes, whatever the client claimed"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class StoredFile:
+    def __init__(self, filename: str, content_hash: str, size: int, content_type: str, is_new: bool):
+        self.filename = filename
+        self.content_hash = content_hash
+        self.size = size
+        self.content_type = content_type
+        self.is_new = is_new
+
+    @property
+    def key(self) -> str:
+        return upload_key(self.filename)
+
+    @property
+    def url(self) -> str:
+        return get_storage().url(self.key)
+
+
+def upload_key(filename: str) -> str:
+    return f"{UPLOAD_KEY_PREFIX}/{filename}"
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _commit_upload(temp_path: str, key: str, content_type: str) -> bool:
+    """Hand a finished upload to storage; False when identical content is already stored"""
+    storage = get_storage()
+    try:
+        if storage.exists(key):
+            return False
+        storage.save_file(key, temp_path, content_type)
+        return True
+    finally:
+        _remove_quietly(temp_path)
+
+
+async def store_image_upload(upload: UploadFile, prefix: str) -> StoredFile:
+    """Stream an uploaded image to storage, enforcing type and size as it arrives.
+
+    Chunks are spooled to a temporary file from the threadpool so the event
+    loop never blocks on disk I/O, then handed to the storage backend. Files
+    are named by the SHA-256 of their content, so uploading the same image
+    twice stores it once and every URL is immutable.
+    """
+    if upload.content_type not in settings.ALLOWED_IMAGE_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported image type. Allowed types: {', '.join(settings.ALLOWED_IMAGE_TYPES)}",
+        )
+
+    fd, temp_path = await run_in_threadpool(tempfile.mkstemp, suffix=".part")
+    buffer = await run_in_threadpool(os.fdopen, fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if content_type is None:
+                content_type = sniff_image_type(chunk)
+                if content_type not in settings.ALLOWED_IMAGE_TYPES:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="File content is not a supported image",
+                    )
+            size += len(chunk)
+            if size > settings.MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File is larger than {settings.MAX_FILE_SIZE // (1024 * 1024)}MB",
+                )
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(_remove_quietly, temp_path)
+        raise
+    await run_in_threadpool(buffer.close)
+
+    if size == 0:
+        await run_in_threadpool(_remove_quietly, temp_path)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty")
+
+    content_hash = digest.hexdigest()
+    filename = f"{prefix}_{content_hash}{_IMAGE_EXTENSIONS[content_type]}"
+    is_new = await run_in_threadpool(_commit_upload, temp_path, upload_key(filename), content_type)
+    return StoredFile(filename, content_hash, size, content_type, is_new)
+
+
+def variant_filename(filename: str, variant: str) -> str:
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}_{variant}.webp"
+
+
+def variant_url(url: Optional[str], variant: str) -> Optional[str]:
+    """URL of a derivative of an uploaded image"""
+    storage = get_storage()
+    key = storage.key_for_url(url)
+    if not key or not key.startswith(f"{UPLOAD_KEY_PREFIX}/"):
+        return None
+    return storage.url(upload_key(variant_filename(key.rsplit("/", 1)[1], variant)))
+
+
+def generate_image_variants(filename: str) -> Dict[str, str]:
+    """Store the resized WebP derivatives of an uploaded image; existing ones are kept"""
+    storage = get_storage()
+    urls = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        source_path = os.path.join(work_dir, filename)
+        storage.download(upload_key(filename), source_path)
+        with Image.open(source_path) as source:
+            image = ImageOps.exif_transpose(source)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "P") else "RGB")
+            for variant, max_edge in IMAGE_VARIANTS.items():
+                target_key = upload_key(variant_filename(filename, variant))
+                if not storage.exists(target_key):
+                    resized = image.copy()
+                    resized.thumbnail((max_edge, max_edge), Image.LANCZOS)
+                    target_path = os.path.join(work_dir, f"{variant}.webp")
+                    resized.save(target_path, "WEBP", quality=WEBP_QUALITY, method=4)
+                    storage.save_file(target_key, target_path, "image/webp")
+                urls[variant] = storage.url(target_key)
+    return urls
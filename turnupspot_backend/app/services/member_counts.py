@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+
+from app.models.sport_group import SportGroup, SportGroupMember
+
+
+def adjust_member_counts(db: Session, sport_group_id: str, approved: int = 0, pending: int = 0):
+    """Shift a group's membership counters inside the caller's transaction.
+
+    The increment is done in SQL so concurrent joins and approvals can't
+    overwrite each other's counts.
+    """
+    if not approved and not pending:
+        return
+    db.query(SportGroup).filter(SportGroup.id == sport_group_id).update(
+        {
+            SportGroup.approved_member_count: SportGroup.approved_member_count + approved,
+            SportGroup.pending_member_count: SportGroup.pending_member_count + pending,
+        },
+        synchronize_session=False,
+    )
+
+
+def member_added(db: Session, membership: SportGroupMember):
+    if membership.is_approved:
+        adjust_member_counts(db, membership.sport_group_id, approved=1)
+    else:
+        adjust_member_counts(db, membership.sport_group_id, pending=1)
+
+
+def member_removed(db: Session, membership: SportGroupMember):
+    if membership.is_approved:
+        adjust_member_counts(db, membership.sport_group_id, approved=-1)
+    else:
+        adjust_member_counts(db, membership.sport_group_id, pending=-1)
+
+
+def member_approved(db: Session, membership: SportGroupMember):
+    adjust_member_counts(db, membership.sport_group_id, approved=1, pending=-1)
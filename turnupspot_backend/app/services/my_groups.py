@@ -0,0 +1,134 @@
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session, selectinload
+
+try:
+    from zoneinfo import ZoneInfo
+    MOUNTAIN_TZ = ZoneInfo("America/Denver")
+except ImportError:
+    import pytz
+    MOUNTAIN_TZ = pytz.timezone("America/Denver")
+
+from app.core.cache import TTLCache
+from app.models.game import Game, GameStatus
+from app.models.sport_group import SportGroup, SportGroupMember
+from app.schemas.sport_group import MySportGroupResponse
+
+ACTIVE_GAME_STATUSES = (GameStatus.SCHEDULED, GameStatus.IN_PROGRESS)
+
+# Invalidated on membership and game changes in this process; the TTL bounds
+# staleness from other workers and the Celery materializer.
+MY_GROUPS_TTL_SECONDS = 60
+
+# (user_id, local date) -> (ids of the groups in the feed, serialized feed)
+_my_groups_cache = TTLCache(MY_GROUPS_TTL_SECONDS)
+
+
+def build_my_groups(db: Session, user_id: int, today: date) -> List[MySportGroupResponse]:
+    """Every group the user belongs to with role, counts and game info in one query"""
+    start_of_today = datetime.combine(today, time())
+    start_of_tomorrow = start_of_today + timedelta(days=1)
+
+    next_game_date = (
+        select(func.min(Game.game_date))
+        .where(
+            and_(
+                Game.sport_group_id == SportGroup.id,
+                Game.game_date >= start_of_today,
+                Game.status.in_(ACTIVE_GAME_STATUSES),
+            )
+        )
+        .correlate(SportGroup)
+        .scalar_subquery()
+    )
+    # Prefer the active game when today also has a completed or cancelled one
+    todays_game_status = (
+        select(Game.status)
+        .where(
+            and_(
+                Game.sport_group_id == SportGroup.id,
+                Game.game_date >= start_of_today,
+                Game.game_date < start_of_tomorrow,
+            )
+        )
+        .order_by(case((Game.status.in_(ACTIVE_GAME_STATUSES), 0), else_=1))
+        .limit(1)
+        .correlate(SportGroup)
+        .scalar_subquery()
+    )
+
+    rows = (
+        db.query(
+            SportGroup,
+            SportGroupMember.role,
+            SportGroupMember.is_approved,
+            next_game_date.label("next_game_date"),
+            todays_game_status.label("todays_game_status"),
+        )
+        .join(
+            SportGroupMember,
+            and_(
+                SportGroupMember.sport_group_id == SportGroup.id,
+                SportGroupMember.user_id == user_id,
+            ),
+        )
+        .options(selectinload(SportGroup.playing_days))
+        .filter(SportGroup.is_active == True)
+        .order_by(SportGroup.name, SportGroup.id)
+        .all()
+    )
+
+    feed = []
+    for group, role, is_approved, next_game, todays_status in rows:
+        is_creator = group.creator_id == user_id
+        group.current_user_membership = {
+            "is_member": bool(is_approved),
+            "is_pending": not is_approved,
+            "role": role,
+            "is_creator": is_creator,
+        }
+        item = MySportGroupResponse.model_validate(group)
+        item.role = role
+        item.is_creator = is_creator
+        item.next_game_date = _as_datetime(next_game)
+        item.todays_game_status = _as_game_status(todays_status)
+        feed.append(item)
+    return feed
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    # SQLite hands back aggregates of DateTime columns as strings
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _as_game_status(value) -> Optional[GameStatus]:
+    if value is None or isinstance(value, GameStatus):
+        return value
+    # Enum columns store member names
+    return GameStatus[value]
+
+
+def get_my_groups(db: Session, user_id: int) -> List[dict]:
+    today = datetime.now(MOUNTAIN_TZ).date()
+    key = (user_id, today)
+    cached = _my_groups_cache.get(key)
+    if cached is not None:
+        return cached[1]
+
+    feed = [item.model_dump(mode="json") for item in build_my_groups(db, user_id, today)]
+    _my_groups_cache.set(key, (frozenset(item["id"] for item in feed), feed))
+    return feed
+
+
+def invalidate_my_groups(user_id: int):
+    """Forget one user's feed, e.g. after they join or leave a group"""
+    _my_groups_cache.invalidate_where(lambda key: key[0] == user_id)
+
+
+def invalidate_my_groups_for_group(sport_group_id: str):
+    """Forget the feed of every user whose feed includes the group"""
+    sport_group_id = str(sport_group_id)
+    _my_groups_cache.invalidate_items_where(lambda key, value: sport_group_id in value[0])
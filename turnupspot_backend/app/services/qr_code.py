@@ -1,11 +1,101 @@
+import hashlib
+import os
+import tempfile
 import qrcode
+import qrcode.image.svg
 from io import BytesIO
+from typing import Optional, Tuple
 
-def generate_qr_code(data: str) -> bytes:
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.storage import get_storage
+
+# Pixels per module of each size variant
+QR_SIZES = {
+    "small": 4,
+    "medium": 10,
+    "large": 20,
+}
+QR_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+QR_BORDER = 5
+# Bump when rendering changes so ETags and storage keys change with it
+QR_RENDER_VERSION = 1
+
+# Rendered images are a few KB; keyed by digest
+_qr_cache = LRUCache(512, 24 * 60 * 60)
+
+
+def generate_qr_code(data: str, box_size: int = QR_SIZES["medium"], fmt: str = "png") -> bytes:
+    if fmt == "svg":
+        qr = qrcode.QRCode(box_size=box_size, border=QR_BORDER, image_factory=qrcode.image.svg.SvgPathImage)
+    else:
+        qr = qrcode.QRCode(version=1, box_size=box_size, border=QR_BORDER)
     qr.add_data(data)
     qr.make(fit=True)
-    img = qr.make_image(fill='black', back_color='white')
     buf = BytesIO()
-    img.save(buf, format='PNG')
-    return buf.getvalue() 
\ No newline at end of file
+    if fmt == "svg":
+        qr.make_image().save(buf)
+    else:
+        qr.make_image(fill='black', back_color='white').save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def invite_url(group_id: str) -> str:
+    return f"{settings.INVITE_BASE_URL.rstrip('/')}/{group_id}"
+
+
+def invite_qr_digest(group_id: str, size: str = "medium", fmt: str = "png") -> str:
+    """Identifies the rendered image without rendering it; used as the ETag"""
+    source = f"{QR_RENDER_VERSION}|{invite_url(group_id)}|{QR_SIZES[size]}|{fmt}"
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def _storage_key(group_id: str, size: str, fmt: str, digest: str) -> str:
+    return f"qr/invite_{group_id}_{size}_{digest[:16]}.{fmt}"
+
+
+def delete_invite_qrs(group_id: str) -> int:
+    """Remove every stored invite QR of a group, including earlier render versions"""
+    for size in QR_SIZES:
+        for fmt in QR_FORMATS:
+            _qr_cache.invalidate(invite_qr_digest(group_id, size, fmt))
+    return get_storage().delete_prefix(f"qr/invite_{group_id}_")
+
+
+def get_invite_qr(group_id: str, size: str = "medium", fmt: str = "png") -> Tuple[bytes, str]:
+    """The group's invite QR image and its digest.
+
+    Rendered at most once per variant: later calls are answered from memory
+    or from storage.
+    """
+    digest = invite_qr_digest(group_id, size, fmt)
+    content: Optional[bytes] = _qr_cache.get(digest)
+    if content is not None:
+        return content, digest
+
+    storage = get_storage()
+    key = _storage_key(group_id, size, fmt, digest)
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, f"qr.{fmt}")
+        if storage.exists(key):
+            storage.download(key, path)
+            with open(path, "rb") as f:
+                content = f.read()
+        else:
+            content = generate_qr_code(invite_url(group_id), QR_SIZES[size], fmt)
+            with open(path, "wb") as f:
+                f.write(content)
+            storage.save_file(key, path, QR_FORMATS[fmt])
+    _qr_cache.set(digest, content)
+    return content, digest
+
+
+def prerender_invite_qr(group_id: str):
+    """Render the default invite QR ahead of the first request"""
+    try:
+        get_invite_qr(group_id)
+    except Exception as e:
+        print(f"Invite QR pre-render failed for group {group_id}: {str(e)}")
@@ -0,0 +1,233 @@
+import os
+import shutil
+import uuid
+from datetime import timedelta
+from typing import Dict, Optional
+from fastapi.staticfiles import StaticFiles
+
+from app.core.config import settings
+from app.core.security import create_access_token
+
+# Keys are content hashes or random ids and never rewritten, so clients and
+# CDNs may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+LOCAL_UPLOAD_URL = "/api/v1/media/local-uploads"
+
+
+class PresignedUpload:
+    """Where and how a client sends a file straight to storage"""
+
+    def __init__(self, key: str, url: str, method: str, public_url: str, expires_in: int,
+                 fields: Optional[Dict[str, str]] = None, headers: Optional[Dict[str, str]] = None):
+        self.key = key
+        self.url = url
+        self.method = method
+        self.public_url = public_url
+        self.expires_in = expires_in
+        self.fields = fields or {}
+        self.headers = headers or {}
+
+
+class LocalStorage:
+    """Filesystem storage served by the /static mount; stands in for the bucket in development and tests"""
+
+    def __init__(self, root: str, url_prefix: str = "/static"):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def save_file(self, key: str, source_path: str, content_type: str):
+        """Move a finished local file into storage under ``key``"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.part"
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, path)
+
+    def download(self, key: str, dest_path: str):
+        shutil.copyfile(self._path(key), dest_path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with ``prefix``; returns how many were removed"""
+        path = self._path(prefix)
+        directory, name = os.path.split(path)
+        if prefix.endswith("/"):
+            directory, name = path, ""
+        try:
+            entries = os.listdir(directory)
+        except FileNotFoundError:
+            return 0
+        deleted = 0
+        for entry in entries:
+            entry_path = os.path.join(directory, entry)
+            if entry.startswith(name) and os.path.isfile(entry_path):
+                os.remove(entry_path)
+                deleted += 1
+        return deleted
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    def key_for_url(self, url: Optional[str]) -> Optional[str]:
+        prefix = f"{self.url_prefix}/"
+        if url and url.startswith(prefix):
+            return url[len(prefix):]
+        return None
+
+    def presigned_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> PresignedUpload:
+        # A signed token stands in for the bucket's signature
+        token = create_access_token(
+            {"key": key, "purpose": "upload", "content_type": content_type, "max_size": max_size},
+            expires_delta=timedelta(seconds=expires_in),
+        )
+        return PresignedUpload(
+            key=key,
+            url=f"{LOCAL_UPLOAD_URL}/{token}",
+            method="PUT",
+            public_url=self.url(key),
+            expires_in=expires_in,
+            headers={"Content-Type": content_type},
+        )
+
+
+class S3Storage:
+    """AWS S3, or any S3-compatible store such as MinIO via AWS_ENDPOINT_URL"""
+
+    def __init__(self, bucket: str, region: str, endpoint_url: Optional[str] = None, cdn_url: Optional[str] = None):
+        import boto3
+
+        self.bucket = bucket
+        self.region = region
+        self.endpoint_url = endpoint_url
+        self.client = boto3.client(
+            "s3",
+            region_name=region,
+            endpoint_url=endpoint_url,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        )
+        if cdn_url:
+            self.public_base_url = cdn_url.rstrip("/")
+        elif endpoint_url:
+            self.public_base_url = f"{endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            self.public_base_url = f"https://{bucket}.s3.{region}.amazonaws.com"
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def save_file(self, key: str, source_path: str, content_type: str):
+        self.client.upload_file(
+            source_path,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type, "CacheControl": IMMUTABLE_CACHE_CONTROL},
+        )
+
+    def download(self, key: str, dest_path: str):
+        self.client.download_file(self.bucket, key, dest_path)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def delete_prefix(self, prefix: str) -> int:
+        deleted = 0
+        paginator = self.client.get_paginator("list_objects_v2")
+        # A listing page holds at most 1000 keys, the most one delete_objects call accepts
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+                deleted += len(objects)
+        return deleted
+
+    def url(self, key: str) -> str:
+        return f"{self.public_base_url}/{key}"
+
+    def key_for_url(self, url: Optional[str]) -> Optional[str]:
+        prefix = f"{self.public_base_url}/"
+        if url and url.startswith(prefix):
+            return url[len(prefix):]
+        return None
+
+    def presigned_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> PresignedUpload:
+        # The POST policy makes the bucket enforce type and size, not the client
+        fields = {"Content-Type": content_type, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields=fields,
+            Conditions=[
+                {"Content-Type": content_type},
+                {"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=expires_in,
+        )
+        return PresignedUpload(
+            key=key,
+            url=post["url"],
+            method="POST",
+            public_url=self.url(key),
+            expires_in=expires_in,
+            fields=post["fields"],
+        )
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers cache uploaded media forever"""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if scope["path"].lstrip("/").startswith("uploads/"):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+_storage = None
+
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "s3":
+            if not settings.AWS_BUCKET_NAME:
+                raise RuntimeError("STORAGE_BACKEND is 's3' but AWS_BUCKET_NAME is not set")
+            _storage = S3Storage(
+                settings.AWS_BUCKET_NAME,
+                settings.AWS_REGION,
+                endpoint_url=settings.AWS_ENDPOINT_URL,
+                cdn_url=settings.MEDIA_CDN_URL,
+            )
+        else:
+            _storage = LocalStorage(settings.LOCAL_STORAGE_DIR)
+    return _storage
+
+
+def set_storage(storage):
+    """Swap the storage backend, e.g. for a temporary directory in tests"""
+    global _storage
+    _storage = storage
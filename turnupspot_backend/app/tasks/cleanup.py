@@ -0,0 +1,25 @@
+from celery import shared_task
+from ..core.database import SessionLocal
+from ..services.group_deletion import delete_sport_group_data
+
+
+def run_sport_group_deletion(sport_group_id: str, on_progress=None) -> dict:
+    db = SessionLocal()
+    try:
+        return delete_sport_group_data(db, sport_group_id, on_progress=on_progress)
+    finally:
+        db.close()
+
+
+@shared_task(bind=True)
+def delete_sport_group(self, sport_group_id: str) -> dict:
+    """Delete a deactivated sport group and its history in bounded chunks"""
+    def report(step: str, deleted: dict):
+        self.update_state(
+            state="PROGRESS",
+            meta={"sport_group_id": sport_group_id, "step": step, "deleted": dict(deleted)},
+        )
+
+    deleted = run_sport_group_deletion(sport_group_id, on_progress=report)
+    print(f"[CELERY] Deleted sport group {sport_group_id}: {deleted}")
+    return {"sport_group_id": sport_group_id, "deleted": deleted}
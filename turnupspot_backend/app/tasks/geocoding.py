@@ -0,0 +1,47 @@
+import asyncio
+from celery import shared_task
+from ..core.database import SessionLocal
+from ..models.event import Event
+from ..services.geocoding import get_geocoding_service
+
+BACKFILL_BATCH_SIZE = 200
+
+
+def backfill_event_coordinates(db, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Geocode events that have an address but no coordinates; returns how many were filled"""
+    service = get_geocoding_service()
+    filled = 0
+    last_id = 0
+    while True:
+        events = (
+            db.query(Event)
+            .filter(Event.id > last_id, Event.venue_latitude.is_(None))
+            .order_by(Event.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not events:
+            return filled
+        last_id = events[-1].id
+        coordinates = asyncio.run(service.geocode_many([event.venue_address for event in events], db))
+        for event in events:
+            latitude, longitude = coordinates[event.venue_address]
+            if latitude is not None:
+                event.venue_latitude, event.venue_longitude = latitude, longitude
+                filled += 1
+        db.commit()
+
+
+def run_venue_backfill() -> int:
+    db = SessionLocal()
+    try:
+        return backfill_event_coordinates(db)
+    finally:
+        db.close()
+
+
+@shared_task
+def backfill_venue_coordinates() -> int:
+    filled = run_venue_backfill()
+    print(f"[CELERY] Geocoded {filled} events")
+    return filled
@@ -0,0 +1,27 @@
+from celery import shared_task
+from ..core.database import SessionLocal
+from ..models.sport_group import SportGroup
+from ..services.media import generate_image_variants, upload_key
+from ..services.storage import get_storage
+
+
+def build_venue_image_variants(filename: str) -> dict:
+    """Generate the derivatives of a venue image and point its groups at the thumbnail"""
+    variants = generate_image_variants(filename)
+    db = SessionLocal()
+    try:
+        # Deduplicated uploads can back several groups
+        db.query(SportGroup).filter(
+            SportGroup.venue_image_url == get_storage().url(upload_key(filename))
+        ).update({SportGroup.venue_thumbnail_url: variants["thumb"]}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+    return variants
+
+
+@shared_task
+def generate_venue_image_variants(filename: str) -> dict:
+    variants = build_venue_image_variants(filename)
+    print(f"[CELERY] Generated image variants for {filename}: {variants}")
+    return variants
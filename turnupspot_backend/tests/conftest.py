@@ -1,12 +1,21 @@
+import uuid
+from datetime import time
+
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.core.database import get_db, Base
 from app.core.config import settings
+from app.models.chat import ChatRoom, ChatRoomType
+from app.models.sport_group import SportGroup, SportGroupMember, SportsType, MemberRole
+from app.models.user import User
+from app.services import chat_service
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -56,6 +65,52 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def chat_store(monkeypatch):
+    """In-memory Mongo and Redis behind chat_service"""
+    db = AsyncMongoMockClient()["turnupspot_test"]
+    monkeypatch.setattr(chat_service, "mongo_db", db)
+    monkeypatch.setattr(chat_service, "recent_cache", fakeredis.aioredis.FakeRedis(decode_responses=True))
+    return db
+
+
+def create_test_group(db: Session) -> tuple[SportGroup, User, User]:
+    """Helper to create a sport group with its creator and one other user"""
+    creator = User(email=f"{uuid.uuid4()}@example.com", hashed_password="hashed", first_name="Group", last_name="Creator")
+    player = User(email=f"{uuid.uuid4()}@example.com", hashed_password="hashed", first_name="Test", last_name="Player")
+    db.add_all([creator, player])
+    db.flush()
+
+    sport_group = SportGroup(
+        id=str(uuid.uuid4()),
+        name="Test Group",
+        venue_name="Test Venue",
+        venue_address="Test Address",
+        game_start_time=time(18, 0),
+        game_end_time=time(20, 0),
+        max_teams=4,
+        max_players_per_team=5,
+        created_by=creator.email,
+        sports_type=SportsType.FOOTBALL,
+        creator_id=creator.id,
+        approved_member_count=1
+    )
+    db.add(sport_group)
+    db.flush()
+    db.add(SportGroupMember(sport_group_id=sport_group.id, user_id=creator.id, role=MemberRole.ADMIN, is_approved=True))
+    db.flush()
+    return sport_group, creator, player
+
+
+def create_group_chat_room(db: Session, name: str = "Test Group"):
+    """A sport group with its chat room; returns (room, group, creator, player)"""
+    group, creator, player = create_test_group(db)
+    room = ChatRoom(name=name, room_type=ChatRoomType.SPORT_GROUP, sport_group_id=group.id)
+    db.add(room)
+    db.flush()
+    return room, group, creator, player
+
+
 @pytest.fixture
 def test_user_data():
     return {
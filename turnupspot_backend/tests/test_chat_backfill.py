@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+import mongomock
+from bson import ObjectId
+from sqlalchemy.orm import Session
+
+from app.models.chat import ChatMessage
+from app.nosql_models.chat_backfill import (
+    backfill_timestamps,
+    copy_sql_messages,
+    rebuild_room_summaries,
+    sql_message_id,
+)
+from app.nosql_models.indexes import CHAT_MESSAGES, CHAT_ROOM_SUMMARIES
+from app.services.chat_service import build_chat_message, encode_message_cursor, serialize_chat_message
+from tests.conftest import create_group_chat_room
+
+
+def test_copy_sql_messages_is_idempotent(db_session: Session):
+    room, _, creator, player = create_group_chat_room(db_session)
+    sent_at = datetime(2024, 5, 1, 18, 30, 15, 123456, tzinfo=timezone.utc)
+    rows = [
+        ChatMessage(chat_room_id=room.id, sender_id=sender.id, content=f"old {i}", created_at=sent_at + timedelta(seconds=i))
+        for i, sender in enumerate([creator, player, creator])
+    ]
+    db_session.add_all(rows)
+    db_session.flush()
+    mongo_db = mongomock.MongoClient()["turnupspot_test"]
+
+    assert copy_sql_messages(db_session, mongo_db, batch_size=2) == {str(room.id): 3}
+    assert copy_sql_messages(db_session, mongo_db) == {}
+
+    copies = list(mongo_db[CHAT_MESSAGES].find().sort("_id", 1))
+    assert [copy["content"] for copy in copies] == ["old 0", "old 1", "old 2"]
+    first = copies[0]
+    assert first["_id"] == sql_message_id(rows[0])
+    assert first["chat_id"] == str(room.id) and first["sender_id"] == str(creator.id)
+    assert first["timestamp"] == datetime(2024, 5, 1, 18, 30, 15, 123000)
+    assert first["message_type"] == "text" and first["is_deleted"] is False
+    # Copies sort before any message sent since
+    assert first["_id"] < ObjectId()
+
+
+def test_backfill_timestamps_of_messages_stored_without_one():
+    mongo_db = mongomock.MongoClient()["turnupspot_test"]
+    created_at = datetime(2024, 5, 1, 9, 0)
+    without_anything = ObjectId()
+    mongo_db[CHAT_MESSAGES].insert_many([
+        {"chat_id": "1", "sender_id": "2", "content": "from created_at", "created_at": created_at},
+        {"_id": without_anything, "chat_id": "1", "sender_id": "2", "content": "from the id"},
+        {"chat_id": "2", "sender_id": "2", "content": "fine", "timestamp": created_at},
+    ])
+
+    # Readable before the backfill runs
+    legacy = mongo_db[CHAT_MESSAGES].find_one({"_id": without_anything})
+    assert serialize_chat_message(legacy)["created_at"] == without_anything.generation_time.replace(tzinfo=None)
+    assert encode_message_cursor(legacy)
+
+    assert backfill_timestamps(mongo_db, batch_size=1) == {"1"}
+    assert backfill_timestamps(mongo_db) == set()
+    assert mongo_db[CHAT_MESSAGES].find_one({"content": "from created_at"})["timestamp"] == created_at
+    assert mongo_db[CHAT_MESSAGES].find_one({"_id": without_anything})["timestamp"] == (
+        without_anything.generation_time.replace(tzinfo=None)
+    )
+
+
+def test_rebuild_room_summaries_from_the_stored_messages():
+    mongo_db = mongomock.MongoClient()["turnupspot_test"]
+    start = datetime(2024, 5, 1, 9, 0)
+    messages = []
+    for i, content in enumerate(["one", "two", "three"]):
+        message = build_chat_message("1", 10, content)
+        message["timestamp"] = start + timedelta(minutes=i)
+        messages.append(message)
+    messages[-1]["is_deleted"] = True
+    mongo_db[CHAT_MESSAGES].insert_many(messages + [build_chat_message("2", 10, "elsewhere")])
+    # A live write already counted one more message than is stored
+    mongo_db[CHAT_ROOM_SUMMARIES].insert_one({"_id": "2", "message_count": 2})
+
+    assert rebuild_room_summaries(mongo_db) == 2
+    assert rebuild_room_summaries(mongo_db) == 2
+
+    summary = mongo_db[CHAT_ROOM_SUMMARIES].find_one({"_id": "1"})
+    assert summary["message_count"] == 3
+    assert summary["last_message"]["content"] == "two"
+    other = mongo_db[CHAT_ROOM_SUMMARIES].find_one({"_id": "2"})
+    assert (other["message_count"], other["last_message"]["content"]) == (2, "elsewhere")
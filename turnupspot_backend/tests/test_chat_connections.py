@@ -0,0 +1,209 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+
+from app.services.chat_connections import OVERFLOW_DROP, ConnectionManager, is_pong
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False, delay: float = 0):
+        self.fail = fail
+        self.delay = delay
+        self.accepted = False
+        self.close_code = None
+        self.sent = []
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, message: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.close_code = code
+
+
+async def _wait_for(predicate, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+def _worker(redis_server) -> ConnectionManager:
+    return ConnectionManager(fakeredis.aioredis.FakeRedis(server=redis_server, decode_responses=True))
+
+
+@pytest.mark.asyncio
+async def test_messages_reach_sockets_on_other_workers(redis_server):
+    worker_a, worker_b = _worker(redis_server), _worker(redis_server)
+    alice, bob, carol = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    await worker_a.connect(alice, 1, user_id=10)
+    await worker_b.connect(bob, 1, user_id=20)
+    await worker_b.connect(carol, 2, user_id=30)
+    try:
+        await worker_a.broadcast_to_room("hello", 1, exclude_user_id=10)
+        await _wait_for(lambda: bob.sent)
+
+        assert bob.sent == ["hello"]
+        # Not echoed to the sender, nor delivered twice on the origin worker
+        assert alice.sent == []
+        assert carol.sent == []
+
+        await worker_b.broadcast_to_room("hi back", 1)
+        await _wait_for(lambda: alice.sent)
+        assert alice.sent == ["hi back"]
+        assert bob.sent == ["hello", "hi back"]
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_unsubscribes_when_its_last_socket_leaves(redis_server):
+    worker_a, worker_b = _worker(redis_server), _worker(redis_server)
+    socket_a, socket_b = FakeWebSocket(), FakeWebSocket()
+    await worker_a.connect(socket_a, 1, user_id=10)
+    await worker_b.connect(socket_b, 1, user_id=20)
+    try:
+        await worker_b.disconnect(socket_b, 1)
+        assert 1 not in worker_b.room_connections
+
+        redis_client = worker_a.backplane.redis
+        assert (await redis_client.pubsub_numsub("chat:room:1")) == [("chat:room:1", 1)]
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+@pytest.mark.asyncio
+async def test_dead_sockets_are_dropped():
+    manager = ConnectionManager()
+    alive, dead = FakeWebSocket(), FakeWebSocket(fail=True)
+    await manager.connect(alive, 1, user_id=1)
+    await manager.connect(dead, 1, user_id=2)
+
+    await manager.broadcast_to_room("ping", 1)
+    await _wait_for(lambda: dead not in manager.active_connections)
+
+    assert alive.sent == ["ping"]
+    assert list(manager.room_connections[1]) == [alive]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_hold_up_the_room():
+    manager = ConnectionManager()
+    slow = FakeWebSocket(delay=1.0)
+    fast = [FakeWebSocket(delay=0.05) for _ in range(200)]
+    await manager.connect(slow, 1, user_id=0)
+    for i, websocket in enumerate(fast, start=1):
+        await manager.connect(websocket, 1, user_id=i)
+
+    started = asyncio.get_running_loop().time()
+    await manager.broadcast_to_room("kickoff moved to 7", 1)
+    await _wait_for(lambda: all(websocket.sent for websocket in fast))
+
+    # Sent in parallel, not 200 x 50ms one after another, and not behind the slow client
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert slow.sent == []
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_overflowing_clients_are_disconnected():
+    manager = ConnectionManager(max_queue=2)
+    stuck = FakeWebSocket(delay=60)
+    await manager.connect(stuck, 1, user_id=1)
+
+    for i in range(4):
+        await manager.broadcast_to_room(f"m{i}", 1)
+    await _wait_for(lambda: 1 not in manager.room_connections)
+
+    assert stuck.close_code == 1013
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_drop_policy_keeps_slow_clients_connected():
+    manager = ConnectionManager(max_queue=2, overflow=OVERFLOW_DROP)
+    stuck = FakeWebSocket(delay=60)
+    await manager.connect(stuck, 1, user_id=1)
+
+    for i in range(5):
+        await manager.broadcast_to_room(f"m{i}", 1)
+    await asyncio.sleep(0.01)
+
+    connection = manager.room_connections[1][stuck]
+    # Broadcasting never yields, so two fit in the queue and the rest were dropped
+    assert connection.dropped == 3
+    assert stuck.close_code is None
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_pings_and_evicts_idle_sockets():
+    manager = ConnectionManager(heartbeat_interval=0.02, idle_timeout=0.1)
+    idle, chatty = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(idle, 1, user_id=1)
+    await manager.connect(chatty, 1, user_id=2)
+
+    for _ in range(10):
+        await asyncio.sleep(0.02)
+        manager.touch(chatty)
+
+    assert idle.close_code == 1001
+    assert manager.active_connections == [chatty]
+    assert json.loads(chatty.sent[0]) == {"type": "ping"}
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_per_user_cap_closes_the_oldest_socket():
+    manager = ConnectionManager(max_connections_per_user=2)
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for websocket in sockets:
+        await manager.connect(websocket, 1, user_id=7)
+    await _wait_for(lambda: len(manager.connections) == 2)
+
+    assert sockets[0].close_code == 1008
+    assert list(manager.user_connections[7]) == sockets[1:]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_registries_are_emptied_and_reported():
+    manager = ConnectionManager()
+    first, second = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(first, 1, user_id=1)
+    await manager.connect(second, 2, user_id=1)
+
+    stats = manager.stats()
+    assert (stats["connections"], stats["rooms"], stats["users"]) == (2, 2, 1)
+
+    await manager.disconnect(first, 1)
+    await manager.disconnect(second, 2)
+    # Disconnecting twice is harmless
+    await manager.disconnect(second, 2)
+
+    assert manager.connections == {} and manager.room_connections == {} and manager.user_connections == {}
+    await manager.close()
+
+
+def test_is_pong():
+    assert is_pong('{"type": "pong"}')
+    assert not is_pong("pong")
+    assert not is_pong('{"type": "message"}')
+    assert not is_pong("{not json")
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.sport_group import SportGroupMember
+from app.services import chat_service
+from app.services.chat_inbox import accessible_rooms, build_inbox
+from app.services.chat_service import build_chat_message
+from tests.conftest import create_group_chat_room
+
+
+def test_only_rooms_of_approved_memberships_are_listed(db_session: Session):
+    room, group, creator, player = create_group_chat_room(db_session, "Five-a-side")
+    db_session.add(SportGroupMember(sport_group_id=group.id, user_id=player.id, is_approved=False))
+    db_session.flush()
+
+    assert [r.id for r in accessible_rooms(db_session, creator.id)] == [room.id]
+    assert accessible_rooms(db_session, player.id) == []
+
+
+@pytest.mark.asyncio
+async def test_inbox_shows_last_message_and_unread_counts(db_session: Session, chat_store):
+    quiet, _, creator, _ = create_group_chat_room(db_session, "Quiet")
+    busy, busy_group, busy_creator, _ = create_group_chat_room(db_session, "Busy")
+    db_session.add(SportGroupMember(sport_group_id=busy_group.id, user_id=creator.id, is_approved=True))
+    db_session.flush()
+
+    await chat_service.create_chat_message(build_chat_message(busy.id, busy_creator.id, "kickoff at 6"))
+    # Written through the batch path, as WebSocket messages are
+    await chat_service.insert_chat_messages([
+        build_chat_message(busy.id, busy_creator.id, "bring bibs"),
+        build_chat_message(busy.id, creator.id, "on it"),
+        build_chat_message(busy.id, busy_creator.id, "venue moved"),
+    ])
+
+    inbox = await build_inbox(db_session, creator.id)
+
+    assert [room["name"] for room in inbox] == ["Busy", "Quiet"]
+    assert inbox[0]["last_message"]["content"] == "venue moved"
+    assert inbox[0]["last_sender_name"] == busy_creator.full_name
+    # Sending "on it" read everything before it
+    assert inbox[0]["unread_count"] == 1
+    assert (inbox[1]["last_message"], inbox[1]["unread_count"]) == (None, 0)
+
+    await chat_service.mark_room_read(str(busy.id), creator.id)
+    inbox = await build_inbox(db_session, creator.id)
+    assert inbox[0]["unread_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_last_message_follows_edits_and_deletes(chat_store):
+    first = await chat_service.create_chat_message(build_chat_message("4", 1, "first"))
+    last = await chat_service.create_chat_message(build_chat_message("4", 2, "second"))
+
+    await chat_service.update_chat_message(str(last["_id"]), {"content": "second!", "is_edited": True})
+    summaries = await chat_service.get_room_summaries(["4"], 1)
+    assert summaries["4"]["last_message"]["content"] == "second!"
+
+    await chat_service.delete_chat_message(str(last["_id"]))
+    summaries = await chat_service.get_room_summaries(["4"], 1)
+    assert summaries["4"]["last_message"]["_id"] == first["_id"]
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.deps import get_accessible_chat_room
+from app.core.exceptions import ForbiddenException
+from app.core.security import create_access_token
+from app.services import chat_persistence
+from app.services.chat_persistence import authorize_chat_socket, run_db
+from tests.conftest import create_group_chat_room
+
+
+@pytest.fixture
+def chat_sessions(db_session: Session, monkeypatch):
+    """Short-lived sessions on the test transaction's connection"""
+    monkeypatch.setattr(chat_persistence, "SessionLocal", sessionmaker(bind=db_session.connection()))
+    return db_session
+
+
+def test_authorize_chat_socket(chat_sessions):
+    room, _, creator, player = create_group_chat_room(chat_sessions)
+
+    user, reason = authorize_chat_socket(create_access_token({"sub": creator.email}), room.id)
+    assert reason is None and user["id"] == creator.id
+
+    assert authorize_chat_socket(create_access_token({"sub": player.email}), room.id) == (None, "Access denied")
+    assert authorize_chat_socket(create_access_token({"sub": creator.email}), room.id + 1000) == (None, "Room not found")
+
+
+def test_get_accessible_chat_room(db_session: Session):
+    room, _, creator, player = create_group_chat_room(db_session)
+
+    assert get_accessible_chat_room(room.id, creator, db_session) is room
+    with pytest.raises(ForbiddenException):
+        get_accessible_chat_room(room.id, player, db_session)
+    with pytest.raises(HTTPException) as missing:
+        get_accessible_chat_room(room.id + 1000, creator, db_session)
+    assert missing.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_database_work_does_not_block_the_event_loop():
+    def slow_query():
+        time.sleep(0.2)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.gather(*[run_db(slow_query) for _ in range(chat_persistence.CHAT_DB_WORKERS)])
+    ticking.cancel()
+
+    # The queries ran in parallel on the executor while the loop kept running
+    assert ticks >= 10
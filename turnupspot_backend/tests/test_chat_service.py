@@ -0,0 +1,233 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import chat_service
+from app.services.chat_service import build_chat_message, get_chat_messages
+
+
+async def _seed(count: int, chat_id: str = "1"):
+    start = datetime(2026, 10, 1, 18, 0)
+    messages = []
+    for i in range(count):
+        message = build_chat_message(chat_id, 10, f"m{i}")
+        # Pairs share a timestamp so the _id tie-breaker is exercised
+        message["timestamp"] = start + timedelta(seconds=i // 2)
+        messages.append(message)
+    await chat_service.insert_chat_messages(messages)
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_before_cursor_walks_back_through_history(chat_store):
+    await _seed(7)
+    await _seed(3, chat_id="2")
+
+    page, older = await get_chat_messages("1", limit=3)
+    assert [m["content"] for m in page] == ["m4", "m5", "m6"]
+
+    page, older = await get_chat_messages("1", limit=3, before=older)
+    assert [m["content"] for m in page] == ["m1", "m2", "m3"]
+
+    page, older = await get_chat_messages("1", limit=3, before=older)
+    assert [m["content"] for m in page] == ["m0"]
+    assert older is None
+
+
+@pytest.mark.asyncio
+async def test_history_skips_deleted_messages_and_rejects_bad_cursors(chat_store):
+    messages = await _seed(3)
+    await chat_service.update_chat_message(str(messages[1]["_id"]), {"is_deleted": True})
+
+    page, _ = await get_chat_messages("1")
+    assert [m["content"] for m in page] == ["m0", "m2"]
+
+    with pytest.raises(HTTPException) as exc:
+        await get_chat_messages("1", before="not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_batch_insert_is_safe_to_retry(chat_store):
+    messages = await _seed(2)
+    await chat_service.insert_chat_messages(messages + [build_chat_message("1", 10, "new")])
+
+    page, _ = await get_chat_messages("1")
+    assert [m["content"] for m in page] == ["m0", "m1", "new"]
+
+
+@pytest.mark.asyncio
+async def test_serialized_messages_match_the_response_schema(chat_store):
+    message = await chat_service.create_chat_message(build_chat_message("5", 7, "hello", file_url="/static/uploads/a.png"))
+    edited = await chat_service.update_chat_message(str(message["_id"]), {"content": "hello!", "is_edited": True})
+
+    data = chat_service.serialize_chat_message(edited)
+
+    assert data["id"] == str(message["_id"])
+    assert (data["chat_room_id"], data["sender_id"], data["content"]) == (5, 7, "hello!")
+    assert data["is_edited"] and data["edited_at"] is not None
+    assert data["file_url"] == "/static/uploads/a.png"
+
+
+@pytest.mark.asyncio
+async def test_first_page_is_served_from_the_recent_cache(chat_store, monkeypatch):
+    await _seed(60)
+    monkeypatch.setattr(chat_service, "RECENT_MESSAGES_LIMIT", 5)
+
+    page, older = await get_chat_messages("1", limit=3)
+    assert [m["content"] for m in page] == ["m57", "m58", "m59"]
+
+    # Warm now: the store is no longer consulted for the newest page
+    await chat_store[chat_service.CHAT_COLLECTION].delete_many({})
+    cached, cached_older = await get_chat_messages("1", limit=3)
+    assert [m["content"] for m in cached] == ["m57", "m58", "m59"]
+    assert cached_older == older
+
+
+@pytest.mark.asyncio
+async def test_recent_cache_follows_sends_edits_and_deletes(chat_store, monkeypatch):
+    await _seed(4)
+    monkeypatch.setattr(chat_service, "RECENT_MESSAGES_LIMIT", 5)
+    await get_chat_messages("1")
+
+    sent = await chat_service.create_chat_message(build_chat_message("1", 10, "new"))
+    page, older = await get_chat_messages("1", limit=2)
+    assert [m["content"] for m in page] == ["m3", "new"]
+    assert chat_service.serialize_chat_message(page[-1]) == chat_service.serialize_chat_message(sent)
+
+    # The older page comes from the store, continuing where the cache left off
+    page, _ = await get_chat_messages("1", limit=10, before=older)
+    assert [m["content"] for m in page] == ["m0", "m1", "m2"]
+
+    await chat_service.update_chat_message(str(sent["_id"]), {"content": "edited", "is_edited": True})
+    page, _ = await get_chat_messages("1")
+    assert page[-1]["content"] == "edited"
+
+    await chat_service.delete_chat_message(str(sent["_id"]))
+    page, _ = await get_chat_messages("1")
+    assert [m["content"] for m in page] == ["m0", "m1", "m2", "m3"]
+
+
+@pytest.mark.asyncio
+async def test_sends_do_not_make_a_cold_room_look_cached(chat_store):
+    await _seed(3, chat_id="9")
+    await chat_service.create_chat_message(build_chat_message("9", 10, "new"))
+
+    cached, _ = await chat_service._cached_recent_messages("9")
+    assert cached is None
+    page, _ = await get_chat_messages("9")
+    assert [m["content"] for m in page] == ["m0", "m1", "m2", "new"]
+
+
+@pytest.mark.asyncio
+async def test_fill_keeps_messages_not_yet_stored_or_sent_while_it_ran(chat_store, monkeypatch):
+    await _seed(3)
+    # Acknowledged and still in the write-behind buffer: cached, not stored
+    buffered = build_chat_message("1", 10, "buffered")
+    await chat_service.remember_message(buffered)
+
+    fill = chat_service._cache_recent_messages
+    during_fill = build_chat_message("1", 10, "during fill")
+
+    async def send_then_fill(*args):
+        await chat_service.remember_message(during_fill)
+        await fill(*args)
+
+    monkeypatch.setattr(chat_service, "_cache_recent_messages", send_then_fill)
+    await get_chat_messages("1")
+
+    await chat_store[chat_service.CHAT_COLLECTION].delete_many({})
+    cached, _ = await get_chat_messages("1")
+    assert [m["content"] for m in cached] == ["m0", "m1", "m2", "buffered", "during fill"]
+
+
+@pytest.mark.asyncio
+async def test_recent_cache_is_ordered_by_timestamp_then_id(chat_store):
+    messages = await _seed(4)
+    await get_chat_messages("1")
+    late = build_chat_message("1", 10, "late")
+    late["timestamp"] = messages[-1]["timestamp"] + timedelta(seconds=5)
+    early = build_chat_message("1", 10, "early")
+    early["timestamp"] = messages[-1]["timestamp"] + timedelta(seconds=1)
+    # Remembered out of order, e.g. by two workers
+    await chat_service.remember_message(late)
+    await chat_service.remember_message(early)
+
+    page, _ = await get_chat_messages("1", limit=4)
+    assert [m["content"] for m in page] == ["m2", "m3", "early", "late"]
+
+
+@pytest.mark.asyncio
+async def test_fill_is_skipped_when_the_room_changed_since_it_read_the_store(chat_store, monkeypatch):
+    messages = await _seed(2)
+    fill = chat_service._cache_recent_messages
+
+    async def edit_then_fill(*args):
+        await chat_service.update_chat_message(str(messages[0]["_id"]), {"content": "edited", "is_edited": True})
+        await fill(*args)
+
+    monkeypatch.setattr(chat_service, "_cache_recent_messages", edit_then_fill)
+    page, _ = await get_chat_messages("1")
+    assert [m["content"] for m in page] == ["m0", "m1"]
+
+    # The stale snapshot was not cached; the next read sees the edit
+    monkeypatch.setattr(chat_service, "_cache_recent_messages", fill)
+    page, _ = await get_chat_messages("1")
+    assert [m["content"] for m in page] == ["edited", "m1"]
+
+
+@pytest.mark.asyncio
+async def test_after_cursor_reads_forward_from_a_message(chat_store):
+    messages = await _seed(7)
+    around = chat_service.encode_message_cursor(messages[3])
+
+    page, newer = await get_chat_messages("1", limit=2, after=around)
+    assert [m["content"] for m in page] == ["m4", "m5"]
+    page, newer = await get_chat_messages("1", limit=2, after=newer)
+    assert [m["content"] for m in page] == ["m6"]
+    assert newer is None
+
+    page, _ = await get_chat_messages("1", limit=10, before=around)
+    assert [m["content"] for m in page] == ["m0", "m1", "m2"]
+
+    with pytest.raises(HTTPException) as exc:
+        await get_chat_messages("1", before=around, after=around)
+    assert exc.value.status_code == 400
+
+
+class _TextSearchCollection:
+    """Records the query; mongomock has no $text support"""
+
+    def __init__(self, hits):
+        self.hits = hits
+
+    def find(self, query, projection):
+        self.query, self.projection = query, projection
+        return self
+
+    def sort(self, spec):
+        self.sort_spec = spec
+        return self
+
+    def limit(self, limit):
+        self.limit_value = limit
+        return self
+
+    async def __aiter__(self):
+        for message, score in self.hits[:self.limit_value]:
+            yield {**message, "score": score}
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_by_text_score_within_the_room(monkeypatch):
+    venue = build_chat_message("3", 10, "Venue moved to the east pitch")
+    kit = build_chat_message("3", 11, "Bring the away kit, venue unchanged")
+    collection = _TextSearchCollection([(venue, 1.5), (kit, 0.75)])
+    monkeypatch.setattr(chat_service, "mongo_db", {chat_service.CHAT_COLLECTION: collection})
+
+    hits = await chat_service.search_chat_messages("3", "venue", limit=1)
+
+    assert collection.query == {"chat_id": "3", "$text": {"$search": "venue"}, "is_deleted": {"$ne": True}}
+    assert collection.sort_spec == [("score", {"$meta": "textScore"})]
+    assert hits == [(venue, 1.5)]
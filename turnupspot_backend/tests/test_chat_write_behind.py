@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from app.services.chat_service import build_chat_message
+from app.services.chat_write_behind import WriteBehindBuffer
+
+
+class RecordingStore:
+    def __init__(self, failures: int = 0, failing_rooms=()):
+        self.failures = failures
+        self.failing_rooms = set(failing_rooms)
+        self.attempts = []
+        self.batches = []
+
+    async def write(self, room_id, messages):
+        self.attempts.append((room_id, asyncio.get_running_loop().time()))
+        if self.failures or room_id in self.failing_rooms:
+            self.failures = max(self.failures - 1, 0)
+            raise RuntimeError("database unavailable")
+        self.batches.append((room_id, [m["content"] for m in messages]))
+
+
+@pytest.mark.asyncio
+async def test_messages_are_written_per_room_in_batches():
+    store = RecordingStore()
+    buffer = WriteBehindBuffer(store.write, max_batch_size=3, flush_interval=0.02)
+
+    for i in range(4):
+        await buffer.add("1", build_chat_message("1", 10, f"a{i}"))
+    await buffer.add("2", build_chat_message("2", 20, "b0"))
+    # Nothing is written while the sender is acknowledged
+    assert buffer.buffered == 5
+
+    await asyncio.sleep(0.1)
+
+    assert sorted(store.batches) == [("1", ["a0", "a1", "a2"]), ("1", ["a3"]), ("2", ["b0"])]
+    assert buffer.buffered == 0
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_full_room_batch_is_flushed_without_waiting_for_the_interval():
+    store = RecordingStore()
+    buffer = WriteBehindBuffer(store.write, max_batch_size=2, flush_interval=60)
+
+    await buffer.add("1", build_chat_message("1", 10, "a0"))
+    await buffer.add("1", build_chat_message("1", 10, "a1"))
+    await asyncio.sleep(0.05)
+
+    assert store.batches == [("1", ["a0", "a1"])]
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_close_drains_and_retries_failed_batches():
+    store = RecordingStore(failures=1)
+    buffer = WriteBehindBuffer(store.write, flush_interval=60)
+
+    await buffer.add("1", build_chat_message("1", 10, "last words"))
+    await buffer.close()
+
+    assert store.batches == [("1", ["last words"])]
+    assert buffer.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_room_is_retried_with_backoff_in_order():
+    store = RecordingStore(failures=3)
+    buffer = WriteBehindBuffer(store.write, flush_interval=0.01, retry_base_delay=0.02, retry_window=5)
+
+    await buffer.add("1", build_chat_message("1", 10, "a0"))
+    await asyncio.sleep(0.03)
+    await buffer.add("1", build_chat_message("1", 10, "a1"))
+    await asyncio.sleep(0.3)
+
+    assert store.batches == [("1", ["a0", "a1"])]
+    gaps = [later - earlier for (_, earlier), (_, later) in zip(store.attempts, store.attempts[1:])]
+    assert gaps[0] >= 0.02 and gaps[1] >= 0.04 and gaps[2] >= 0.08
+    assert buffer.buffered == 0
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_room_does_not_hold_up_other_rooms():
+    store = RecordingStore(failing_rooms={"1"})
+    buffer = WriteBehindBuffer(store.write, flush_interval=0.01, retry_base_delay=0.05, retry_window=5)
+
+    await buffer.add("1", build_chat_message("1", 10, "stuck"))
+    await asyncio.sleep(0.03)
+    for i in range(3):
+        await buffer.add("2", build_chat_message("2", 20, f"b{i}"))
+        await asyncio.sleep(0.02)
+
+    assert [batch for batch in store.batches if batch[0] == "2"] == [("2", ["b0"]), ("2", ["b1"]), ("2", ["b2"])]
+    assert buffer.buffered == 1
+    store.failing_rooms.clear()
+    await buffer.close()
+    assert store.batches[-1] == ("1", ["stuck"])
+
+
+@pytest.mark.asyncio
+async def test_slow_room_write_does_not_block_other_rooms():
+    release = asyncio.Event()
+    batches = []
+
+    async def write(room_id, messages):
+        if room_id == "slow":
+            await release.wait()
+        batches.append(room_id)
+
+    buffer = WriteBehindBuffer(write, flush_interval=0.01)
+    await buffer.add("slow", build_chat_message("slow", 10, "a"))
+    await asyncio.sleep(0.03)
+    await buffer.add("2", build_chat_message("2", 20, "b"))
+    await asyncio.sleep(0.03)
+
+    assert batches == ["2"]
+    release.set()
+    await buffer.close()
+    assert batches == ["2", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_dropped_once_the_retry_window_has_passed():
+    store = RecordingStore(failing_rooms={"1"})
+    buffer = WriteBehindBuffer(store.write, flush_interval=60, retry_base_delay=0.01, retry_window=0.1)
+
+    await buffer.add("1", build_chat_message("1", 10, "lost"))
+    await buffer.close()
+
+    assert store.batches == []
+    assert len(store.attempts) > 3
+    assert store.attempts[-1][1] - store.attempts[0][1] >= 0.1
+    assert buffer.buffered == 0
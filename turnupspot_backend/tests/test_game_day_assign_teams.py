@@ -0,0 +1,110 @@
+import uuid
+from datetime import datetime, timezone, time
+
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.sport_group import SportGroup, SportGroupMember, SportsType, MemberRole
+from app.models.game import Game, GameTeam, GamePlayer, GameStatus, PlayerStatus
+from app.models.manual_checkin import GameDayParticipant
+from app.api.v1.endpoints.game_day import _get_team_player_counts, _collect_assignment_violations
+
+
+def create_test_game(db: Session) -> tuple[Game, SportGroupMember]:
+    """Helper to create a sport group with an admin member and a scheduled game"""
+    user = User(
+        email=f"{uuid.uuid4()}@example.com",
+        hashed_password="hashed",
+        first_name="Test",
+        last_name="User",
+        is_active=True
+    )
+    db.add(user)
+    db.flush()
+
+    sport_group = SportGroup(
+        id=str(uuid.uuid4()),
+        name="Test Group",
+        venue_name="Test Venue",
+        venue_address="Test Address",
+        game_start_time=time(18, 0),
+        game_end_time=time(20, 0),
+        max_teams=4,
+        max_players_per_team=3,
+        created_by=user.email,
+        sports_type=SportsType.FOOTBALL,
+        creator_id=user.id
+    )
+    db.add(sport_group)
+    db.flush()
+
+    membership = SportGroupMember(
+        sport_group_id=sport_group.id,
+        user_id=user.id,
+        role=MemberRole.ADMIN,
+        is_approved=True
+    )
+    db.add(membership)
+
+    game = Game(
+        id=str(uuid.uuid4()),
+        sport_group_id=sport_group.id,
+        game_date=datetime.now(timezone.utc),
+        start_time=datetime.now(timezone.utc),
+        status=GameStatus.SCHEDULED
+    )
+    db.add(game)
+    db.flush()
+    return game, membership
+
+
+def test_team_player_counts_group_manual_and_registered_players(db_session: Session):
+    game, membership = create_test_game(db_session)
+    team1 = GameTeam(id=str(uuid.uuid4()), game_id=game.id, team_name="Team 1", team_number=1)
+    db_session.add(team1)
+    db_session.flush()
+    db_session.add(GamePlayer(game_id=game.id, team_id=team1.id, member_id=membership.id, status=PlayerStatus.ARRIVED))
+    db_session.add_all([
+        GameDayParticipant(game_id=game.id, name="A", team=1),
+        GameDayParticipant(game_id=game.id, name="B", team=2),
+        GameDayParticipant(game_id=game.id, name="C", team=2),
+        GameDayParticipant(game_id=game.id, name="D"),
+    ])
+    db_session.flush()
+
+    assert _get_team_player_counts(db_session, game.id) == {1: 2, 2: 2}
+
+
+def test_assignment_violations_are_reported_together():
+    participants = [GameDayParticipant(id=i, name=f"Player {i}") for i in range(1, 13)]
+    participants_by_id = {p.id: p for p in participants}
+    first_10_ids = {p.id for p in participants[:10]}
+
+    violations = _collect_assignment_violations(
+        {1: [1, 2, 11], 2: [12, 99]},
+        participants_by_id,
+        first_10_ids,
+        {1: 1},
+        max_players_per_team=3
+    )
+
+    assert any("Player 11 is not among the first 10" in v for v in violations)
+    assert any("Player 12 is not among the first 10" in v for v in violations)
+    assert any("Participant ID 99" in v for v in violations)
+    assert any("Team 1" in v and "Maximum players per team is 3" in v for v in violations)
+    assert len(violations) == 4
+
+
+def test_reshuffling_within_capacity_is_allowed():
+    participants = [GameDayParticipant(id=i, name=f"Player {i}", team=1) for i in range(1, 4)]
+    participants_by_id = {p.id: p for p in participants}
+
+    violations = _collect_assignment_violations(
+        {1: [1, 2, 3]},
+        participants_by_id,
+        set(participants_by_id),
+        {1: 3},
+        max_players_per_team=3
+    )
+
+    assert violations == []
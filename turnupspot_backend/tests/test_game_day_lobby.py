@@ -0,0 +1,110 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import fakeredis
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.game_day import _get_game_day_roster
+from app.models.game import Game, GamePlayer, GameStatus, PlayerStatus
+from app.models.sport_group import SportGroupMember
+from app.services.game_day_lobby import GameDayLobbyManager
+from tests.conftest import create_test_group
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.accepted = False
+        self.sent = []
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, message: str):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(json.loads(message))
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+
+async def _wait_for(predicate, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_only_the_group_and_drops_dead_sockets():
+    manager = GameDayLobbyManager()
+    alive, dead, other_group = FakeWebSocket(), FakeWebSocket(fail=True), FakeWebSocket()
+    await manager.connect(alive, "group-1", user_id=1)
+    await manager.connect(dead, "group-1", user_id=2)
+    await manager.connect(other_group, "group-2", user_id=3)
+
+    await manager.broadcast("group-1", {"type": "captain_set", "captains": [{"member_id": 1, "team": 1}]})
+    await _wait_for(lambda: alive.sent and manager.connection_count("group-1") == 1)
+
+    assert alive.accepted
+    assert alive.sent == [{"type": "captain_set", "captains": [{"member_id": 1, "team": 1}]}]
+    assert other_group.sent == []
+
+    await manager.disconnect(alive, "group-1")
+    assert manager.connection_count("group-1") == 0
+    assert "group-1" not in manager.room_connections
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_lobby_events_reach_sockets_on_other_workers():
+    server = fakeredis.FakeServer()
+    worker_a, worker_b = (
+        GameDayLobbyManager(fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+        for _ in range(2)
+    )
+    watcher = FakeWebSocket()
+    await worker_b.connect(watcher, "group-1", user_id=1)
+    try:
+        # A check-in handled on the other worker
+        await worker_a.broadcast("group-1", {"type": "player_arrived"})
+        await _wait_for(lambda: watcher.sent)
+        assert watcher.sent == [{"type": "player_arrived"}]
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+def test_roster_includes_check_in_state(db_session: Session):
+    sport_group, creator, player = create_test_group(db_session)
+    member = SportGroupMember(sport_group_id=sport_group.id, user_id=player.id, is_approved=True)
+    db_session.add(member)
+    game = Game(
+        id=str(uuid.uuid4()),
+        sport_group_id=sport_group.id,
+        game_date=datetime(2025, 1, 6),
+        start_time=datetime(2025, 1, 6, 18, 0),
+        status=GameStatus.SCHEDULED
+    )
+    db_session.add(game)
+    db_session.flush()
+    db_session.add(GamePlayer(
+        game_id=game.id,
+        member_id=member.id,
+        status=PlayerStatus.ARRIVED,
+        arrival_time=datetime(2025, 1, 6, 17, 30)
+    ))
+    db_session.flush()
+
+    roster = {entry["user_id"]: entry for entry in _get_game_day_roster(db_session, sport_group.id, game)}
+
+    assert roster[creator.id]["status"] == "expected"
+    assert roster[player.id]["status"] == PlayerStatus.ARRIVED.value
+    assert roster[player.id]["arrival_time"] == "17:30"
+    assert roster[player.id]["team"] is None
+    assert roster[player.id]["is_captain"] is False
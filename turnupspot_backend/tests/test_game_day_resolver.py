@@ -0,0 +1,92 @@
+import uuid
+from datetime import date, datetime, time
+
+from sqlalchemy.orm import Session
+
+from app.models.game import Game, GameStatus
+from app.models.sport_group import PlayingDay, Day
+from app.services import game_day_resolver
+from app.services.game_day_resolver import (
+    playing_days_to_mask,
+    is_playing_day,
+    get_todays_game,
+    get_or_create_todays_game,
+    invalidate_playing_days,
+)
+from tests.conftest import create_test_group
+
+# 2025-01-06 was a Monday
+MONDAY = date(2025, 1, 6)
+TUESDAY = date(2025, 1, 7)
+
+
+def test_playing_days_to_mask():
+    assert playing_days_to_mask([]) == 0
+    assert playing_days_to_mask([Day.MONDAY]) == 0b0000001
+    assert playing_days_to_mask([Day.MONDAY, Day.WEDNESDAY, "Sunday"]) == 0b1000101
+
+
+def test_is_playing_day_uses_cached_mask(db_session: Session):
+    sport_group, _, _ = create_test_group(db_session)
+    db_session.add(PlayingDay(id=str(uuid.uuid4()), sport_group_id=sport_group.id, day=Day.MONDAY))
+    db_session.flush()
+
+    assert is_playing_day(db_session, sport_group.id, MONDAY)
+    assert not is_playing_day(db_session, sport_group.id, TUESDAY)
+
+    db_session.add(PlayingDay(id=str(uuid.uuid4()), sport_group_id=sport_group.id, day=Day.TUESDAY))
+    db_session.flush()
+    assert not is_playing_day(db_session, sport_group.id, TUESDAY)
+
+    invalidate_playing_days(sport_group.id)
+    assert is_playing_day(db_session, sport_group.id, TUESDAY)
+
+
+def test_cached_game_is_dropped_once_completed(db_session: Session):
+    sport_group, _, _ = create_test_group(db_session)
+    game = Game(
+        id=str(uuid.uuid4()),
+        sport_group_id=sport_group.id,
+        game_date=datetime.combine(MONDAY, time()),
+        start_time=datetime.combine(MONDAY, time(18, 0)),
+        status=GameStatus.IN_PROGRESS
+    )
+    db_session.add(game)
+    db_session.flush()
+    game_day_resolver._active_game_cache.set((sport_group.id, MONDAY), game.id)
+
+    assert get_todays_game(db_session, sport_group.id, MONDAY) is game
+
+    game.status = GameStatus.COMPLETED
+    db_session.flush()
+    assert get_todays_game(db_session, sport_group.id, MONDAY) is None
+
+
+def test_get_or_create_reads_back_a_game_created_elsewhere(db_session: Session):
+    sport_group, _, _ = create_test_group(db_session)
+    sport_group.game_start_time, sport_group.game_end_time = time(18, 0), time(20, 0)
+    # This process cached "no game" before another worker created one
+    assert get_todays_game(db_session, sport_group.id, MONDAY) is None
+    other = Game(
+        id=str(uuid.uuid4()),
+        sport_group_id=sport_group.id,
+        game_date=datetime.combine(MONDAY, time()),
+        start_time=datetime.combine(MONDAY, time(18, 0)),
+        status=GameStatus.SCHEDULED
+    )
+    db_session.add(other)
+    db_session.flush()
+
+    game, created = get_or_create_todays_game(db_session, sport_group, MONDAY)
+    assert (game.id, created) == (other.id, False)
+    assert db_session.query(Game).filter(Game.sport_group_id == sport_group.id).count() == 1
+
+
+def test_get_or_create_creates_a_scheduled_game(db_session: Session):
+    sport_group, _, _ = create_test_group(db_session)
+    sport_group.game_start_time, sport_group.game_end_time = time(18, 0), time(20, 0)
+
+    game, created = get_or_create_todays_game(db_session, sport_group, TUESDAY)
+    assert created and game.status == GameStatus.SCHEDULED
+    assert game.start_time == datetime.combine(TUESDAY, time(18, 0))
+    assert get_or_create_todays_game(db_session, sport_group, TUESDAY) == (game, False)
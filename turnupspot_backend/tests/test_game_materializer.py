@@ -0,0 +1,78 @@
+import uuid
+from datetime import date, datetime, time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.games import create_game
+from app.models.game import Game, GameStatus
+from app.models.sport_group import PlayingDay, Day
+from app.schemas.game import GameCreate
+from app.services.game_materializer import materialize_games
+from tests.conftest import create_test_group
+
+# 2025-01-06 was a Monday
+MONDAY = date(2025, 1, 6)
+
+
+def test_materialize_games_creates_playing_days_once(db_session: Session):
+    sport_group, _, _ = create_test_group(db_session)
+    db_session.add_all([
+        PlayingDay(id=str(uuid.uuid4()), sport_group_id=sport_group.id, day=Day.MONDAY),
+        PlayingDay(id=str(uuid.uuid4()), sport_group_id=sport_group.id, day=Day.WEDNESDAY),
+    ])
+    db_session.flush()
+
+    assert materialize_games(db_session, days_ahead=7, start=MONDAY) == 2
+
+    games = db_session.query(Game).filter(Game.sport_group_id == sport_group.id).order_by(Game.game_date).all()
+    assert [g.game_date.date() for g in games] == [date(2025, 1, 6), date(2025, 1, 8)]
+    assert games[0].start_time == datetime(2025, 1, 6, 18, 0)
+    assert games[0].end_time == datetime(2025, 1, 6, 20, 0)
+    assert all(g.status == GameStatus.SCHEDULED for g in games)
+    assert all(g.completed_matches == [] for g in games)
+    # Same defaults as a game created through the ORM
+    orm_game = Game(sport_group_id=sport_group.id, game_date=datetime(2025, 1, 1), start_time=datetime(2025, 1, 1, 18, 0))
+    db_session.add(orm_game)
+    db_session.flush()
+    for column in ("current_time", "is_timer_running", "match_duration_seconds", "timer_is_running",
+                   "current_match_team_a_score", "current_rotation_index", "completed_matches"):
+        assert getattr(games[0], column) == getattr(orm_game, column), column
+
+    # Re-running the same horizon is a no-op
+    assert materialize_games(db_session, days_ahead=7, start=MONDAY) == 0
+
+
+def test_materialize_games_skips_existing_and_inactive_groups(db_session: Session):
+    sport_group, _, _ = create_test_group(db_session)
+    inactive_group, _, _ = create_test_group(db_session)
+    inactive_group.is_active = False
+    for group in (sport_group, inactive_group):
+        db_session.add(PlayingDay(id=str(uuid.uuid4()), sport_group_id=group.id, day=Day.MONDAY))
+    db_session.add(Game(
+        id=str(uuid.uuid4()),
+        sport_group_id=sport_group.id,
+        game_date=datetime.combine(MONDAY, time()),
+        start_time=datetime.combine(MONDAY, time(18, 0)),
+        status=GameStatus.COMPLETED
+    ))
+    db_session.flush()
+
+    assert materialize_games(db_session, days_ahead=1, start=MONDAY) == 0
+
+
+def test_second_active_game_on_a_day_is_a_conflict(db_session: Session):
+    sport_group, creator, _ = create_test_group(db_session)
+    game = GameCreate(
+        sport_group_id=sport_group.id,
+        game_date=datetime.combine(MONDAY, time()),
+        start_time=datetime.combine(MONDAY, time(18, 0)),
+    )
+    create_game(game, current_user=creator, db=db_session)
+
+    with pytest.raises(HTTPException) as exc:
+        create_game(game, current_user=creator, db=db_session)
+
+    assert exc.value.status_code == 409
+    assert db_session.query(Game).filter(Game.sport_group_id == sport_group.id).count() == 1
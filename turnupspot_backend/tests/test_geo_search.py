@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services.geo_search import bounding_box, find_nearby_groups, haversine_km
+from tests.conftest import create_test_group
+
+# Downtown Denver
+DENVER = (39.7392, -104.9903)
+
+
+def _group_at(db: Session, lat: float, lng: float):
+    sport_group, _, _ = create_test_group(db)
+    sport_group.venue_latitude = lat
+    sport_group.venue_longitude = lng
+    db.flush()
+    return sport_group
+
+
+def test_haversine_km():
+    # Denver to Boulder is roughly 39 km
+    assert haversine_km(*DENVER, 40.0150, -105.2705) == pytest.approx(39.0, abs=1.0)
+    assert haversine_km(*DENVER, *DENVER) == 0
+
+
+def test_bounding_box_splits_at_antimeridian():
+    _, _, ranges = bounding_box(0.0, 179.95, 20)
+    assert len(ranges) == 2
+    assert ranges[0][1] == 180.0 and ranges[1][0] == -180.0
+
+    _, _, ranges = bounding_box(89.99, 0.0, 50)
+    assert ranges == [(-180.0, 180.0)]
+
+
+def test_find_nearby_groups_orders_by_distance(db_session: Session):
+    near = _group_at(db_session, 39.7400, -104.9900)
+    farther = _group_at(db_session, 39.7600, -104.9900)
+    _group_at(db_session, 40.0150, -105.2705)  # Boulder, outside 10 km
+    inactive = _group_at(db_session, 39.7393, -104.9903)
+    inactive.is_active = False
+    db_session.flush()
+
+    results = find_nearby_groups(db_session, *DENVER, radius_km=10)
+
+    assert [group.id for group, _ in results] == [near.id, farther.id]
+    assert results[0][1] < results[1][1] < 10
+
+    assert [group.id for group, _ in find_nearby_groups(db_session, *DENVER, radius_km=10, limit=1)] == [near.id]
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api.v1.endpoints import events
+from app.models.geocoding import GeocodeCacheEntry
+from app.services.geocoding import GeocodingService, StubGeocodingProvider, normalize_address, set_geocoding_service
+
+ARENA = (53.5461, -113.4938)
+
+
+def _service():
+    provider = StubGeocodingProvider({"10220 104 Ave NW, Edmonton, AB": ARENA})
+    return GeocodingService(provider), provider
+
+
+def test_normalize_address():
+    assert normalize_address("  10220 104 Ave. NW ,Edmonton,  AB ") == "10220 104 ave nw, edmonton, ab"
+
+
+def test_known_addresses_skip_the_provider(db_session):
+    service, provider = _service()
+
+    assert service.get_coordinates("10220 104 Ave NW, Edmonton, AB", db_session) == ARENA
+    assert service.get_coordinates("10220 104 ave nw,  edmonton, ab", db_session) == ARENA
+    assert len(provider.calls) == 1
+
+    # A fresh process still has the table
+    service.memory.clear()
+    assert service.get_coordinates("10220 104 Ave NW, Edmonton, AB", db_session) == ARENA
+    assert len(provider.calls) == 1
+
+
+def test_misses_are_cached_but_errors_are_not(db_session):
+    service, provider = _service()
+
+    assert service.get_coordinates("Nowhere", db_session) == (None, None)
+    assert service.get_coordinates("Nowhere", db_session) == (None, None)
+    assert len(provider.calls) == 1
+    entry = db_session.query(GeocodeCacheEntry).filter_by(address_key="nowhere").one()
+    assert entry.expires_at < datetime.utcnow() + timedelta(seconds=service.ttl_seconds)
+
+    def broken(address):
+        raise RuntimeError("quota exceeded")
+
+    provider.geocode = broken
+    assert service.get_coordinates("Somewhere else", db_session) == (None, None)
+    assert db_session.query(GeocodeCacheEntry).filter_by(address_key="somewhere else").first() is None
+
+
+def test_expired_entries_are_refreshed(db_session):
+    service, provider = _service()
+    db_session.add(GeocodeCacheEntry(
+        address_key=normalize_address("10220 104 Ave NW, Edmonton, AB"),
+        address="10220 104 Ave NW, Edmonton, AB",
+        latitude=0.0,
+        longitude=0.0,
+        provider="stub",
+        expires_at=datetime.utcnow() - timedelta(days=1),
+    ))
+    db_session.commit()
+
+    assert service.get_coordinates("10220 104 Ave NW, Edmonton, AB", db_session) == ARENA
+    assert len(provider.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_geocode_many_looks_up_each_address_once(db_session):
+    service, provider = _service()
+    await service.geocode("10220 104 Ave NW, Edmonton, AB", db_session)
+
+    results = await service.geocode_many(
+        ["10220 104 Ave NW, Edmonton, AB", "Unknown field", "unknown field ", "Unknown Field"],
+        db_session,
+    )
+
+    assert results["10220 104 Ave NW, Edmonton, AB"] == ARENA
+    assert results["Unknown field"] == results["Unknown Field"] == (None, None)
+    assert provider.calls == ["10220 104 Ave NW, Edmonton, AB", "Unknown field"]
+
+
+def test_cache_only_lookup_never_calls_the_provider(db_session):
+    service, provider = _service()
+
+    assert service.cached_coordinates("10220 104 Ave NW, Edmonton, AB", db_session) is None
+    service.get_coordinates("10220 104 Ave NW, Edmonton, AB", db_session)
+    assert service.cached_coordinates("10220 104 AVE NW, Edmonton, AB", db_session) == ARENA
+    assert len(provider.calls) == 1
+
+
+def test_event_requests_only_read_the_cache(db_session):
+    service, provider = _service()
+    set_geocoding_service(service)
+    try:
+        assert events._cached_venue_coordinates("10220 104 Ave NW, Edmonton, AB", db_session) == (None, None, False)
+        service.get_coordinates("10220 104 Ave NW, Edmonton, AB", db_session)
+        assert events._cached_venue_coordinates("10220 104 Ave NW, Edmonton, AB", db_session) == (*ARENA, True)
+    finally:
+        set_geocoding_service(None)
+
+    # Only the explicit warm-up reached the provider
+    assert len(provider.calls) == 1
@@ -0,0 +1,98 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.sport_groups import join_sport_group
+
+from app.models.sport_group import SportGroupMember
+from app.schemas.sport_group import SportGroupJoinRequest
+from app.services.group_context import (
+    resolve_group_context,
+    invalidate_membership,
+    invalidate_group,
+)
+from tests.conftest import create_test_group
+
+
+def test_creator_context_is_admin(db_session: Session):
+    sport_group, creator, _ = create_test_group(db_session)
+
+    ctx = resolve_group_context(db_session, sport_group.id, creator.id)
+
+    assert ctx.group_exists
+    assert ctx.is_member
+    assert ctx.is_admin
+    assert ctx.is_creator
+    assert ctx.get_membership(db_session).user_id == creator.id
+
+
+def test_membership_is_cached_until_invalidated(db_session: Session):
+    sport_group, _, player = create_test_group(db_session)
+
+    assert not resolve_group_context(db_session, sport_group.id, player.id).has_membership
+
+    membership = SportGroupMember(sport_group_id=sport_group.id, user_id=player.id, is_approved=False)
+    db_session.add(membership)
+    db_session.flush()
+
+    # Still served from the cache
+    assert not resolve_group_context(db_session, sport_group.id, player.id).has_membership
+
+    invalidate_membership(sport_group.id, player.id)
+    ctx = resolve_group_context(db_session, sport_group.id, player.id)
+    assert ctx.has_membership
+    assert not ctx.is_member
+
+    membership.is_approved = True
+    db_session.flush()
+    invalidate_group(sport_group.id)
+    ctx = resolve_group_context(db_session, sport_group.id, player.id)
+    assert ctx.is_member
+    assert not ctx.is_admin
+
+
+def test_unknown_group_has_no_context(db_session: Session):
+    ctx = resolve_group_context(db_session, str(uuid.uuid4()), 1)
+
+    assert not ctx.group_exists
+    assert not ctx.is_member
+    assert not ctx.is_admin
+    assert ctx.get_sport_group(db_session) is None
+
+
+def test_fresh_context_reads_past_a_stale_cache(db_session: Session):
+    sport_group, _, player = create_test_group(db_session)
+    assert not resolve_group_context(db_session, sport_group.id, player.id).is_member
+
+    # Approved on another worker: this process's cache never heard of it
+    db_session.add(SportGroupMember(sport_group_id=sport_group.id, user_id=player.id, is_approved=True))
+    db_session.flush()
+
+    assert not resolve_group_context(db_session, sport_group.id, player.id).is_member
+    assert resolve_group_context(db_session, sport_group.id, player.id, fresh=True).is_member
+    # The fresh read refreshed the cache too
+    assert resolve_group_context(db_session, sport_group.id, player.id).is_member
+
+
+def test_join_with_a_stale_cache_cannot_duplicate_the_membership(db_session: Session):
+    sport_group, _, player = create_test_group(db_session)
+    assert not resolve_group_context(db_session, sport_group.id, player.id).has_membership
+    db_session.add(SportGroupMember(sport_group_id=sport_group.id, user_id=player.id, is_approved=False))
+    db_session.flush()
+
+    with pytest.raises(HTTPException) as exc:
+        join_sport_group(sport_group.id, SportGroupJoinRequest(), player, db_session)
+    assert exc.value.status_code == 400
+    assert db_session.query(SportGroupMember).filter(
+        SportGroupMember.sport_group_id == sport_group.id, SportGroupMember.user_id == player.id
+    ).count() == 1
+
+
+def test_membership_is_unique_per_group_and_user(db_session: Session):
+    sport_group, creator, _ = create_test_group(db_session)
+    db_session.add(SportGroupMember(sport_group_id=sport_group.id, user_id=creator.id, is_approved=False))
+    with pytest.raises(IntegrityError):
+        db_session.flush()
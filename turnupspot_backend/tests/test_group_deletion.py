@@ -0,0 +1,110 @@
+import uuid
+from datetime import datetime
+
+import fakeredis
+import mongomock
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.sport_groups import get_sport_group_deletion_status
+
+from app.models.chat import ChatRoom, ChatRoomType, ChatMessage
+from app.models.game import Game, GameTeam, GamePlayer, GameStatus, PlayerStatus
+from app.models.sport_group import SportGroup, SportGroupMember
+from app.nosql_models.indexes import CHAT_MESSAGES, CHAT_READ_STATE, CHAT_ROOM_SUMMARIES
+from app.services import group_deletion
+from app.services.chat_service import recent_messages_key
+from app.services.group_deletion import delete_sport_group_data, deletion_task_id, deletion_task_owner
+from app.services.qr_code import get_invite_qr, invite_qr_digest
+from app.services.storage import LocalStorage, get_storage, set_storage
+from tests.conftest import create_test_group
+
+
+@pytest.fixture
+def chat_backends(monkeypatch, tmp_path):
+    set_storage(LocalStorage(str(tmp_path)))
+    mongo_db = mongomock.MongoClient()["turnupspot_test"]
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(group_deletion, "get_sync_mongo_db", lambda: mongo_db)
+    monkeypatch.setattr(group_deletion, "sync_redis", redis_client)
+    yield mongo_db, redis_client
+    set_storage(None)
+
+
+def test_deletes_group_and_dependents_in_chunks(db_session: Session, chat_backends):
+    sport_group, creator, _ = create_test_group(db_session)
+    other_group, _, _ = create_test_group(db_session)
+    membership = db_session.query(SportGroupMember).filter(SportGroupMember.sport_group_id == sport_group.id).one()
+
+    room = ChatRoom(name="Group chat", room_type=ChatRoomType.SPORT_GROUP, sport_group_id=sport_group.id)
+    db_session.add(room)
+    db_session.flush()
+    db_session.add_all([
+        ChatMessage(chat_room_id=room.id, sender_id=creator.id, content=f"message {i}") for i in range(3)
+    ])
+    game = Game(
+        id=str(uuid.uuid4()),
+        sport_group_id=sport_group.id,
+        game_date=datetime(2025, 1, 6),
+        start_time=datetime(2025, 1, 6, 18, 0),
+        status=GameStatus.COMPLETED
+    )
+    db_session.add(game)
+    db_session.flush()
+    team = GameTeam(game_id=game.id, team_name="Team 1", team_number=1, captain_id=membership.id)
+    db_session.add(team)
+    db_session.flush()
+    db_session.add(GamePlayer(game_id=game.id, member_id=membership.id, team_id=team.id, status=PlayerStatus.ARRIVED))
+    db_session.flush()
+
+    group_id, other_group_id, room_id = sport_group.id, other_group.id, room.id
+    get_invite_qr(group_id)
+    get_invite_qr(other_group_id)
+    progress = []
+    deleted = delete_sport_group_data(
+        db_session, group_id, chunk_size=2, on_progress=lambda step, totals: progress.append((step, dict(totals)))
+    )
+
+    assert deleted["chat_messages"] == 3
+    # Three messages in chunks of two report progress twice
+    assert [totals["chat_messages"] for step, totals in progress if step == "chat_messages"] == [2, 3]
+    assert deleted["games"] == 1
+    assert deleted["members"] == 1
+    assert deleted["sport_groups"] == 1
+    assert deleted["invite_qr_codes"] == 1
+    assert get_storage().exists(f"qr/invite_{other_group_id}_medium_{invite_qr_digest(other_group_id)[:16]}.png")
+    assert db_session.query(SportGroup).filter(SportGroup.id == group_id).count() == 0
+    assert db_session.query(ChatMessage).filter(ChatMessage.chat_room_id == room_id).count() == 0
+    assert db_session.query(SportGroup).filter(SportGroup.id == other_group_id).count() == 1
+
+
+
+def test_deletes_the_rooms_chat_history_from_mongo_and_redis(db_session: Session, chat_backends):
+    mongo_db, redis_client = chat_backends
+    sport_group, creator, _ = create_test_group(db_session)
+    room = ChatRoom(name="Group chat", room_type=ChatRoomType.SPORT_GROUP, sport_group_id=sport_group.id)
+    db_session.add(room)
+    db_session.flush()
+    room_id = str(room.id)
+    mongo_db[CHAT_MESSAGES].insert_many([{"chat_id": room_id, "content": "hi"}, {"chat_id": "other", "content": "keep"}])
+    mongo_db[CHAT_ROOM_SUMMARIES].insert_one({"_id": room_id, "message_count": 1})
+    mongo_db[CHAT_READ_STATE].insert_one({"chat_id": room_id, "user_id": str(creator.id), "read_count": 1})
+    redis_client.zadd(recent_messages_key(room_id), {"{}": 0})
+
+    deleted = delete_sport_group_data(db_session, sport_group.id)
+
+    assert (deleted["mongo_chat_messages"], deleted["chat_room_summaries"], deleted["chat_read_state"]) == (1, 1, 1)
+    assert [m["content"] for m in mongo_db[CHAT_MESSAGES].find()] == ["keep"]
+    assert not redis_client.exists(recent_messages_key(room_id))
+
+
+def test_deletion_status_is_only_visible_to_the_requester(db_session: Session):
+    _, creator, player = create_test_group(db_session)
+    task_id = deletion_task_id(creator.id)
+
+    assert deletion_task_owner(task_id) == creator.id
+    assert deletion_task_owner(str(uuid.uuid4())) is None
+    with pytest.raises(HTTPException) as exc:
+        get_sport_group_deletion_status(task_id, current_user=player)
+    assert exc.value.status_code == 404
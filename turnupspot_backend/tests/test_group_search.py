@@ -0,0 +1,65 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.pagination import encode_cursor
+from app.models.sport_group import SportsType
+from app.services.group_search import search_sport_groups, _sqlite_match_query
+from tests.conftest import create_test_group
+
+
+def _named_group(db: Session, name: str, description: str = None, venue_name: str = "Test Venue"):
+    sport_group, _, _ = create_test_group(db)
+    sport_group.name = name
+    sport_group.description = description
+    sport_group.venue_name = venue_name
+    db.flush()
+    return sport_group
+
+
+def test_sqlite_match_query_neutralises_operators():
+    assert _sqlite_match_query('sunday "five-a-side" OR') == '"sunday"* "five"* "a"* "side"* "or"*'
+    assert _sqlite_match_query("  -- ") is None
+
+
+def test_search_ranks_name_matches_first(db_session: Session):
+    described = _named_group(db_session, "Weekend Kickabout", description="Casual volleyball after work")
+    named = _named_group(db_session, "Volleyball Club")
+    _named_group(db_session, "Chess Night")
+
+    results, _ = search_sport_groups(db_session, "volley")
+
+    assert [group.id for group in results] == [named.id, described.id]
+
+
+def test_search_filters_and_tracks_updates(db_session: Session):
+    group = _named_group(db_session, "Riverside Football", venue_name="Riverside Park")
+    inactive = _named_group(db_session, "Riverside Rugby")
+    inactive.is_active = False
+    db_session.flush()
+
+    assert [g.id for g in search_sport_groups(db_session, "riverside")[0]] == [group.id]
+    assert search_sport_groups(db_session, "riverside", sports_type=SportsType.TENNIS) == ([], None)
+
+    group.venue_name = "Hilltop Courts"
+    group.name = "Hilltop Football"
+    db_session.flush()
+    assert search_sport_groups(db_session, "riverside") == ([], None)
+    assert [g.id for g in search_sport_groups(db_session, "hilltop courts")[0]] == [group.id]
+
+
+def test_search_pages_by_rank_and_id(db_session: Session):
+    # Equally ranked groups are ordered by id
+    named = [_named_group(db_session, "Volleyball Club") for _ in range(3)]
+    described = _named_group(db_session, "Weekend Kickabout", description="Casual volleyball after work")
+
+    first, cursor = search_sport_groups(db_session, "volley", limit=2)
+    second, last_cursor = search_sport_groups(db_session, "volley", limit=2, cursor=cursor)
+
+    assert [group.id for group in first + second] == sorted(group.id for group in named) + [described.id]
+    assert last_cursor is None
+    assert [group.id for group in search_sport_groups(db_session, "volley", limit=2, skip=2)[0]] == [
+        group.id for group in second
+    ]
+    with pytest.raises(HTTPException):
+        search_sport_groups(db_session, "volley", cursor=encode_cursor(["best", None]))
@@ -0,0 +1,137 @@
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+from starlette.datastructures import Headers
+
+from app.api.deps import get_current_user
+from app.api.v1.endpoints.sport_groups import _discard_unused_venue_image
+from app.core.config import settings
+from app.core.database import get_db
+from app.main import app
+from app.services import media
+from app.services.media import generate_image_variants, store_image_upload, variant_url
+from app.services.storage import LocalStorage, set_storage
+from tests.conftest import create_test_group
+
+
+def _png_bytes(size=(1200, 800)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (30, 120, 60)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _upload(content: bytes, content_type: str = "image/png") -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="venue.png", headers=Headers({"content-type": content_type}))
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    set_storage(LocalStorage(str(tmp_path)))
+    yield tmp_path / "uploads"
+    set_storage(None)
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_are_stored_once(upload_dir):
+    content = _png_bytes()
+
+    first = await store_image_upload(_upload(content), prefix="venue")
+    second = await store_image_upload(_upload(content), prefix="venue")
+
+    assert first.is_new and not second.is_new
+    assert first.filename == second.filename
+    assert first.url == f"/static/uploads/{first.filename}"
+    assert sorted(p.name for p in upload_dir.iterdir()) == [first.filename]
+
+
+@pytest.mark.asyncio
+async def test_upload_limits_are_enforced_while_streaming(upload_dir, monkeypatch):
+    with pytest.raises(HTTPException) as exc:
+        await store_image_upload(_upload(b"<?php echo 'not an image';"), prefix="venue")
+    assert exc.value.status_code == 400
+
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1024)
+    with pytest.raises(HTTPException) as exc:
+        await store_image_upload(_upload(_png_bytes()), prefix="venue")
+    assert exc.value.status_code == 413
+
+    # Rejected uploads never reach storage
+    assert not upload_dir.exists()
+
+
+@pytest.mark.asyncio
+async def test_generate_image_variants(upload_dir):
+    stored = await store_image_upload(_upload(_png_bytes()), prefix="venue")
+
+    urls = generate_image_variants(stored.filename)
+
+    assert urls["thumb"] == variant_url(stored.url, "thumb")
+    with Image.open(upload_dir / urls["thumb"].rsplit("/", 1)[1]) as thumb:
+        assert thumb.format == "WEBP"
+        assert max(thumb.size) == media.IMAGE_VARIANTS["thumb"]
+
+
+def _create_group(client, content: bytes, **overrides):
+    form = {
+        "name": "Venue Group",
+        "description": "Has a venue image",
+        "venue_name": "Pitch",
+        "venue_address": "1 Pitch Road",
+        "venue_latitude": "6.5",
+        "venue_longitude": "3.4",
+        "playing_days": '[{"day": "Monday"}]',
+        "game_start_time": "18:00",
+        "game_end_time": "20:00",
+        "max_teams": "4",
+        "max_players_per_team": "5",
+        "sports_type": "football",
+    }
+    form.update(overrides)
+    return client.post(
+        "/api/v1/sport-groups/", data=form, files={"venue_image": ("venue.png", content, "image/png")}
+    )
+
+
+@pytest.fixture
+def group_client(upload_dir, db_session):
+    _, creator, _ = create_test_group(db_session)
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_current_user] = lambda: creator
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_invalid_group_form_stores_no_venue_image(group_client, upload_dir):
+    assert _create_group(group_client, _png_bytes(), game_start_time="6pm").status_code == 400
+    assert _create_group(group_client, _png_bytes(), playing_days='[{"day": "someday"}]').status_code == 400
+    assert _create_group(group_client, _png_bytes(), sports_type="quidditch").status_code == 400
+
+    assert not upload_dir.exists()
+
+
+@pytest.mark.asyncio
+async def test_discarded_venue_image_is_kept_while_a_group_uses_it(upload_dir, db_session):
+    stored = await store_image_upload(_upload(_png_bytes()), prefix="venue")
+    group, _, _ = create_test_group(db_session)
+    group.venue_image_url = stored.url
+    db_session.flush()
+
+    _discard_unused_venue_image(db_session, stored)
+    assert (upload_dir / stored.filename).exists()
+
+    group.venue_image_url = None
+    db_session.flush()
+    _discard_unused_venue_image(db_session, stored)
+    assert not (upload_dir / stored.filename).exists()
+
+
+def test_failed_group_insert_deletes_its_venue_image(group_client, upload_dir, db_session, monkeypatch):
+    def fail_flush(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(db_session, "flush", fail_flush)
+    assert _create_group(group_client, _png_bytes()).status_code == 500
+    assert list(upload_dir.iterdir()) == []
@@ -0,0 +1,45 @@
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.sport_groups import (
+    join_sport_group,
+    approve_member,
+    leave_sport_group,
+    remove_member,
+)
+from app.models.sport_group import SportGroupMember
+from app.schemas.sport_group import SportGroupJoinRequest
+from tests.conftest import create_test_group
+
+
+def _counts(db: Session, sport_group):
+    db.refresh(sport_group)
+    return sport_group.approved_member_count, sport_group.pending_member_count
+
+
+def test_counters_follow_join_approve_and_leave(db_session: Session):
+    sport_group, creator, player = create_test_group(db_session)
+
+    join_sport_group(sport_group.id, SportGroupJoinRequest(), current_user=player, db=db_session)
+    assert _counts(db_session, sport_group) == (1, 1)
+
+    membership = db_session.query(SportGroupMember).filter(SportGroupMember.user_id == player.id).one()
+    approve_member(sport_group.id, membership.id, current_user=creator, db=db_session)
+    assert _counts(db_session, sport_group) == (2, 0)
+    assert sport_group.member_count == 2
+
+    # Approving twice doesn't double count
+    approve_member(sport_group.id, membership.id, current_user=creator, db=db_session)
+    assert _counts(db_session, sport_group) == (2, 0)
+
+    leave_sport_group(sport_group.id, current_user=player, db=db_session)
+    assert _counts(db_session, sport_group) == (1, 0)
+
+
+def test_removing_a_pending_member_decrements_pending(db_session: Session):
+    sport_group, creator, player = create_test_group(db_session)
+
+    join_sport_group(sport_group.id, SportGroupJoinRequest(), current_user=player, db=db_session)
+    membership = db_session.query(SportGroupMember).filter(SportGroupMember.user_id == player.id).one()
+
+    remove_member(sport_group.id, membership.id, current_user=creator, db=db_session)
+    assert _counts(db_session, sport_group) == (1, 0)
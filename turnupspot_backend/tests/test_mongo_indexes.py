@@ -0,0 +1,53 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.nosql_models.indexes import (
+    CHAT_MESSAGES,
+    MONGO_INDEXES,
+    MissingIndexError,
+    check_indexes,
+    ensure_indexes,
+    missing_indexes,
+    prepare_indexes,
+)
+
+
+@pytest.mark.asyncio
+async def test_indexes_are_created_idempotently_and_checked():
+    db = AsyncMongoMockClient()["turnupspot_test"]
+
+    with pytest.raises(MissingIndexError):
+        await check_indexes(db)
+
+    await ensure_indexes(db)
+    await ensure_indexes(db)
+
+    await check_indexes(db)
+    info = await db[CHAT_MESSAGES].index_information()
+    assert list(info["chat_history"]["key"]) == [("chat_id", 1), ("timestamp", -1), ("_id", -1)]
+
+
+@pytest.mark.asyncio
+async def test_a_changed_definition_counts_as_missing():
+    db = AsyncMongoMockClient()["turnupspot_test"]
+    await ensure_indexes(db)
+    await db[CHAT_MESSAGES].drop_index("chat_history")
+    await db[CHAT_MESSAGES].create_index([("chat_id", 1)], name="chat_history")
+
+    assert await missing_indexes(db) == [f"{CHAT_MESSAGES}.chat_history"]
+    assert len(await missing_indexes(db, MONGO_INDEXES[1:])) == 0
+
+
+@pytest.mark.asyncio
+async def test_startup_fails_when_indexes_could_not_be_created():
+    db = AsyncMongoMockClient()["turnupspot_test"]
+    await prepare_indexes(db, auto_create=True)
+    await check_indexes(db)
+
+    db = AsyncMongoMockClient()["turnupspot_test"]
+    await db[CHAT_MESSAGES].create_index([("chat_id", 1)], name="chat_history")
+    with pytest.raises(MissingIndexError, match="chat_history"):
+        await prepare_indexes(db, auto_create=True)
+
+    with pytest.raises(MissingIndexError):
+        await prepare_indexes(AsyncMongoMockClient()["turnupspot_test"], auto_create=False)
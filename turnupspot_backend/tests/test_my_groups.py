@@ -0,0 +1,79 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.sport_groups import join_sport_group, leave_sport_group
+from app.models.game import Game, GameStatus
+from app.models.sport_group import MemberRole, SportGroupMember
+from app.schemas.sport_group import SportGroupJoinRequest
+from app.services.group_context import invalidate_membership
+from app.services import my_groups
+from app.services.my_groups import build_my_groups, get_my_groups, invalidate_my_groups_for_group
+from tests.conftest import create_test_group
+
+MONDAY = date(2025, 1, 6)
+
+
+def _game(sport_group_id: str, day: date, status: GameStatus) -> Game:
+    return Game(
+        id=str(uuid.uuid4()),
+        sport_group_id=sport_group_id,
+        game_date=datetime.combine(day, time()),
+        start_time=datetime.combine(day, time(18, 0)),
+        status=status
+    )
+
+
+def test_feed_includes_role_counts_and_games(db_session: Session):
+    sport_group, creator, _ = create_test_group(db_session)
+    db_session.add_all([
+        _game(sport_group.id, MONDAY, GameStatus.IN_PROGRESS),
+        _game(sport_group.id, MONDAY + timedelta(days=2), GameStatus.SCHEDULED),
+        _game(sport_group.id, MONDAY - timedelta(days=2), GameStatus.COMPLETED),
+    ])
+    db_session.flush()
+
+    feed = build_my_groups(db_session, creator.id, MONDAY)
+
+    assert len(feed) == 1
+    item = feed[0]
+    assert item.id == sport_group.id
+    assert item.role == MemberRole.ADMIN
+    assert item.is_creator
+    assert item.member_count == 1
+    assert item.current_user_membership.is_member
+    assert item.todays_game_status == GameStatus.IN_PROGRESS
+    assert item.next_game_date == datetime.combine(MONDAY, time())
+
+
+def test_feed_is_cached_until_group_invalidated(db_session: Session):
+    sport_group, creator, _ = create_test_group(db_session)
+    my_groups._my_groups_cache.clear()
+
+    assert get_my_groups(db_session, creator.id)[0]["next_game_date"] is None
+
+    today = datetime.now(my_groups.MOUNTAIN_TZ).date()
+    db_session.add(_game(sport_group.id, today + timedelta(days=1), GameStatus.SCHEDULED))
+    db_session.flush()
+    assert get_my_groups(db_session, creator.id)[0]["next_game_date"] is None
+
+    invalidate_my_groups_for_group(sport_group.id)
+    assert get_my_groups(db_session, creator.id)[0]["next_game_date"] is not None
+
+
+def test_join_and_leave_refresh_the_other_members_feeds(db_session: Session):
+    sport_group, creator, player = create_test_group(db_session)
+    my_groups._my_groups_cache.clear()
+    assert get_my_groups(db_session, creator.id)[0]["member_count"] == 1
+
+    join_sport_group(sport_group.id, SportGroupJoinRequest(), player, db_session)
+    db_session.query(SportGroupMember).filter(SportGroupMember.user_id == player.id).update({"is_approved": True})
+    sport_group.approved_member_count += 1
+    db_session.flush()
+    # Joining dropped the creator's cached feed along with the joiner's
+    assert get_my_groups(db_session, creator.id)[0]["member_count"] == 2
+
+    invalidate_membership(sport_group.id, player.id)
+    leave_sport_group(sport_group.id, player, db_session)
+    assert get_my_groups(db_session, creator.id)[0]["member_count"] == 1
@@ -0,0 +1,70 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.pagination import decode_cursor, encode_cursor, keyset_paginate
+from app.models.game import Game, GameStatus
+from app.models.user import User
+from tests.conftest import create_test_group
+
+
+def test_cursor_round_trip():
+    moment = datetime(2025, 1, 6, 18, 30)
+    cursor = encode_cursor([moment, "abc"])
+    assert decode_cursor(cursor, 2) == [moment.isoformat(), "abc"]
+
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor")
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, 3)
+
+
+def test_keyset_pages_cover_every_row_once(db_session: Session):
+    users = [
+        User(email=f"{uuid.uuid4()}@example.com", hashed_password="hashed", first_name="Page", last_name=str(i))
+        for i in range(5)
+    ]
+    db_session.add_all(users)
+    db_session.flush()
+    query = db_session.query(User).filter(User.id.in_([u.id for u in users]))
+
+    first, cursor = keyset_paginate(query, [User.id], 2)
+    second, cursor = keyset_paginate(query, [User.id], 2, cursor=cursor)
+    # A row inserted before the cursor doesn't shift the next page
+    db_session.add(User(email=f"{uuid.uuid4()}@example.com", hashed_password="hashed", first_name="Late", last_name="Comer"))
+    db_session.flush()
+    third, cursor = keyset_paginate(query, [User.id], 2, cursor=cursor)
+
+    assert [u.id for u in first + second + third] == sorted(u.id for u in users)
+    assert cursor is None
+
+    # OFFSET compatibility path
+    offset_page, _ = keyset_paginate(query, [User.id], 2, skip=2)
+    assert offset_page == second
+
+
+def test_descending_keyset_on_datetime(db_session: Session):
+    sport_group, _, _ = create_test_group(db_session)
+    start = datetime(2025, 1, 6)
+    games = [
+        Game(
+            id=str(uuid.uuid4()),
+            sport_group_id=sport_group.id,
+            game_date=start + timedelta(days=day),
+            start_time=start + timedelta(days=day, hours=18),
+            status=GameStatus.COMPLETED
+        )
+        for day in range(3)
+    ]
+    db_session.add_all(games)
+    db_session.flush()
+    query = db_session.query(Game).filter(Game.sport_group_id == sport_group.id)
+
+    first, cursor = keyset_paginate(query, [Game.game_date, Game.id], 2, descending=True)
+    second, cursor = keyset_paginate(query, [Game.game_date, Game.id], 2, cursor=cursor, descending=True)
+
+    assert [g.id for g in first + second] == [g.id for g in reversed(games)]
+    assert cursor is None
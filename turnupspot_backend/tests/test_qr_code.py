@@ -0,0 +1,75 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.main import app
+from app.services import qr_code
+from app.services.qr_code import delete_invite_qrs, get_invite_qr, invite_qr_digest
+from app.services.storage import LocalStorage, set_storage
+from tests.conftest import create_test_group
+
+
+@pytest.fixture
+def storage(tmp_path):
+    set_storage(LocalStorage(str(tmp_path)))
+    qr_code._qr_cache.clear()
+    yield tmp_path
+    qr_code._qr_cache.clear()
+    set_storage(None)
+
+
+def test_invite_qr_is_rendered_once(storage, monkeypatch):
+    renders = []
+    render = qr_code.generate_qr_code
+    monkeypatch.setattr(qr_code, "generate_qr_code", lambda *args: renders.append(args) or render(*args))
+
+    png, digest = get_invite_qr("group-1")
+    assert png.startswith(b"\x89PNG")
+    assert get_invite_qr("group-1") == (png, digest)
+
+    # Another process finds it in storage
+    qr_code._qr_cache.clear()
+    assert get_invite_qr("group-1") == (png, digest)
+    assert len(renders) == 1
+
+    svg, svg_digest = get_invite_qr("group-1", "large", "svg")
+    assert b"<svg" in svg and svg_digest != digest
+    assert len(list((storage / "qr").iterdir())) == 2
+
+
+def test_invite_qr_endpoint_caching(storage, db_session):
+    group, _, _ = create_test_group(db_session)
+    app.dependency_overrides[get_db] = lambda: db_session
+    client = TestClient(app)
+    try:
+        response = client.get(f"/api/v1/sport-groups/{group.id}/invite/qr")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["cache-control"] == "no-cache"
+        etag = response.headers["etag"]
+
+        revalidated = client.get(f"/api/v1/sport-groups/{group.id}/invite/qr", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+
+        assert client.get(f"/api/v1/sport-groups/{group.id}/invite/qr?size=huge").status_code == 400
+        assert client.get("/api/v1/sport-groups/missing/invite/qr").status_code == 404
+        missing_etag = f'"{invite_qr_digest("missing", "medium", "png")}"'
+        missing = client.get("/api/v1/sport-groups/missing/invite/qr", headers={"If-None-Match": missing_etag})
+        assert missing.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_delete_invite_qrs_removes_every_variant_of_the_group(storage):
+    get_invite_qr("group-1")
+    get_invite_qr("group-1", "small", "svg")
+    get_invite_qr("group-10")
+    # Left over from an earlier render version
+    (storage / "qr" / "invite_group-1_medium_0123456789abcdef.png").write_bytes(b"old")
+
+    assert delete_invite_qrs("group-1") == 3
+    assert [path.name for path in (storage / "qr").iterdir()] == [
+        path.name for path in (storage / "qr").glob("invite_group-10_*")
+    ]
+    assert delete_invite_qrs("group-1") == 0
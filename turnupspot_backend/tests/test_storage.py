@@ -0,0 +1,84 @@
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.api.deps import get_current_user
+from app.main import app
+from app.services.storage import IMMUTABLE_CACHE_CONTROL, ImmutableStaticFiles, LocalStorage, set_storage
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 40, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    set_storage(storage)
+    app.dependency_overrides[get_current_user] = lambda: object()
+    # No lifespan: these endpoints need neither the database nor seeding
+    yield storage
+    app.dependency_overrides.clear()
+    set_storage(None)
+
+
+def _presign(client, **overrides):
+    body = {"kind": "profile", "content_type": "image/png", "size": 1024 * 1024}
+    body.update(overrides)
+    return client.post("/api/v1/media/uploads", json=body)
+
+
+def test_presigned_local_upload_round_trip(storage, tmp_path):
+    client = TestClient(app)
+    content = _png_bytes()
+
+    response = _presign(client, size=len(content))
+    assert response.status_code == 200
+    grant = response.json()
+    assert grant["method"] == "PUT"
+    assert grant["key"].startswith("uploads/profile_") and grant["key"].endswith(".png")
+    assert grant["public_url"] == f"/static/{grant['key']}"
+
+    upload = client.put(grant["upload_url"], content=content, headers=grant["headers"])
+    assert upload.status_code == 204
+    assert (tmp_path / grant["key"]).read_bytes() == content
+
+    # Keys are never rewritten
+    again = client.put(grant["upload_url"], content=content, headers=grant["headers"])
+    assert again.status_code == 409
+
+
+def test_presigned_upload_limits(storage, tmp_path):
+    client = TestClient(app)
+    content = _png_bytes()
+
+    assert _presign(client, content_type="application/pdf").status_code == 400
+    assert _presign(client, kind="chat", content_type="application/pdf").status_code == 200
+    assert _presign(client, size=10**9).status_code == 413
+
+    grant = _presign(client, size=len(content) - 1).json()
+    too_big = client.put(grant["upload_url"], content=content, headers=grant["headers"])
+    assert too_big.status_code == 413
+
+    grant = _presign(client).json()
+    spoofed = client.put(grant["upload_url"], content=b"%PDF-1.4 not an image", headers=grant["headers"])
+    assert spoofed.status_code == 400
+
+    assert client.put("/api/v1/media/local-uploads/not-a-token", content=content).status_code == 403
+    assert not (tmp_path / "uploads").exists()
+
+
+def test_uploaded_media_is_served_immutable(tmp_path):
+    LocalStorage(str(tmp_path)).save_file("uploads/venue_abc.png", __file__, "image/png")
+    static_app = Starlette(routes=[Mount("/static", ImmutableStaticFiles(directory=str(tmp_path)))])
+
+    response = TestClient(static_app).get("/static/uploads/venue_abc.png")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
@@ -18,6 +18,7 @@ interface SportGroup {
   venue_name: string;
   venue_address: string;
   venue_image_url?: string;
+  venue_thumbnail_url?: string;
   playing_days: PlayingDay[];
   game_start_time: string;
   game_end_time: string;
@@ -200,6 +201,7 @@ const AllSportsGroupsPage: React.FC = () => {
               <div className="relative h-48">
                 <img
                   src={
+                    group.venue_thumbnail_url ||
                     group.venue_image_url ||
                     "https://via.placeholder.com/400x200?text=No+Image"
                   }
@@ -18,6 +18,7 @@ interface SportGroup {
   venue_name: string;
   venue_address: string;
   venue_image_url?: string;
+  venue_thumbnail_url?: string;
   playing_days: PlayingDay[];
   game_start_time: string;
   game_end_time: string;
@@ -131,6 +132,7 @@ const MySportsGroupsPage: React.FC = () => {
             <div className="relative">
               <img
                 src={
+                  group.venue_thumbnail_url ||
                   group.venue_image_url ||
                   "https://images.pexels.com/photos/399187/pexels-photo-399187.jpeg?auto=compress&cs=tinysrgb&w=1260&h=750&dpr=2"
                 }